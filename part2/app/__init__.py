@@ -4,6 +4,8 @@ from flask_restx import Api
 from flask_jwt_extended import JWTManager
 from config import config
 from app.models import db
+from app.persistence.sqlite import apply_sqlite_pragmas
+from app.presentation.api.representations import register_json_representation
 
 def create_app(config_name=None):
     if config_name is None:
@@ -18,9 +20,11 @@ def create_app(config_name=None):
     
     # Create tables
     with app.app_context():
+        apply_sqlite_pragmas(db.engine, app.config.get('SQLITE_PRAGMAS'))
         db.create_all()
     
     api = Api(app, version='1.0', title='HBnB API', description='HBnB Evolution API')
+    register_json_representation(api)
 
     from app.presentation.api.v1.users import api as users_ns
     from app.presentation.api.v1.amenities import api as amenities_ns
@@ -15,10 +15,32 @@ class Place(BaseModel):
         self.amenity_ids = []  # list[str]
         self.review_ids = []   # list[str]
 
+    @property
+    def amenity_ids(self):
+        return self._amenity_ids
+
+    @amenity_ids.setter
+    def amenity_ids(self, amenity_ids):
+        # The set makes the duplicate check in add_amenity O(1)
+        self._amenity_ids = []
+        self._amenity_set = set()
+        for amenity_id in amenity_ids:
+            if amenity_id not in self._amenity_set:
+                self._amenity_ids.append(amenity_id)
+                self._amenity_set.add(amenity_id)
+
     def add_amenity(self, amenity_id: str):
         amenity_id = require_uuid_str(amenity_id, "amenity_id")
-        if amenity_id not in self.amenity_ids:
-            self.amenity_ids.append(amenity_id)
+        if amenity_id not in self._amenity_set:
+            self._amenity_ids.append(amenity_id)
+            self._amenity_set.add(amenity_id)
+            self.touch()
+        return self
+
+    def remove_amenity(self, amenity_id: str):
+        if amenity_id in self._amenity_set:
+            self._amenity_set.discard(amenity_id)
+            self._amenity_ids.remove(amenity_id)
             self.touch()
         return self
 
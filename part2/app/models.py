@@ -22,8 +22,8 @@ class BaseModelDB:
 # Association tables for many-to-many relationships
 place_amenity = db.Table(
     'place_amenity',
-    db.Column('place_id', db.String(36), db.ForeignKey('place.id'), primary_key=True),
-    db.Column('amenity_id', db.String(36), db.ForeignKey('amenity.id'), primary_key=True)
+    db.Column('place_id', db.String(36), db.ForeignKey('place.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('amenity_id', db.String(36), db.ForeignKey('amenity.id', ondelete='CASCADE'), primary_key=True)
 )
 
 
@@ -38,8 +38,10 @@ class User(BaseModelDB, db.Model):
     is_admin = db.Column(db.Boolean, default=False, nullable=False)
     
     # Relationships
-    places = db.relationship('Place', backref='owner', lazy=True, cascade='all, delete-orphan')
-    reviews = db.relationship('Review', backref='user', lazy=True, cascade='all, delete-orphan')
+    places = db.relationship('Place', backref='owner', lazy=True,
+                             cascade='all, delete-orphan', passive_deletes=True)
+    reviews = db.relationship('Review', backref='user', lazy=True,
+                              cascade='all, delete-orphan', passive_deletes=True)
     
     def to_dict(self):
         """Convert user to dictionary"""
@@ -75,11 +77,13 @@ class Place(BaseModelDB, db.Model):
     price = db.Column(db.Float, nullable=False)
     latitude = db.Column(db.Float, nullable=False)
     longitude = db.Column(db.Float, nullable=False)
-    owner_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False, index=True)
+    owner_id = db.Column(db.String(36), db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False, index=True)
     
     # Relationships
-    amenities = db.relationship('Amenity', secondary=place_amenity, backref='places', lazy=True)
-    reviews = db.relationship('Review', backref='place', lazy=True, cascade='all, delete-orphan')
+    amenities = db.relationship('Amenity', secondary=place_amenity, lazy=True, passive_deletes=True,
+                                backref=db.backref('places', lazy=True, passive_deletes=True))
+    reviews = db.relationship('Review', backref='place', lazy=True,
+                              cascade='all, delete-orphan', passive_deletes=True)
     
     def to_dict(self):
         """Convert place to dictionary"""
@@ -103,8 +107,8 @@ class Review(BaseModelDB, db.Model):
     
     text = db.Column(db.String(1000), nullable=False)
     rating = db.Column(db.Integer, nullable=False)
-    user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False, index=True)
-    place_id = db.Column(db.String(36), db.ForeignKey('place.id'), nullable=False, index=True)
+    user_id = db.Column(db.String(36), db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False, index=True)
+    place_id = db.Column(db.String(36), db.ForeignKey('place.id', ondelete='CASCADE'), nullable=False, index=True)
     
     def to_dict(self):
         """Convert review to dictionary"""
@@ -0,0 +1,111 @@
+class AmenityBitIndex:
+    """
+    Amenity sets as integer bitmasks.
+
+    Every amenity id gets a bit number and every place a slot number. Each
+    place's amenities are stored as a mask (bit ``b`` set = has amenity
+    ``b``), and each amenity has a posting bitmap of the places that have it
+    (bit ``s`` set = the place in slot ``s``). "Places with all of X, Y, Z"
+    is then the AND of three posting bitmaps, whatever the number of places.
+    """
+
+    def __init__(self):
+        self._bits = {}           # amenity id -> bit number
+        self._postings = {}       # bit number -> bitmap of place slots
+        self._slots = {}          # place id -> slot number
+        self._place_ids = []      # slot number -> place id (None when free)
+        self._free_slots = []
+        self._masks = {}          # place id -> amenity bitmask
+
+    def bit(self, amenity_id: str) -> int:
+        """Bit number of ``amenity_id``, allocated on first use"""
+        bit = self._bits.get(amenity_id)
+        if bit is None:
+            bit = self._bits[amenity_id] = len(self._bits)
+            self._postings[bit] = 0
+        return bit
+
+    def mask(self, amenity_ids) -> int:
+        """Bitmask of ``amenity_ids`` (allocating bits for new ids)"""
+        mask = 0
+        for amenity_id in amenity_ids:
+            mask |= 1 << self.bit(amenity_id)
+        return mask
+
+    def mask_of(self, place_id: str) -> int:
+        """Amenity bitmask of ``place_id`` (0 for unknown places)"""
+        return self._masks.get(place_id, 0)
+
+    def set_place(self, place_id: str, amenity_ids):
+        """Replace the amenities of ``place_id``"""
+        slot = self._slots.get(place_id)
+        if slot is None:
+            slot = self._free_slots.pop() if self._free_slots else len(self._place_ids)
+            if slot == len(self._place_ids):
+                self._place_ids.append(place_id)
+            else:
+                self._place_ids[slot] = place_id
+            self._slots[place_id] = slot
+        old = self._masks.get(place_id, 0)
+        new = self.mask(amenity_ids)
+        place_bit = 1 << slot
+        for bit in self._bit_numbers(old & ~new):
+            self._postings[bit] &= ~place_bit
+        for bit in self._bit_numbers(new & ~old):
+            self._postings[bit] |= place_bit
+        self._masks[place_id] = new
+
+    def remove_place(self, place_id: str):
+        """Forget ``place_id`` and free its slot"""
+        slot = self._slots.pop(place_id, None)
+        if slot is None:
+            return
+        place_bit = 1 << slot
+        for bit in self._bit_numbers(self._masks.pop(place_id, 0)):
+            self._postings[bit] &= ~place_bit
+        self._place_ids[slot] = None
+        self._free_slots.append(slot)
+
+    def remove_amenity(self, amenity_id: str):
+        """Clear ``amenity_id`` from every place; returns the affected place ids"""
+        bit = self._bits.get(amenity_id)
+        if bit is None:
+            return []
+        place_ids = self._place_ids_in(self._postings[bit])
+        for place_id in place_ids:
+            self._masks[place_id] &= ~(1 << bit)
+        self._postings[bit] = 0
+        return place_ids
+
+    def place_ids_with(self, amenity_ids, match: str = "all"):
+        """
+        Ids of the places having all (or, with ``match="any"``, at least one)
+        of ``amenity_ids``, in slot order.
+        """
+        bits = [self._bits.get(amenity_id) for amenity_id in set(amenity_ids)]
+        if match == "any":
+            hits = 0
+            for bit in bits:
+                if bit is not None:
+                    hits |= self._postings[bit]
+        else:
+            if not bits or None in bits:
+                return []
+            hits = self._postings[bits[0]]
+            for bit in bits[1:]:
+                hits &= self._postings[bit]
+        return self._place_ids_in(hits)
+
+    def _place_ids_in(self, bitmap: int):
+        return [self._place_ids[slot] for slot in self._bit_numbers(bitmap)]
+
+    @staticmethod
+    def _bit_numbers(value: int):
+        """Positions of the set bits of ``value``, lowest first"""
+        # One pass over the binary digits; clearing bits one at a time would
+        # copy the whole (possibly million-bit) int for every match
+        digits = bin(value)[:1:-1]
+        position = digits.find("1")
+        while position != -1:
+            yield position
+            position = digits.find("1", position + 1)
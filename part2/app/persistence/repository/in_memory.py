@@ -1,13 +1,18 @@
 from app.common.exceptions import NotFoundError, ConflictError, ValidationError
+from .amenity_bits import AmenityBitIndex
 
 class InMemoryRepository:
     """
     Generic in-memory repository.
     Stores objects by: { entity_name: { id: obj } }
+
+    The amenities of stored places (objects with ``amenity_ids``) are also
+    kept as bitmasks in ``amenity_index`` for ``places_with_amenities``.
     """
 
     def __init__(self):
         self._data = {}
+        self.amenity_index = AmenityBitIndex()
 
     def _bucket(self, entity_name: str) -> dict:
         if entity_name not in self._data:
@@ -30,6 +35,8 @@ class InMemoryRepository:
             raise ConflictError(f"{entity_name} with id already exists")
 
         bucket[obj.id] = obj
+        if hasattr(obj, "amenity_ids"):
+            self.amenity_index.set_place(obj.id, obj.amenity_ids)
         return obj
 
     def get(self, entity_name: str, obj_id: str):
@@ -50,6 +57,8 @@ class InMemoryRepository:
                 continue
             if hasattr(obj, k):
                 setattr(obj, k, v)
+        if "amenity_ids" in data and hasattr(obj, "amenity_ids"):
+            self.amenity_index.set_place(obj.id, obj.amenity_ids)
         if hasattr(obj, "touch") and callable(getattr(obj, "touch")):
             obj.touch()
         return obj
@@ -58,4 +67,25 @@ class InMemoryRepository:
         bucket = self._bucket(entity_name)
         if obj_id not in bucket:
             raise NotFoundError(f"{entity_name} not found")
-        return bucket.pop(obj_id)
+        obj = bucket.pop(obj_id)
+        if hasattr(obj, "amenity_ids"):
+            self.amenity_index.remove_place(obj_id)
+        elif entity_name == "amenities":
+            # Unlink the amenity from the places that had it
+            places = self._bucket("places")
+            for place_id in self.amenity_index.remove_amenity(obj_id):
+                places[place_id].remove_amenity(obj_id)
+        return obj
+
+    def index_amenities(self, place):
+        """Re-read ``place.amenity_ids`` after changing them on a stored place"""
+        self.amenity_index.set_place(place.id, place.amenity_ids)
+
+    def places_with_amenities(self, amenity_ids, match: str = "all"):
+        """
+        Places having all of ``amenity_ids`` (``match="any"``: at least one).
+
+        Answered from the posting bitmaps, without visiting other places.
+        """
+        places = self._bucket("places")
+        return [places[place_id] for place_id in self.amenity_index.place_ids_with(amenity_ids, match)]
@@ -142,12 +142,21 @@ class HBnBFacade:
 
             # reset then re-add (simple behavior)
             place.amenity_ids = []
-            for aid in amenity_ids:
-                self.get_amenity(aid)
-                place.add_amenity(aid)
+            try:
+                for aid in amenity_ids:
+                    self.get_amenity(aid)
+                    place.add_amenity(aid)
+            finally:
+                self.repo.index_amenities(place)
 
         return self._place_out(place)
 
+    def list_places_with_amenities(self, amenity_ids, match: str = "all"):
+        """Places having all (match="any": any) of the given amenities."""
+        if match not in ("all", "any"):
+            raise ValidationError("match must be 'all' or 'any'")
+        return [self._place_out(p) for p in self.repo.places_with_amenities(amenity_ids, match)]
+
     # ---------- Reviews ----------
     def _review_out(self, review: Review):
         """Return review with user and place info expanded."""
@@ -7,6 +7,9 @@ class Config:
     """Base configuration"""
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
     JWT_ACCESS_TOKEN_EXPIRES = 3600  # 1 hour
+    # PRAGMAs run on every new SQLite connection (ignored for other databases).
+    # ON DELETE CASCADE only fires in SQLite with foreign_keys enabled.
+    SQLITE_PRAGMAS = {'foreign_keys': 'ON'}
     
 class DevelopmentConfig(Config):
     """Development configuration with SQLite"""
@@ -0,0 +1,49 @@
+"""
+Gunicorn configuration for HBnB
+
+The application is imported once in the master (preload_app) and shared with
+the workers copy-on-write:
+
+- the garbage collector is disabled in the master and its heap is frozen
+  right before each fork, so collections in the workers never write to the
+  pages of objects created at import time;
+- each worker re-enables the collector and disposes the SQLAlchemy engine
+  pool inherited from the master, so no database connection is shared
+  across processes.
+
+Every setting can be overridden with an environment variable.
+"""
+
+import gc
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '5000')}")
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', 1))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 0))
+accesslog = os.getenv('GUNICORN_ACCESSLOG', '-') or None  # empty disables
+preload_app = True
+
+# Avoid freeing objects in the master, which would dirty shared pages
+gc.disable()
+
+
+def pre_fork(server, worker):
+    """Move every object created so far to the permanent generation"""
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Re-enable the collector and drop connections inherited from the master"""
+    gc.enable()
+
+    from app.models import db
+
+    app = server.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            # close=False leaves the parent's connections untouched
+            engine.dispose(close=False)
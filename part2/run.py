@@ -7,4 +7,4 @@ load_dotenv()
 app = create_app(os.getenv('FLASK_ENV', 'development'))
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    app.run(host="0.0.0.0", port=5000, debug=app.config.get("DEBUG", False))
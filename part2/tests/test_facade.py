@@ -312,6 +312,85 @@ class TestPlaceFacade:
         assert updated["price"] == 150.0
 
 
+class TestAmenityFiltering:
+    """Test filtering places by amenities through the bitmask index."""
+
+    @pytest.fixture
+    def places(self, facade):
+        """Places p0..p3 linked to WiFi/Pool/Gym; returns (amenities, places)."""
+        owner = facade.create_user({
+            "first_name": "John",
+            "last_name": "Doe",
+            "email": "john@example.com"
+        })
+        amenities = {name: facade.create_amenity({"name": name}).id
+                     for name in ("WiFi", "Pool", "Gym")}
+        links = [["WiFi", "Pool", "Gym"], ["WiFi", "Pool"], ["WiFi"], []]
+        created = []
+        for index, names in enumerate(links):
+            created.append(facade.create_place({
+                "name": f"p{index}",
+                "description": "Desc",
+                "price": 100.0,
+                "latitude": 40.7128,
+                "longitude": -74.0060,
+                "owner_id": owner.id,
+                "amenity_ids": [amenities[name] for name in names]
+            }))
+        return amenities, created
+
+    @staticmethod
+    def _names(places):
+        return sorted(place["name"] for place in places)
+
+    def test_match_all_and_any(self, facade, places):
+        """Test all/any matching."""
+        amenities, _ = places
+        wifi_pool = [amenities["WiFi"], amenities["Pool"]]
+        assert self._names(facade.list_places_with_amenities(wifi_pool)) == ["p0", "p1"]
+        assert self._names(facade.list_places_with_amenities([amenities["Gym"]])) == ["p0"]
+        assert self._names(facade.list_places_with_amenities(
+            [amenities["Gym"], "unknown"], match="any")) == ["p0"]
+        assert facade.list_places_with_amenities([amenities["Gym"], "unknown"]) == []
+        with pytest.raises(ValidationError):
+            facade.list_places_with_amenities(wifi_pool, match="some")
+
+    def test_update_and_delete_keep_index_current(self, facade, places):
+        """Test that amenity changes and deletes are reflected."""
+        amenities, created = places
+        facade.update_place(created[3]["id"], {"amenity_ids": [amenities["Gym"]]})
+        facade.update_place(created[0]["id"], {"amenity_ids": [amenities["WiFi"]]})
+        assert self._names(facade.list_places_with_amenities([amenities["Gym"]])) == ["p3"]
+
+        facade.repo.delete("places", created[3]["id"])
+        assert facade.list_places_with_amenities([amenities["Gym"]]) == []
+
+        facade.repo.delete("amenities", amenities["WiFi"])
+        assert facade.list_places_with_amenities([amenities["WiFi"]]) == []
+        assert facade.get_place(created[1]["id"])["amenity_ids"] == [amenities["Pool"]]
+
+    def test_masks_and_slot_reuse(self, facade, places):
+        """Test that each place stores one bit per amenity and slots are reused."""
+        amenities, created = places
+        index = facade.repo.amenity_index
+        assert bin(index.mask_of(created[0]["id"])).count("1") == 3
+        assert index.mask_of(created[3]["id"]) == 0
+
+        facade.repo.delete("places", created[1]["id"])
+        replacement = facade.create_place({
+            "name": "p4",
+            "description": "Desc",
+            "price": 100.0,
+            "latitude": 40.7128,
+            "longitude": -74.0060,
+            "owner_id": created[0]["owner_id"],
+            "amenity_ids": [amenities["Pool"]]
+        })
+        assert self._names(facade.list_places_with_amenities([amenities["Pool"]])) == ["p0", "p4"]
+        assert len(index._place_ids) == 4
+        assert replacement["amenity_ids"] == [amenities["Pool"]]
+
+
 class TestReviewFacade:
     """Test review-related facade operations."""
 
@@ -0,0 +1,17 @@
+"""
+Production WSGI entry point
+
+Run with a pre-forking server using the bundled configuration:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+FLASK_ENV selects the configuration (defaults to production).
+"""
+
+import os
+from dotenv import load_dotenv
+from app import create_app
+
+load_dotenv()
+
+app = create_app(os.getenv('FLASK_ENV', 'production'))
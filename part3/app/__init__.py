@@ -8,6 +8,15 @@ from flask_cors import CORS
 
 # Import db from models (not creating a new one)
 from app.models.base_model import db
+from app.models.ids import ID_STRATEGIES
+from app.persistence.clusters import COARSEST_TILES
+from app.persistence.routing import init_read_replicas, replica_engines
+from app.persistence.sqlite import apply_sqlite_pragmas
+from app.persistence.views import init_view_counter
+from app.persistence.writer import init_write_coordinator
+from app.presentation.api.representations import register_json_representation
+from app.presentation.api.streams import init_review_hub
+from app.auth.auth_utils import is_token_revoked, load_token_blocklist
 
 # Initialize JWT, API, and Bcrypt
 jwt = JWTManager()
@@ -15,6 +24,12 @@ api = Api(version='1.0', title='HBnB API', description='A simple HBnB API')
 bcrypt = Bcrypt()
 
 
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(jwt_header, jwt_payload):
+    """Reject revoked tokens (logout / admin revocation)"""
+    return is_token_revoked(jwt_payload)
+
+
 def create_app(config_class):
     """
     Application Factory Pattern
@@ -30,13 +45,28 @@ def create_app(config_class):
     
     # Load configuration from config_class
     app.config.from_object(config_class)
+    if app.config.get('ID_STRATEGY', 'uuid4') not in ID_STRATEGIES:
+        raise ValueError(f"ID_STRATEGY must be one of {sorted(ID_STRATEGIES)}")
+    if app.config.get('MAX_PLACE_CLUSTERS', 500) < COARSEST_TILES:
+        raise ValueError(f"MAX_PLACE_CLUSTERS must be at least {COARSEST_TILES} "
+                         "(the tiles of the coarsest cluster level)")
     
     # Initialize extensions with app
+    init_read_replicas(app, db)
+    init_write_coordinator(app, db)
+    init_view_counter(app, db)
+    init_review_hub(app)
     db.init_app(app)
     jwt.init_app(app)
     bcrypt.init_app(app)
+    register_json_representation(api)
     api.init_app(app)
     
+    # Apply per-config SQLite PRAGMAs before the first connection is opened
+    with app.app_context():
+        for engine in [db.engine, *replica_engines(app)]:
+            apply_sqlite_pragmas(engine, app.config.get('SQLITE_PRAGMAS'))
+    
     # Configure CORS to allow frontend requests
     CORS(app, resources={
         r"/api/*": {
@@ -47,18 +77,37 @@ def create_app(config_class):
         }
     })
     
-    # Create tables
+    # Create tables and load revoked token JTIs
     with app.app_context():
         db.create_all()
+        load_token_blocklist()
     
     # Register blueprints/namespaces
-    from app.presentation.api.v1 import auth_ns, users_ns, places_ns, reviews_ns, amenities_ns
+    from app.presentation.api.v1 import (auth_ns, users_ns, places_ns, reviews_ns, amenities_ns,
+                                         changes_ns, batch_ns)
     
     api.add_namespace(auth_ns, path='/api/v1/auth')
     api.add_namespace(users_ns, path='/api/v1/users')
     api.add_namespace(places_ns, path='/api/v1/places')
     api.add_namespace(reviews_ns, path='/api/v1/reviews')
     api.add_namespace(amenities_ns, path='/api/v1/amenities')
+    api.add_namespace(changes_ns, path='/api/v1/changes')
+    api.add_namespace(batch_ns, path='/api/v1/batch')
+    
+    # Register CLI commands
+    from app.seed import seed_command
+    from app.auth.auth_utils import prune_refresh_tokens_command
+    from app.persistence.changes import prune_changes_command
+    from app.persistence.clusters import rebuild_place_cells_command
+    from app.persistence.leaderboard import advance_trending_command, rebuild_leaderboards_command
+    from app.persistence.trigrams import rebuild_trigrams_command
+    app.cli.add_command(seed_command)
+    app.cli.add_command(rebuild_leaderboards_command)
+    app.cli.add_command(advance_trending_command)
+    app.cli.add_command(rebuild_place_cells_command)
+    app.cli.add_command(rebuild_trigrams_command)
+    app.cli.add_command(prune_changes_command)
+    app.cli.add_command(prune_refresh_tokens_command)
     
     return app
 
@@ -1,7 +1,22 @@
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended.config import config as jwt_config
 from functools import wraps
 import bcrypt
-from datetime import timedelta
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from app.auth.blocklist import TokenBlocklist
+from app.models.base_model import RefreshToken, db
+from app.persistence.repository import RefreshTokenRepository, RevokedTokenRepository
+
+# Revoked JTIs of this process, loaded at startup and kept in sync with the DB
+token_blocklist = TokenBlocklist()
+_blocklist_sync = {'synced_at': None, 'next_sync': 0.0}
+_blocklist_sync_lock = threading.Lock()
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
@@ -24,6 +39,28 @@ def generate_token(user_id: str, expires_delta: timedelta = None) -> str:
     else:
         return create_access_token(identity=user_id)
 
+def create_token_pair(user):
+    """
+    Create an access token and a refresh token for a user.
+    
+    The access token carries the is_admin claim. The refresh token's JTI is
+    returned as an unsaved RefreshToken record so the caller can persist it
+    (on login) or rotate it in (on refresh).
+    
+    Returns:
+        tuple: (access_token, refresh_token, RefreshToken record)
+    """
+    identity = str(user.id)
+    access_token = create_access_token(
+        identity=identity,
+        additional_claims={"is_admin": user.is_admin}
+    )
+    jti = str(uuid.uuid4())
+    refresh_token = create_refresh_token(identity=identity, additional_claims={"jti": jti})
+    expires = jwt_config.refresh_expires or timedelta(days=3650)
+    record = RefreshToken(id=jti, user_id=user.id, expires_at=datetime.utcnow() + expires)
+    return access_token, refresh_token, record
+
 def token_required(f):
     """Decorator to require JWT token"""
     @wraps(f)
@@ -46,3 +83,48 @@ def admin_required(f):
 def get_current_user_id():
     """Get the current authenticated user ID"""
     return get_jwt_identity()
+
+def load_token_blocklist():
+    """Purge expired revocations and load the remaining JTIs into memory (app startup)"""
+    repo = RevokedTokenRepository()
+    repo.purge_expired()
+    synced_at = datetime.utcnow()
+    token_blocklist.load(repo.active_jtis(), capacity=current_app.config.get('TOKEN_BLOCKLIST_CAPACITY'))
+    with _blocklist_sync_lock:
+        _blocklist_sync['synced_at'] = synced_at
+        _blocklist_sync['next_sync'] = time.monotonic() + current_app.config.get('TOKEN_BLOCKLIST_SYNC_SECONDS', 0)
+
+def sync_token_blocklist():
+    """Pick up JTIs revoked by other processes, at most every TOKEN_BLOCKLIST_SYNC_SECONDS"""
+    interval = current_app.config.get('TOKEN_BLOCKLIST_SYNC_SECONDS', 0)
+    if not interval or time.monotonic() < _blocklist_sync['next_sync']:
+        return
+    with _blocklist_sync_lock:
+        if time.monotonic() < _blocklist_sync['next_sync']:
+            return
+        _blocklist_sync['next_sync'] = time.monotonic() + interval
+        since = _blocklist_sync['synced_at']
+        _blocklist_sync['synced_at'] = datetime.utcnow()
+    # Overlap the window by one interval so no revocation falls between syncs
+    if since is not None:
+        since -= timedelta(seconds=interval)
+    token_blocklist.update(RevokedTokenRepository().active_jtis(since=since))
+
+def is_token_revoked(jwt_payload) -> bool:
+    """token_in_blocklist_loader callback: a Bloom filter probe in the common case"""
+    sync_token_blocklist()
+    return jwt_payload['jti'] in token_blocklist
+
+def revoke_token(jti: str, expires_at: datetime):
+    """Revoke a JWT in this process and persist the revocation for the others"""
+    RevokedTokenRepository().add(jti, expires_at)
+    token_blocklist.add(jti)
+
+@click.command("prune-refresh-tokens")
+@with_appcontext
+def prune_refresh_tokens_command():
+    """Delete expired refresh tokens (and expired revocations)."""
+    db.engine.echo = False
+    refresh = RefreshTokenRepository().purge_expired()
+    revoked = RevokedTokenRepository().purge_expired()
+    click.echo(f"Pruned {refresh} refresh tokens and {revoked} revocations")
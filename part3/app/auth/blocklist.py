@@ -0,0 +1,83 @@
+"""In-process JWT revocation list
+
+Revoked JTIs are kept in an exact ``set`` fronted by a Bloom filter. The
+common case, a token that was never revoked, is answered by the filter with a
+handful of bit tests; only filter hits (revoked tokens and rare false
+positives) reach the set.
+"""
+
+import hashlib
+import math
+import threading
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.capacity = capacity
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        for position in self._positions(item):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class TokenBlocklist:
+    """Thread-safe set of revoked JTIs with a Bloom filter in front"""
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.01):
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._jtis = set()
+        self._bloom = BloomFilter(capacity, error_rate)
+
+    def __len__(self):
+        return len(self._jtis)
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self._bloom and jti in self._jtis
+
+    def add(self, jti: str):
+        """Add a revoked JTI, growing the filter when it passes its capacity"""
+        with self._lock:
+            if jti in self._jtis:
+                return
+            self._jtis.add(jti)
+            if len(self._jtis) > self._bloom.capacity:
+                self._rebuild(self._bloom.capacity * 2)
+            else:
+                self._bloom.add(jti)
+
+    def update(self, jtis):
+        for jti in jtis:
+            self.add(jti)
+
+    def load(self, jtis, capacity: int = None):
+        """Replace the contents (e.g. at startup or after pruning expired JTIs)"""
+        with self._lock:
+            self._jtis = set(jtis)
+            self._rebuild(max(capacity or self._bloom.capacity, len(self._jtis) * 2))
+
+    def _rebuild(self, capacity: int):
+        bloom = BloomFilter(capacity, self.error_rate)
+        for jti in self._jtis:
+            bloom.add(jti)
+        self._bloom = bloom
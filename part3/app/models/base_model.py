@@ -1,21 +1,35 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import func, select
+from sqlalchemy.orm import declared_attr
 from datetime import datetime
-import uuid
 
-db = SQLAlchemy()
+from app.models.ids import new_id
+from app.persistence.routing import RoutingSession
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # Association table for many-to-many relationship between Place and Amenity
 place_amenity = db.Table(
     'place_amenity',
-    db.Column('place_id', db.String(36), db.ForeignKey('place.id'), primary_key=True),
-    db.Column('amenity_id', db.String(36), db.ForeignKey('amenity.id'), primary_key=True),
+    db.Column('place_id', db.String(36), db.ForeignKey('place.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('amenity_id', db.String(36), db.ForeignKey('amenity.id', ondelete='CASCADE'), primary_key=True),
+    # Reverse of the primary key: "places with amenity X" without a full scan
+    db.Index('ix_place_amenity_amenity_id_place_id', 'amenity_id', 'place_id'),
 )
 
 class BaseModelDB:
     """Base model for all database entities"""
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    # uuid4, or time-ordered uuid7 with ID_STRATEGY = 'uuid7' (app/models/ids.py)
+    id = db.Column(db.String(36), primary_key=True, default=new_id)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # Row version for optimistic concurrency: the ORM adds "AND version = :old"
+    # to every UPDATE/DELETE and increments it; exposed to clients as the ETag
+    version = db.Column(db.Integer, default=1, server_default='1', nullable=False)
+
+    @declared_attr.directive
+    def __mapper_args__(cls):
+        return {'version_id_col': cls.version}
 
     def to_dict(self):
         """Convert model to dictionary"""
@@ -39,8 +53,12 @@ class User(BaseModelDB, db.Model):
     # Relationships (Task 8)
     # - One-to-many: User -> Places
     # - One-to-many: User -> Reviews
-    places = db.relationship('Place', backref='owner', lazy=True)
-    reviews = db.relationship('Review', backref='user', lazy=True)
+    # Child rows are removed by ON DELETE CASCADE in the database
+    # (passive_deletes), so deleting a user never loads its collections.
+    places = db.relationship('Place', backref='owner', lazy=True,
+                             cascade='all, delete-orphan', passive_deletes=True)
+    reviews = db.relationship('Review', backref='user', lazy=True,
+                              cascade='all, delete-orphan', passive_deletes=True)
     
     def hash_password(self, password):
         """Hashes the password before storing it."""
@@ -93,17 +111,26 @@ class Place(BaseModelDB, db.Model):
     longitude = db.Column(db.Float, nullable=False)
 
     # Foreign key (Task 8: User -> Place one-to-many)
-    owner_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False, index=True)
+    owner_id = db.Column(db.String(36), db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False, index=True)
+
+    # Review statistics, kept up to date on every review write
+    # (app/persistence/leaderboard.py); rating_score is the Bayesian average
+    # rating and stays NULL until the first review
+    review_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    rating_sum = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    rating_score = db.Column(db.Float, nullable=True, index=True)
 
     # Relationships (Task 8)
     # - One-to-many: Place -> Reviews
-    reviews = db.relationship('Review', backref='place', lazy=True, cascade='all, delete-orphan')
+    reviews = db.relationship('Review', backref='place', lazy=True,
+                              cascade='all, delete-orphan', passive_deletes=True)
     # - Many-to-many: Place <-> Amenities
     amenities = db.relationship(
         'Amenity',
         secondary=place_amenity,
-        lazy='subquery',
-        backref=db.backref('places', lazy=True),
+        lazy=True,
+        passive_deletes=True,
+        backref=db.backref('places', lazy=True, passive_deletes=True),
     )
     
     def to_dict(self):
@@ -131,9 +158,9 @@ class Review(BaseModelDB, db.Model):
 
     # Foreign keys (Task 8: relationships)
     # - Review belongs to one User
-    user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False, index=True)
+    user_id = db.Column(db.String(36), db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False, index=True)
     # - Review belongs to one Place
-    place_id = db.Column(db.String(36), db.ForeignKey('place.id'), nullable=False, index=True)
+    place_id = db.Column(db.String(36), db.ForeignKey('place.id', ondelete='CASCADE'), nullable=False, index=True)
     
     def to_dict(self):
         """Convert review to dictionary"""
@@ -145,3 +172,136 @@ class Review(BaseModelDB, db.Model):
             'place_id': self.place_id,
         })
         return data
+
+
+class PlaceReviewBucket(db.Model):
+    """Number of reviews written for a place in one hour (trending places)"""
+    __tablename__ = 'place_review_bucket'
+
+    # Start of the hour (UTC); first in the key so a window is one range scan
+    bucket = db.Column(db.DateTime, primary_key=True)
+    place_id = db.Column(db.String(36), db.ForeignKey('place.id', ondelete='CASCADE'), primary_key=True, index=True)
+    count = db.Column(db.Integer, default=0, nullable=False)
+
+
+class TrendingWindow(db.Model):
+    """A trending window whose per-place totals are maintained (app/persistence/leaderboard.py)"""
+    __tablename__ = 'trending_window'
+
+    hours = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    # First hourly bucket counted in the totals; moved forward by `flask advance-trending`
+    start = db.Column(db.DateTime, nullable=False)
+
+
+class PlaceTrending(db.Model):
+    """Reviews of a place in the buckets of a maintained trending window"""
+    __tablename__ = 'place_trending'
+    __table_args__ = (
+        # The top k of a window is the first k entries of this index
+        db.Index('ix_place_trending_hours_reviews', 'hours', 'reviews'),
+    )
+
+    hours = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    place_id = db.Column(db.String(36), db.ForeignKey('place.id', ondelete='CASCADE'), primary_key=True, index=True)
+    reviews = db.Column(db.Integer, default=0, nullable=False)
+
+
+class PlaceViewCount(db.Model):
+    """Detail views of a place, flushed in batches (app/persistence/views.py)"""
+    __tablename__ = 'place_view_count'
+
+    place_id = db.Column(db.String(36), db.ForeignKey('place.id', ondelete='CASCADE'), primary_key=True)
+    count = db.Column(db.BigInteger, default=0, nullable=False)
+
+
+class PlaceCell(db.Model):
+    """A place filed under its map tile at one zoom level (app/persistence/clusters.py)"""
+    __tablename__ = 'place_cell'
+    # SQLite: the key is the table, so clustering reads no other b-tree
+    __table_args__ = {'sqlite_with_rowid': False}
+
+    level = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)
+    x = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    y = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    place_id = db.Column(db.String(36), db.ForeignKey('place.id', ondelete='CASCADE'), primary_key=True, index=True)
+    # Copies of the place's columns aggregated per cluster
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+    price = db.Column(db.Float, nullable=False)
+
+
+class PlaceTrigram(db.Model):
+    """One trigram of a place's normalized name (app/persistence/trigrams.py)"""
+    __tablename__ = 'place_trigram'
+    # SQLite: the key is the table, so a lookup reads no other b-tree
+    __table_args__ = {'sqlite_with_rowid': False}
+
+    trigram = db.Column(db.String(12), primary_key=True)
+    place_id = db.Column(db.String(36), db.ForeignKey('place.id', ondelete='CASCADE'), primary_key=True, index=True)
+    # Distinct trigrams in the whole name (for the similarity)
+    size = db.Column(db.SmallInteger, nullable=False)
+
+
+class AmenityTrigram(db.Model):
+    """One trigram of an amenity's normalized name (app/persistence/trigrams.py)"""
+    __tablename__ = 'amenity_trigram'
+    __table_args__ = {'sqlite_with_rowid': False}
+
+    trigram = db.Column(db.String(12), primary_key=True)
+    amenity_id = db.Column(db.String(36), db.ForeignKey('amenity.id', ondelete='CASCADE'), primary_key=True, index=True)
+    size = db.Column(db.SmallInteger, nullable=False)
+
+
+class TrigramFrequency(db.Model):
+    """Names containing a trigram, per indexed entity (app/persistence/trigrams.py)"""
+    __tablename__ = 'trigram_frequency'
+    __table_args__ = {'sqlite_with_rowid': False}
+
+    # 'place' or 'amenity'
+    entity = db.Column(db.String(16), primary_key=True)
+    # '' counts the indexed names themselves
+    trigram = db.Column(db.String(12), primary_key=True)
+    entries = db.Column(db.Integer, default=0, nullable=False)
+
+
+class ChangeLog(db.Model):
+    """One write to a user, place, review or amenity (app/persistence/changes.py)"""
+    __tablename__ = 'change_log'
+    # SQLite: never reuse the seq of a pruned or rolled back newest entry
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    seq = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True, autoincrement=True)
+    entity = db.Column(db.String(16), nullable=False)
+    entity_id = db.Column(db.String(36), nullable=False)
+    # 'upsert' or 'delete'
+    op = db.Column(db.String(6), nullable=False)
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+# A primary key lookup per place; 0 until the first flush. Deferred: only the
+# list and detail load profiles (which serialize it) undefer it
+Place.view_count = db.column_property(func.coalesce(
+    select(PlaceViewCount.count).where(PlaceViewCount.place_id == Place.id).scalar_subquery(),
+    0,
+), deferred=True)
+
+
+class RefreshToken(BaseModelDB, db.Model):
+    """Issued refresh token; ``id`` is the token's JTI"""
+    __tablename__ = 'refresh_token'
+
+    user_id = db.Column(db.String(36), db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    # Set when the token is rotated or revoked; only a token rotated within
+    # REFRESH_TOKEN_REUSE_GRACE_SECONDS is accepted again
+    revoked_at = db.Column(db.DateTime, nullable=True)
+    replaced_by = db.Column(db.String(36), nullable=True)
+
+
+class RevokedToken(db.Model):
+    """Revoked JWT (logout or admin revocation), kept until the token expires"""
+    __tablename__ = 'revoked_token'
+
+    jti = db.Column(db.String(36), primary_key=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -0,0 +1,67 @@
+"""Primary key strategies for ``BaseModelDB.id``
+
+``uuid4`` (the default) is fully random: consecutive inserts land on random
+pages of the primary key B-tree. ``uuid7`` (RFC 9562) starts with the
+creation time in milliseconds. Ids created later sort later as strings,
+so new rows are appended to the right edge of the index, and ``ORDER BY
+id`` is creation order. Both are canonical 36-character UUID strings and
+fit the existing ``String(36)`` columns. Rows of either kind can be mixed
+in one table.
+
+The strategy is chosen per app with ``ID_STRATEGY``. A uuid7 id reveals
+when its row was created.
+"""
+
+import os
+import threading
+import time
+import uuid
+
+from flask import current_app, has_app_context
+
+_lock = threading.Lock()
+_last = {'ms': 0, 'counter': 0}
+
+
+def uuid7_string(timestamp_ms: int, counter: int, random_bits: int) -> str:
+    """Format a UUIDv7 from a 48-bit timestamp, 12-bit counter and 62 random bits"""
+    value = ((timestamp_ms & 0xFFFFFFFFFFFF) << 80 | 0x7 << 76 | (counter & 0xFFF) << 64
+             | 0b10 << 62 | (random_bits & 0x3FFFFFFFFFFFFFFF))
+    return str(uuid.UUID(int=value))
+
+
+def uuid7() -> str:
+    """
+    A new UUIDv7 string, increasing within this process.
+
+    Ids created in the same millisecond use the 12-bit counter field (seeded
+    at random, RFC 9562 method 1). If the counter runs out, the timestamp
+    is moved one millisecond ahead.
+    """
+    now = time.time_ns() // 1_000_000
+    tail = int.from_bytes(os.urandom(10), 'big')
+    with _lock:
+        if now > _last['ms']:
+            _last['ms'], _last['counter'] = now, (tail >> 64) & 0x7FF
+        else:
+            _last['counter'] += 1
+            if _last['counter'] > 0xFFF:
+                _last['ms'], _last['counter'] = _last['ms'] + 1, 0
+        ms, counter = _last['ms'], _last['counter']
+    return uuid7_string(ms, counter, tail)
+
+
+def uuid4() -> str:
+    return str(uuid.uuid4())
+
+
+ID_STRATEGIES = {'uuid4': uuid4, 'uuid7': uuid7}
+
+
+def new_id() -> str:
+    """A primary key from the current app's ``ID_STRATEGY`` (uuid4 outside an app)"""
+    strategy = current_app.config.get('ID_STRATEGY', 'uuid4') if has_app_context() else 'uuid4'
+    try:
+        return ID_STRATEGIES[strategy]()
+    except KeyError:
+        raise ValueError(f"Unknown ID_STRATEGY {strategy!r}; expected one of {sorted(ID_STRATEGIES)}")
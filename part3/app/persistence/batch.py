@@ -0,0 +1,106 @@
+"""One database transaction for several API requests (POST /api/v1/batch)
+
+A ``Batch`` runs each request as a step inside a SAVEPOINT of a single
+transaction on the request's session. While a batch is active:
+
+- ``db.session.commit()`` in the repositories only flushes;
+- ``db.session.rollback()`` returns to the savepoint of the current step
+  (see ``RoutingSession``), so one failed request leaves the others intact;
+- what the session collects in ``session.info`` for its ``after_commit``
+  listeners, and callbacks registered with ``run_after_commit``, are dropped
+  with a rolled back step and otherwise applied by the final commit.
+
+``commit()`` or ``rollback()`` ends the batch. A batch that only reads
+(``begin(writes=False)``) takes no write lock.
+"""
+
+from app.persistence.routing import mark_written
+
+
+class Batch:
+    """Steps of one transaction, each undone on its own when it fails"""
+
+    def __init__(self, session):
+        self.session = session
+        self._savepoint = None
+        self._marks = None
+        self._callbacks = []
+
+    def begin(self, writes: bool = True):
+        """Start the transaction; on the primary, with its write lock, if the batch ``writes``"""
+        if self.session.in_transaction():
+            self.session.commit()
+        if writes:
+            mark_written(self.session)
+            connection = self.session.connection()
+            if connection.dialect.name == 'sqlite':
+                # pysqlite only opens a transaction before the first INSERT, UPDATE
+                # or DELETE; releasing an earlier SAVEPOINT would commit. Taking the
+                # write lock now also keeps a later step from failing to get it.
+                connection.exec_driver_sql('BEGIN IMMEDIATE')
+        self.session.info['batch'] = self
+
+    def begin_step(self):
+        """Start a step; its writes can be undone with ``end_step(False)``"""
+        self._marks = ({key: len(value) for key, value in self.session.info.items()
+                        if isinstance(value, list)}, len(self._callbacks))
+        self._savepoint = self.session.begin_nested()
+
+    def end_step(self, succeeded: bool):
+        """Keep (``succeeded``) or undo the writes of the current step"""
+        if succeeded and self._savepoint.is_active:
+            self._savepoint.commit()
+        else:
+            self._undo_step()
+        self._savepoint = self._marks = None
+
+    def rollback_step(self):
+        """Undo the current step so far (``session.rollback()`` inside a batch)"""
+        if self._savepoint is None:
+            return
+        self._undo_step()
+        # The rest of the step stays undoable
+        self._savepoint = self.session.begin_nested()
+
+    def _undo_step(self):
+        # Also when a failed flush left the savepoint inactive
+        if self.session.get_nested_transaction() is self._savepoint:
+            self._savepoint.rollback()
+        lengths, callbacks = self._marks
+        for key, value in list(self.session.info.items()):
+            if isinstance(value, list):
+                if key in lengths:
+                    del value[lengths[key]:]
+                else:
+                    del self.session.info[key]
+        del self._callbacks[callbacks:]
+
+    def after_commit(self, callback):
+        """Call ``callback`` after the final commit, unless its step is undone"""
+        self._callbacks.append(callback)
+
+    def commit(self):
+        """Commit every kept step, then run the ``run_after_commit`` callbacks"""
+        del self.session.info['batch']
+        self.session.commit()
+        for callback in self._callbacks:
+            callback()
+
+    def rollback(self):
+        """Undo the whole batch"""
+        self.session.info.pop('batch', None)
+        self.session.rollback()
+
+
+def active_batch(session):
+    """The batch running on ``session``, or None"""
+    return session.info.get('batch')
+
+
+def run_after_commit(session, callback):
+    """Call ``callback`` now, or once the batch running on ``session`` commits"""
+    batch = active_batch(session)
+    if batch is None:
+        callback()
+    else:
+        batch.after_commit(callback)
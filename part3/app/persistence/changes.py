@@ -0,0 +1,178 @@
+"""Append-only change log of users, places, reviews and amenities
+
+Every write to one of these rows appends ``(seq, entity, entity_id, op)``
+to ``change_log`` in the same transaction. ``op`` is ``upsert`` (created or
+changed) or ``delete``. ``seq`` only increases, so a client that has applied
+everything up to ``seq`` asks for what came after it (``GET /changes``).
+It refetches upserted rows and drops deleted ones instead of downloading
+whole collections again.
+
+Entries are written from the session's ``after_flush`` event for ORM
+writes, and by the repository (``record_update`` / ``record_delete``) for
+bulk ``update_owned`` / ``delete_owned``.
+
+A place is serialized with its review ids and rating, so a review write
+also logs an ``upsert`` of its place. A delete covers the rows that belong
+to the deleted row and go with it (``ON DELETE CASCADE``): a user's places
+and reviews, a place's reviews, an amenity's links to places. They are not
+logged one by one; clients drop the dependent rows themselves. The other
+places a deleted user reviewed lose those reviews, so each of them is
+logged as an ``upsert``. View counts and rows inserted by
+``flask seed`` are not logged. Clients start from the full lists read
+after ``head()``.
+
+SQLite has one writer at a time, so ``seq`` order is commit order. With
+concurrent writers (MySQL) a transaction can commit after one with a
+higher ``seq``; a client that already read past it misses its entries.
+"""
+
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import event, func, select
+
+from app.models.base_model import db, Amenity, ChangeLog, Place, Review, User
+from app.persistence.routing import RoutingSession
+
+UPSERT, DELETE = 'upsert', 'delete'
+
+ENTITIES = {User: 'user', Place: 'place', Review: 'review', Amenity: 'amenity'}
+
+
+def entity_of(model):
+    """Entity name logged for ``model``, None if its writes are not logged"""
+    return ENTITIES.get(model)
+
+
+def _review_place(connection, review_id):
+    """The place of a review, read before a bulk write to the review"""
+    review = Review.__table__
+    return connection.execute(select(review.c.place_id).where(review.c.id == review_id)).scalar()
+
+
+def _reviewed_places(connection, user_id):
+    """Places of other owners reviewed by a user, read before the user is deleted"""
+    review, place = Review.__table__, Place.__table__
+    return connection.execute(
+        select(review.c.place_id).distinct()
+        .join(place, place.c.id == review.c.place_id)
+        .where(review.c.user_id == user_id, place.c.owner_id != user_id)
+    ).scalars().all()
+
+
+def _events(entity, obj_id, op, place_id=None):
+    """The entry of one write, plus the upsert of the place of a review"""
+    events = [(entity, obj_id, op)]
+    if entity == 'review' and place_id is not None:
+        events.append(('place', place_id, UPSERT))
+    return events
+
+
+def write(connection, events):
+    """
+    Append ``(entity, entity_id, op)`` entries in one INSERT.
+
+    Duplicates are dropped and deletes go last, so an upsert of a row
+    deleted in the same write (a place whose review is removed with it)
+    is not logged.
+    """
+    deleted = {(entity, entity_id) for entity, entity_id, op in events if op == DELETE}
+    rows, seen = [], set()
+    for deletes in (False, True):
+        for entity, entity_id, op in events:
+            key = (entity, entity_id)
+            if (op == DELETE) != deletes or key in seen or (not deletes and key in deleted):
+                continue
+            seen.add(key)
+            rows.append({'entity': entity, 'entity_id': entity_id, 'op': op,
+                         'changed_at': datetime.utcnow()})
+    if rows:
+        connection.execute(ChangeLog.__table__.insert(), rows)
+
+
+def record_update(connection, model, obj_id):
+    """Log a bulk UPDATE of one row (call in its transaction)"""
+    entity = entity_of(model)
+    if entity is not None:
+        place_id = _review_place(connection, obj_id) if entity == 'review' else None
+        write(connection, _events(entity, obj_id, UPSERT, place_id))
+
+
+def record_delete(connection, model, obj_id):
+    """Log a bulk DELETE of one row (call in its transaction, before the DELETE)"""
+    entity = entity_of(model)
+    if entity is not None:
+        place_id = _review_place(connection, obj_id) if entity == 'review' else None
+        events = _events(entity, obj_id, DELETE, place_id)
+        if entity == 'user':
+            events += [('place', place_id, UPSERT)
+                       for place_id in _reviewed_places(connection, obj_id)]
+        write(connection, events)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _write_flush(session, flush_context):
+    # new / dirty / deleted still hold what was just flushed
+    events = []
+    written = [(obj, UPSERT) for obj in session.new]
+    written += [(obj, UPSERT) for obj in session.dirty if session.is_modified(obj)]
+    written += [(obj, DELETE) for obj in session.deleted]
+    for obj, op in written:
+        entity = entity_of(type(obj))
+        if entity is not None:
+            events += _events(entity, obj.id, op, obj.place_id if entity == 'review' else None)
+    if events:
+        write(session.connection(), events)
+
+
+def compact(entries):
+    """The last entry of each row, in ``seq`` order"""
+    last = {(entry.entity, entry.entity_id): entry for entry in entries}
+    return sorted(last.values(), key=lambda entry: entry.seq)
+
+
+def read(since: int, limit: int):
+    """
+    Entries after ``since``, at most ``limit`` of them.
+
+    Returns:
+        tuple: (entries, whether more follow)
+    """
+    entries = db.session.execute(
+        select(ChangeLog).where(ChangeLog.seq > since).order_by(ChangeLog.seq).limit(limit + 1)
+    ).scalars().all()
+    return entries[:limit], len(entries) > limit
+
+
+def head() -> int:
+    """The newest ``seq`` (0 when the log is empty)"""
+    return db.session.execute(select(func.max(ChangeLog.seq))).scalar() or 0
+
+
+def oldest() -> int:
+    """The oldest ``seq`` still logged (None when the log is empty)"""
+    return db.session.execute(select(func.min(ChangeLog.seq))).scalar()
+
+
+def prune(before: datetime) -> int:
+    """Delete entries logged before ``before``, keeping the newest one (for ``head``)"""
+    newest = head()
+    count = ChangeLog.query.filter(ChangeLog.changed_at < before, ChangeLog.seq < newest).delete(
+        synchronize_session=False)
+    db.session.commit()
+    return count
+
+
+@click.command("prune-changes")
+@click.option("--days", type=int, default=None,
+              help="Keep this many days of entries (default: CHANGE_LOG_RETENTION_DAYS)")
+@with_appcontext
+def prune_changes_command(days):
+    """Delete old change log entries (clients behind them get 410 from /changes)."""
+    db.engine.echo = False
+    if days is None:
+        days = current_app.config.get('CHANGE_LOG_RETENTION_DAYS', 30)
+    count = prune(datetime.utcnow() - timedelta(days=days))
+    click.echo(f"Pruned {count} change log entries")
@@ -0,0 +1,195 @@
+"""Server-side clustering of places for map views
+
+Every place is filed under the Web Mercator tile that contains it at each
+zoom level in ``LEVELS`` (table ``place_cell``, one row per place and
+level). ``/api/v1/places/clusters`` then groups the places of a bounding box
+by tile at a single level. The key ``(level, x, y, place_id)`` turns that into
+one index range scan per tile column of the box, already in group order, and
+the answer has at most one cluster per tile, however many places there are.
+
+Clusters are whole tiles: a tile that overlaps the edge of the box is
+counted in full. Cells are kept up to date on every place write and rebuilt
+by ``rebuild_place_cells`` (after bulk loads or a change of ``LEVELS``).
+"""
+
+import math
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import event, func, inspect, select
+
+from app.models.base_model import db, Place, PlaceCell
+
+# Zoom levels cells are stored for; clusters use the finest one that suits the request
+LEVELS = (2, 4, 6, 8, 10, 12, 14, 16)
+# Cells are tiles this many levels below the map zoom (1/8 of a 256 px tile)
+CELL_ZOOM_OFFSET = 3
+MAX_ZOOM = 22
+# Tiles of the whole map at the coarsest level: MAX_PLACE_CLUSTERS must allow
+# this many, so every box fits at some level and no cluster is ever dropped
+COARSEST_TILES = 1 << (2 * LEVELS[0])
+# Web Mercator stops here; places further north/south land in the edge tiles
+MAX_LATITUDE = 85.05112878
+
+_CELL_COLUMNS = ('latitude', 'longitude', 'price')
+
+
+def tile(latitude: float, longitude: float, level: int):
+    """``(x, y)`` of the Web Mercator tile containing a point at ``level``"""
+    n = 1 << level
+    latitude = math.radians(max(-MAX_LATITUDE, min(MAX_LATITUDE, latitude)))
+    x = int((longitude + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(latitude)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def cell_rows(place_id: str, latitude: float, longitude: float, price: float):
+    """The ``place_cell`` rows of one place"""
+    rows = []
+    for level in LEVELS:
+        x, y = tile(latitude, longitude, level)
+        rows.append({'level': level, 'x': x, 'y': y, 'place_id': place_id,
+                     'latitude': latitude, 'longitude': longitude, 'price': price})
+    return rows
+
+
+def file_place(connection, place_id, latitude, longitude, price, replace=True):
+    """(Re)write the cells of one place"""
+    table = PlaceCell.__table__
+    if replace:
+        connection.execute(table.delete().where(table.c.place_id == place_id))
+    connection.execute(table.insert(), cell_rows(place_id, latitude, longitude, price))
+
+
+def _reprice(connection, place_id, price):
+    table = PlaceCell.__table__
+    connection.execute(table.update().where(table.c.place_id == place_id).values(price=price))
+
+
+def place_changed(connection, place_id, values: dict):
+    """Refile a place whose location or price is about to be set to ``values``"""
+    if 'latitude' not in values and 'longitude' not in values:
+        if 'price' in values:
+            # Same tiles; one UPDATE instead of rewriting every level
+            _reprice(connection, place_id, values['price'])
+        return
+    place = Place.__table__
+    current = connection.execute(
+        select(*(place.c[column] for column in _CELL_COLUMNS)).where(place.c.id == place_id)
+    ).first()
+    if current is not None:
+        merged = dict(current._mapping)
+        merged.update((column, values[column]) for column in _CELL_COLUMNS if column in values)
+        file_place(connection, place_id, **merged)
+
+
+@event.listens_for(Place, 'after_insert')
+def _place_inserted(mapper, connection, place):
+    # ORM inserts (Repository.add, including through the write coordinator)
+    file_place(connection, place.id, place.latitude, place.longitude, place.price, replace=False)
+
+
+@event.listens_for(Place, 'after_update')
+def _place_updated(mapper, connection, place):
+    # ORM updates (Repository.update); update_owned goes through place_changed
+    attrs = inspect(place).attrs
+    if attrs.latitude.history.has_changes() or attrs.longitude.history.has_changes():
+        file_place(connection, place.id, place.latitude, place.longitude, place.price)
+    elif attrs.price.history.has_changes():
+        _reprice(connection, place.id, place.price)
+
+
+def choose_level(zoom: int, west: float, south: float, east: float, north: float,
+                 max_clusters: int):
+    """
+    The finest stored level for ``zoom`` at which the box spans at most
+    ``max_clusters`` tiles (the coarsest level if none does).
+
+    Returns:
+        ``(level, xs, (y_min, y_max))``: the tile columns of the box (two
+        runs when it crosses the antimeridian) and its tile rows
+    """
+    wanted = zoom + CELL_ZOOM_OFFSET
+    candidates = [level for level in LEVELS if level <= wanted] or [LEVELS[0]]
+    for level in reversed(candidates):
+        x_west, y_north = tile(north, west, level)
+        x_east, y_south = tile(south, east, level)
+        if west <= east:
+            xs = list(range(x_west, x_east + 1))
+        else:
+            xs = list(range(x_west, 1 << level)) + list(range(0, x_east + 1))
+        if len(xs) * (y_south - y_north + 1) <= max_clusters or level == candidates[0]:
+            return level, xs, (y_north, y_south)
+
+
+def clusters(west: float, south: float, east: float, north: float, zoom: int,
+             max_clusters: int):
+    """
+    Places in the tiles overlapping a bounding box, grouped per tile.
+
+    Returns:
+        dict: ``level`` (zoom level of the tiles) and ``clusters``: count,
+        centroid (mean latitude/longitude), lowest price, and the place id
+        when the tile holds a single place
+    """
+    level, xs, (y_min, y_max) = choose_level(zoom, west, south, east, north, max_clusters)
+    count = func.count().label('count')
+    rows = db.session.execute(
+        select(PlaceCell.x, PlaceCell.y, count,
+               func.avg(PlaceCell.latitude), func.avg(PlaceCell.longitude),
+               func.min(PlaceCell.price), func.min(PlaceCell.place_id))
+        .where(PlaceCell.level == level,
+               PlaceCell.x.in_(xs),
+               PlaceCell.y.between(y_min, y_max))
+        .group_by(PlaceCell.x, PlaceCell.y)
+        # Never reached with max_clusters >= COARSEST_TILES (checked at startup)
+        .order_by(PlaceCell.x, PlaceCell.y)
+        .limit(max_clusters)
+    ).all()
+    return {
+        'level': level,
+        'clusters': [{'count': n, 'latitude': latitude, 'longitude': longitude,
+                      'min_price': min_price, 'place_id': place_id if n == 1 else None}
+                     for x, y, n, latitude, longitude, min_price, place_id in rows],
+    }
+
+
+def parse_bbox(value: str):
+    """Parse ``west,south,east,north`` in degrees (west > east crosses the antimeridian)"""
+    try:
+        west, south, east, north = (float(part) for part in (value or '').split(','))
+    except ValueError:
+        raise ValueError("bbox must be west,south,east,north")
+    if not (-180 <= west <= 180 and -180 <= east <= 180 and -90 <= south <= north <= 90):
+        raise ValueError("bbox must be within -180..180 longitude and -90..90 latitude, "
+                         "with south <= north")
+    return west, south, east, north
+
+
+def rebuild_place_cells(batch_size: int = 5000):
+    """Recompute the cells of every place"""
+    place = Place.__table__
+    table = PlaceCell.__table__
+    db.session.execute(table.delete())
+    rows, filed = [], 0
+    for place_id, latitude, longitude, price in db.session.execute(
+            select(place.c.id, place.c.latitude, place.c.longitude, place.c.price)).all():
+        rows.extend(cell_rows(place_id, latitude, longitude, price))
+        if len(rows) >= batch_size:
+            db.session.execute(table.insert(), rows)
+            filed += len(rows)
+            rows = []
+    if rows:
+        db.session.execute(table.insert(), rows)
+        filed += len(rows)
+    db.session.commit()
+    return filed
+
+
+@click.command("rebuild-place-cells")
+@with_appcontext
+def rebuild_place_cells_command():
+    """Recompute the map cells of all places (clustering)."""
+    db.engine.echo = False
+    rows = rebuild_place_cells()
+    click.echo(f"Rebuilt place cells ({rows} rows over {len(LEVELS)} levels)")
@@ -0,0 +1,125 @@
+"""Cached facet counts for place search
+
+``/api/v1/places/facets`` returns, for one filter set, how many places have
+each amenity and how many fall in each price bucket. Both come from one
+GROUP BY query each (``PlaceRepository.facets``). The result is cached per
+filter signature (amenity ids, match mode, bucket boundaries) in a small
+LRU per process.
+
+Committed writes to places, amenities or their links, and user deletes
+(which cascade to places), clear the cache of the process that made them.
+Other worker processes pick the change up when their entries expire after
+``FACETS_CACHE_SECONDS``.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+
+from app.models.base_model import Amenity, Place, User, place_amenity
+from app.persistence.routing import RoutingSession
+
+# Tables whose changes can move facet counts (user: deletes cascade to places)
+_FACET_TABLES = {Place.__tablename__, Amenity.__tablename__, place_amenity.name}
+
+
+class FacetCache:
+    """Thread-safe LRU of computed facets with a time to live"""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 60.0):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key``, computing and storing it if needed"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+        value = compute()
+        with self._lock:
+            # Drop results computed across an invalidation; they may be stale
+            if generation == self._generation:
+                self._entries[key] = (now + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+
+def facet_cache():
+    """The current app's facet cache (created on first use)"""
+    cache = current_app.extensions.get('facet_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault('facet_cache', FacetCache(
+            max_entries=current_app.config.get('FACETS_CACHE_SIZE', 256),
+            ttl=current_app.config.get('FACETS_CACHE_SECONDS', 60),
+        ))
+    return cache
+
+
+def _touches_facets(table_name, is_delete):
+    return table_name in _FACET_TABLES or (is_delete and table_name == User.__tablename__)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _flag_flush(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Place, Amenity)) or (isinstance(obj, User) and obj in session.deleted):
+            session.info['facets_stale'] = True
+            return
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _flag_bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if _touches_facets(getattr(table, 'name', None), orm_execute_state.is_delete):
+            orm_execute_state.session.info['facets_stale'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _invalidate(session):
+    if session.info.pop('facets_stale', False) and has_app_context():
+        cache = current_app.extensions.get('facet_cache')
+        if cache is not None:
+            cache.clear()
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_flag(session):
+    session.info.pop('facets_stale', None)
+
+
+def parse_price_buckets(value: str, max_buckets: int = 20):
+    """Parse ascending, comma-separated bucket boundaries such as ``0,50,100``"""
+    try:
+        boundaries = [float(part) for part in value.split(',') if part.strip()]
+    except ValueError:
+        raise ValueError("price_buckets must be comma-separated numbers")
+    if not all(math.isfinite(boundary) for boundary in boundaries):
+        raise ValueError("price_buckets must be finite numbers")
+    if not 1 <= len(boundaries) <= max_buckets:
+        raise ValueError(f"price_buckets must have between 1 and {max_buckets} boundaries")
+    if any(low >= high for low, high in zip(boundaries, boundaries[1:])):
+        raise ValueError("price_buckets must be strictly ascending")
+    return boundaries
@@ -0,0 +1,284 @@
+"""Incrementally maintained review statistics for the place leaderboards
+
+Every review write adjusts, in the same transaction:
+
+- ``place.review_count`` / ``place.rating_sum`` and the Bayesian average
+  ``place.rating_score = (C * m + rating_sum) / (C + review_count)``, where the
+  prior mean ``m`` (``RATING_PRIOR_MEAN``) and weight ``C``
+  (``RATING_PRIOR_WEIGHT``) keep places with a handful of reviews from
+  outranking well-established ones;
+- the hourly ``place_review_bucket`` counter of the hour the review was
+  written in;
+- the place's total in ``place_trending`` for each maintained window
+  (``TRENDING_WINDOWS_HOURS``) that counts that hour.
+
+``advance_trending`` (``flask advance-trending``, run hourly) moves each
+maintained window forward, subtracting the buckets that left it, so its
+cost is the number of buckets that expired since the last run. The rating
+leaderboard and an up-to-date maintained window then read the first k
+entries of an index. Any other window, or a maintained one whose job is
+behind, sums the buckets of the window: one per place and hour with
+reviews. Neither reads the review table. ``rebuild_review_stats``
+recomputes everything from the reviews (after bulk loads or a prior
+change).
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app, has_app_context
+from flask.cli import with_appcontext
+from sqlalchemy import bindparam, case, event, func, literal, select, update
+
+from app.models.base_model import db, Place, PlaceReviewBucket, PlaceTrending, Review, TrendingWindow
+from app.persistence.upsert import upsert_increment
+
+DEFAULT_PRIOR_MEAN = 3.0
+DEFAULT_PRIOR_WEIGHT = 5
+DEFAULT_TRENDING_WINDOWS = (24, 7 * 24)
+
+
+def hour_bucket(moment: datetime) -> datetime:
+    """Start of the hour containing ``moment``"""
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _prior():
+    if has_app_context():
+        config = current_app.config
+        return (config.get('RATING_PRIOR_MEAN', DEFAULT_PRIOR_MEAN),
+                config.get('RATING_PRIOR_WEIGHT', DEFAULT_PRIOR_WEIGHT))
+    return DEFAULT_PRIOR_MEAN, DEFAULT_PRIOR_WEIGHT
+
+
+def _apply(connection, place_id, count_delta, rating_delta):
+    """Add to a place's review count and rating sum and recompute its score"""
+    mean, weight = _prior()
+    place = Place.__table__
+    review_count = place.c.review_count + count_delta
+    rating_sum = place.c.rating_sum + rating_delta
+    connection.execute(
+        update(place)
+        .where(place.c.id == place_id)
+        .values(
+            review_count=review_count,
+            rating_sum=rating_sum,
+            rating_score=case(
+                (review_count > 0, (float(weight * mean) + rating_sum) / (weight + review_count)),
+                else_=None),
+        )
+    )
+
+
+def _bucket(connection, place_id, created_at, delta):
+    stmt = upsert_increment(connection.dialect.name, PlaceReviewBucket.__table__,
+                            ('place_id', 'bucket'), ('count',))
+    connection.execute(stmt, {'place_id': place_id,
+                              'bucket': hour_bucket(created_at or datetime.utcnow()),
+                              'count': delta})
+
+
+def _trending_windows():
+    if has_app_context():
+        return tuple(current_app.config.get('TRENDING_WINDOWS_HOURS', DEFAULT_TRENDING_WINDOWS))
+    return DEFAULT_TRENDING_WINDOWS
+
+
+def _trend(connection, place_id, created_at, delta):
+    """Add to the place's totals of the maintained windows counting the review's hour"""
+    window = TrendingWindow.__table__
+    # Shared lock: advance_trending cannot move a window between this read and the write
+    hours = connection.execute(
+        select(window.c.hours)
+        .where(window.c.start <= hour_bucket(created_at or datetime.utcnow()))
+        .with_for_update(read=True)
+    ).scalars().all()
+    if hours:
+        stmt = upsert_increment(connection.dialect.name, PlaceTrending.__table__,
+                                ('hours', 'place_id'), ('reviews',))
+        connection.execute(stmt, [{'hours': value, 'place_id': place_id, 'reviews': delta}
+                                  for value in hours])
+
+
+def review_added(connection, place_id, rating, created_at):
+    _apply(connection, place_id, 1, rating)
+    _bucket(connection, place_id, created_at, 1)
+    _trend(connection, place_id, created_at, 1)
+
+
+def review_rating_changed(connection, place_id, old_rating, new_rating):
+    if old_rating != new_rating:
+        _apply(connection, place_id, 0, new_rating - old_rating)
+
+
+def review_removed(connection, place_id, rating, created_at):
+    _apply(connection, place_id, -1, -rating)
+    _bucket(connection, place_id, created_at, -1)
+    _trend(connection, place_id, created_at, -1)
+
+
+@event.listens_for(Review, 'after_insert')
+def _review_inserted(mapper, connection, review):
+    # ORM inserts (Repository.add, including through the write coordinator)
+    review_added(connection, review.place_id, review.rating, review.created_at)
+
+
+def top_rated(limit: int, options=()):
+    """Places with the best Bayesian rating, best first (reads the score index)"""
+    return (Place.query.options(*options)
+            .filter(Place.rating_score.isnot(None))
+            .order_by(Place.rating_score.desc(), Place.review_count.desc())
+            .limit(limit)
+            .all())
+
+
+def trending(window: timedelta, limit: int, now: datetime = None):
+    """``(place_id, reviews)`` for the places reviewed most in the ``window`` before ``now``
+
+    Reads the first ``limit`` entries of the maintained totals when the window
+    is maintained and advanced to ``now``; otherwise sums the window's buckets.
+    """
+    now = now or datetime.utcnow()
+    start = hour_bucket(now - window)
+    hours = window // timedelta(hours=1)
+    if window == timedelta(hours=hours) and db.session.execute(
+            select(TrendingWindow.start).where(TrendingWindow.hours == hours)).scalar() == start:
+        return db.session.execute(
+            select(PlaceTrending.place_id, PlaceTrending.reviews)
+            .where(PlaceTrending.hours == hours, PlaceTrending.reviews > 0)
+            .order_by(PlaceTrending.reviews.desc())
+            .limit(limit)
+        ).all()
+
+    total = func.sum(PlaceReviewBucket.count).label('reviews')
+    # Bounded on both sides so the planner range-scans the bucket key
+    # instead of walking every bucket in place_id order
+    return db.session.execute(
+        select(PlaceReviewBucket.place_id, total)
+        .where(PlaceReviewBucket.bucket.between(start, hour_bucket(now)))
+        .group_by(PlaceReviewBucket.place_id)
+        .having(total > 0)
+        .order_by(total.desc())
+        .limit(limit)
+    ).all()
+
+
+def advance_trending(now: datetime = None) -> int:
+    """
+    Move every maintained trending window forward to ``now``.
+
+    Subtracts the buckets that left a window since its last move. A window
+    seen for the first time (or whose start is past ``now``) is rebuilt from
+    the buckets, and windows no longer configured are dropped. The caller
+    commits.
+
+    Returns:
+        The number of (place, window) totals changed
+    """
+    now = now or datetime.utcnow()
+    connection = db.session.connection()
+    window, totals, bucket = (TrendingWindow.__table__, PlaceTrending.__table__,
+                              PlaceReviewBucket.__table__)
+    current = dict(connection.execute(select(window.c.hours, window.c.start).with_for_update()).all())
+    configured = set(_trending_windows())
+    for hours in set(current) - configured:
+        connection.execute(totals.delete().where(totals.c.hours == hours))
+        connection.execute(window.delete().where(window.c.hours == hours))
+
+    changed = 0
+    for hours in sorted(configured):
+        start = hour_bucket(now - timedelta(hours=hours))
+        previous = current.get(hours)
+        if previous == start:
+            continue
+        if previous is None or previous > start:
+            connection.execute(totals.delete().where(totals.c.hours == hours))
+            total = func.sum(bucket.c.count)
+            changed += connection.execute(totals.insert().from_select(
+                ['hours', 'place_id', 'reviews'],
+                select(literal(hours), bucket.c.place_id, total)
+                .where(bucket.c.bucket >= start)
+                .group_by(bucket.c.place_id)
+                .having(total > 0))).rowcount
+        else:
+            expired = connection.execute(
+                select(bucket.c.place_id, func.sum(bucket.c.count))
+                .where(bucket.c.bucket >= previous, bucket.c.bucket < start)
+                .group_by(bucket.c.place_id)
+            ).all()
+            if expired:
+                connection.execute(
+                    update(totals)
+                    .where(totals.c.hours == hours, totals.c.place_id == bindparam('expired_place'))
+                    .values(reviews=totals.c.reviews - bindparam('expired_reviews')),
+                    [{'expired_place': place_id, 'expired_reviews': count}
+                     for place_id, count in expired])
+                connection.execute(totals.delete().where(totals.c.hours == hours,
+                                                         totals.c.reviews <= 0))
+            changed += len(expired)
+        if previous is None:
+            connection.execute(window.insert().values(hours=hours, start=start))
+        else:
+            connection.execute(update(window).where(window.c.hours == hours).values(start=start))
+    return changed
+
+
+def rebuild_review_stats(batch_size: int = 5000):
+    """Recompute every place's statistics, the hourly buckets and the trending totals from the reviews"""
+    mean, weight = _prior()
+    place = Place.__table__
+    review = Review.__table__
+    db.session.execute(update(place).values(
+        review_count=select(func.count()).where(review.c.place_id == place.c.id).scalar_subquery(),
+        rating_sum=select(func.coalesce(func.sum(review.c.rating), 0))
+        .where(review.c.place_id == place.c.id).scalar_subquery(),
+    ))
+    db.session.execute(update(place).values(rating_score=None).where(place.c.review_count == 0))
+    db.session.execute(update(place).where(place.c.review_count > 0).values(
+        rating_score=(float(weight * mean) + place.c.rating_sum) / (weight + place.c.review_count)))
+
+    buckets = Counter()
+    for place_id, created_at in db.session.execute(select(review.c.place_id, review.c.created_at)):
+        buckets[place_id, hour_bucket(created_at)] += 1
+    db.session.execute(PlaceReviewBucket.__table__.delete())
+    rows = [{'place_id': place_id, 'bucket': bucket, 'count': count}
+            for (place_id, bucket), count in buckets.items()]
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(PlaceReviewBucket.__table__.insert(), rows[start:start + batch_size])
+    db.session.execute(PlaceTrending.__table__.delete())
+    db.session.execute(TrendingWindow.__table__.delete())
+    advance_trending()
+    db.session.commit()
+    return len(rows)
+
+
+def parse_window(value: str, max_window: timedelta) -> timedelta:
+    """Parse ``7d`` / ``24h`` into a timedelta no longer than ``max_window``"""
+    value = (value or '').strip().lower()
+    if len(value) < 2 or not value[:-1].isdigit() or value[-1] not in 'hd':
+        raise ValueError("window must look like 24h or 7d")
+    amount = int(value[:-1])
+    window = timedelta(hours=amount) if value[-1] == 'h' else timedelta(days=amount)
+    if not timedelta(hours=1) <= window <= max_window:
+        raise ValueError(f"window must be between 1h and {max_window.days}d")
+    return window
+
+
+@click.command("rebuild-leaderboards")
+@with_appcontext
+def rebuild_leaderboards_command():
+    """Recompute place rating scores and trending buckets from all reviews."""
+    db.engine.echo = False
+    buckets = rebuild_review_stats()
+    click.echo(f"Rebuilt review statistics ({buckets} hourly buckets)")
+
+
+@click.command("advance-trending")
+@with_appcontext
+def advance_trending_command():
+    """Subtract the review buckets that left the maintained trending windows (run hourly)."""
+    db.engine.echo = False
+    changed = advance_trending()
+    db.session.commit()
+    click.echo(f"Advanced trending windows ({changed} place totals changed)")
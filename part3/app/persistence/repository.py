@@ -1,5 +1,13 @@
-from app.models.base_model import db, User, Place, Review, Amenity
+from datetime import datetime, timedelta
+from app.models.base_model import db, User, Place, Review, Amenity, RefreshToken, RevokedToken, place_amenity
+from app.persistence import changes, clusters, leaderboard, suggest, trigrams
+from app.persistence.batch import active_batch
+from app.persistence.routing import mark_written, reads_replica, replica_reads
+from app.persistence.writer import write_coordinator
+from sqlalchemy import case, func, select, true
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload, undefer
+from sqlalchemy.orm.exc import StaleDataError
 
 class NotFoundError(Exception):
     pass
@@ -10,19 +18,55 @@ class ConflictError(Exception):
 class ValidationError(Exception):
     pass
 
+class ForbiddenError(Exception):
+    pass
+
+class PreconditionFailedError(Exception):
+    pass
+
 
 class Repository:
     """Base repository for database operations"""
     
+    # Name of the column holding the id of the user a row belongs to (*_owned methods)
+    owner_column = None
+    
+    # Loader options applied per call through the ``profile`` argument:
+    #   list   - what serializing many rows touches
+    #   detail - what serializing one row touches
+    #   write  - the row only (existence and ownership checks)
+    # Relationships are lazy by default, so an empty profile loads no collections.
+    load_profiles = {'list': (), 'detail': (), 'write': ()}
+    
+    # Let read-only calls use a read replica when replicas are configured
+    use_replicas = True
+    
     def __init__(self, model):
         self.model = model
     
+    def _options(self, profile):
+        """Loader options of a named load profile"""
+        if profile is None:
+            return ()
+        try:
+            return self.load_profiles[profile]
+        except KeyError:
+            raise ValueError(f"Unknown load profile {profile!r}")
+    
     def add(self, obj, commit=True):
         """Add an object to the database"""
         try:
-            db.session.add(obj)
-            if commit:
-                db.session.commit()
+            coordinator = write_coordinator()
+            # A batch's writes must stay in its own transaction
+            if commit and coordinator is not None and active_batch(db.session) is None:
+                # Committed by the writer thread; attach it to this request's session
+                coordinator.add(obj)
+                db.session.add(obj)
+                mark_written(db.session)
+            else:
+                db.session.add(obj)
+                if commit:
+                    db.session.commit()
             return obj
         except IntegrityError as e:
             db.session.rollback()
@@ -30,49 +74,174 @@ class Repository:
                 raise ConflictError(f"A {self.model.__name__} with this data already exists")
             raise ValidationError(str(e))
     
-    def get(self, obj_id: str):
-        """Get an object by ID"""
-        obj = self.model.query.get(obj_id)
+    def get(self, obj_id: str, profile: str = None):
+        """Get an object by ID, loading relationships per ``profile``
+        
+        Reads for the ``write`` profile always go to the primary.
+        """
+        with replica_reads(self.use_replicas and profile != 'write'):
+            obj = db.session.get(self.model, obj_id, options=self._options(profile))
         if not obj:
             raise NotFoundError(f"{self.model.__name__} not found")
         return obj
     
-    def list_all(self):
-        """List all objects"""
-        return self.model.query.all()
+    @reads_replica
+    def list_all(self, profile: str = None):
+        """List all objects, loading relationships per ``profile``"""
+        return self.model.query.options(*self._options(profile)).all()
     
-    def update(self, obj_id: str, data: dict):
-        """Update an object"""
-        obj = self.get(obj_id)
+    def update(self, obj_id: str, data: dict, versions=None):
+        """Update an object (only at one of ``versions``, when given)"""
+        obj = self.get(obj_id, profile='write')
+        self._check_version(obj, versions)
         for key, value in data.items():
-            if key != 'id' and hasattr(obj, key):
+            if key not in ('id', 'version') and hasattr(obj, key):
                 setattr(obj, key, value)
         try:
             db.session.commit()
         except IntegrityError as e:
             db.session.rollback()
             raise ConflictError(f"Update failed: {str(e)}")
+        except StaleDataError:
+            db.session.rollback()
+            raise PreconditionFailedError(f"{self.model.__name__} has been modified")
         return obj
     
-    def delete(self, obj_id: str):
-        """Delete an object"""
-        obj = self.get(obj_id)
+    def delete(self, obj_id: str, versions=None):
+        """Delete an object (only at one of ``versions``, when given)"""
+        obj = self.get(obj_id, profile='write')
+        self._check_version(obj, versions)
         db.session.delete(obj)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except StaleDataError:
+            db.session.rollback()
+            raise PreconditionFailedError(f"{self.model.__name__} has been modified")
         return obj
     
     def delete_all(self):
         """Delete all objects (useful for testing)"""
         self.model.query.delete()
         db.session.commit()
+    
+    def update_owned(self, obj_id: str, data: dict, user_id: str, is_admin: bool = False,
+                     versions=None):
+        """
+        Update an object in one statement if ``user_id`` owns it (or is admin).
+        
+        Runs ``UPDATE ... WHERE id = :id AND owner = :user_id`` (the owner
+        condition is dropped for admins) instead of loading the row first.
+        With ``versions`` (from ``If-Match``) the row must also be at one of
+        them. The version is incremented. Keys of ``data`` that are not
+        columns are ignored.
+        
+        Returns:
+            The updated object, freshly loaded
+        
+        Raises:
+            NotFoundError: no row with ``obj_id``
+            ForbiddenError: the row exists but belongs to another user
+            PreconditionFailedError: the row is not at any of ``versions``
+            ConflictError: the update violates a constraint
+        """
+        values = self._update_values(data)
+        values['version'] = self.model.version + 1
+        try:
+            self._before_update(obj_id, values)
+            query = self._owned(obj_id, user_id, is_admin, versions)
+            count = query.update(values, synchronize_session=False)
+            if count == 0:
+                self._raise_no_match(obj_id, user_id, is_admin)
+            changes.record_update(db.session.connection(), self.model, obj_id)
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            raise ConflictError(f"Update failed: {str(e)}")
+        except (NotFoundError, ForbiddenError, PreconditionFailedError):
+            db.session.rollback()
+            raise
+        return db.session.get(self.model, obj_id, options=self._options('detail'),
+                              populate_existing=True)
+    
+    def delete_owned(self, obj_id: str, user_id: str, is_admin: bool = False, versions=None):
+        """
+        Delete an object in one statement if ``user_id`` owns it (or is admin).
+        
+        Child rows are removed by the database (ON DELETE CASCADE). The
+        change log entries of the row and its children are written first.
+        
+        Returns:
+            What ``_before_delete`` returned (what it read of the row, if anything)
+        
+        Raises:
+            NotFoundError: no row with ``obj_id``
+            ForbiddenError: the row exists but belongs to another user
+            PreconditionFailedError: the row is not at any of ``versions``
+        """
+        before = self._before_delete(obj_id)
+        changes.record_delete(db.session.connection(), self.model, obj_id)
+        query = self._owned(obj_id, user_id, is_admin, versions)
+        count = query.delete(synchronize_session=False)
+        if count == 0:
+            db.session.rollback()
+            self._raise_no_match(obj_id, user_id, is_admin)
+        db.session.commit()
+        return before
+    
+    def _before_update(self, obj_id: str, values: dict):
+        """Hook run in update_owned's transaction before the UPDATE
+        
+        Rolled back together with the UPDATE when it matches no row.
+        """
+    
+    def _before_delete(self, obj_id: str):
+        """Hook run in delete_owned's transaction before the DELETE
+        
+        Rolled back together with the DELETE when it matches no row.
+        """
+    
+    def _owned(self, obj_id: str, user_id: str, is_admin: bool, versions=None):
+        """Query for ``obj_id`` restricted to rows ``user_id`` may modify"""
+        query = self.model.query.filter(self.model.id == obj_id)
+        if not is_admin:
+            query = query.filter(getattr(self.model, self.owner_column) == user_id)
+        if versions is not None:
+            query = query.filter(self.model.version.in_(versions))
+        return query
+    
+    def _raise_no_match(self, obj_id: str, user_id: str, is_admin: bool):
+        """Explain why a conditional write matched no row"""
+        owner = db.session.query(getattr(self.model, self.owner_column)).filter(
+            self.model.id == obj_id).first()
+        if owner is None:
+            raise NotFoundError(f"{self.model.__name__} not found")
+        if not is_admin and owner[0] != user_id:
+            raise ForbiddenError(f"{self.model.__name__} belongs to another user")
+        raise PreconditionFailedError(f"{self.model.__name__} has been modified")
+    
+    def _check_version(self, obj, versions):
+        """Raise PreconditionFailedError unless ``obj`` is at one of ``versions``"""
+        if versions is not None and obj.version not in versions:
+            raise PreconditionFailedError(f"{self.model.__name__} has been modified")
+    
+    def _update_values(self, data: dict) -> dict:
+        """Column values for a bulk UPDATE built from request data"""
+        columns = self.model.__table__.columns.keys()
+        values = {key: value for key, value in data.items()
+                  if key in columns and key not in ('id', 'created_at', 'updated_at', 'version')}
+        values['updated_at'] = datetime.utcnow()
+        return values
 
 
 class UserRepository(Repository):
     """Repository for User operations"""
     
+    owner_column = 'id'
+    
     def __init__(self):
         super().__init__(User)
     
+    @reads_replica
     def get_by_email(self, email: str):
         """Get a user by email"""
         user = User.query.filter_by(email=email).first()
@@ -80,6 +249,7 @@ class UserRepository(Repository):
             raise NotFoundError("User not found")
         return user
     
+    @reads_replica
     def email_exists(self, email: str, exclude_id: str = None) -> bool:
         """Check if email already exists"""
         query = User.query.filter_by(email=email)
@@ -89,7 +259,7 @@ class UserRepository(Repository):
     
     def update(self, obj_id: str, data: dict):
         """Update a user, with special handling for password"""
-        user = self.get(obj_id)
+        user = self.get(obj_id, profile='write')
         for key, value in data.items():
             if key != 'id' and hasattr(user, key):
                 if key == 'password':
@@ -103,40 +273,212 @@ class UserRepository(Repository):
             db.session.rollback()
             raise ConflictError(f"Update failed: {str(e)}")
         return user
+    
+    def _update_values(self, data: dict) -> dict:
+        """Hash a new password before it reaches the UPDATE"""
+        values = super()._update_values(data)
+        if 'password' in values:
+            from app import bcrypt
+            values['password'] = bcrypt.generate_password_hash(values['password']).decode('utf-8')
+        return values
+    
+    def _before_delete(self, obj_id: str):
+        """Take the user's reviews and places (removed by the cascade) out of the leaderboards and name indexes"""
+        reviews = db.session.query(Review.place_id, Review.rating, Review.created_at).filter(
+            Review.user_id == obj_id).with_for_update()
+        connection = db.session.connection()
+        for place_id, rating, created_at in reviews:
+            leaderboard.review_removed(connection, place_id, rating, created_at)
+        for (place_id,) in db.session.query(Place.id).filter(Place.owner_id == obj_id):
+            trigrams.record_removal(connection, Place, place_id)
+            suggest.record_removal(db.session, place_id)
 
 
 class PlaceRepository(Repository):
     """Repository for Place operations"""
     
+    owner_column = 'owner_id'
+    
+    # Serializing a place reads only the ids of its amenities and reviews
+    load_profiles = {
+        'list': (selectinload(Place.amenities).load_only(Amenity.id),
+                 selectinload(Place.reviews).load_only(Review.id),
+                 undefer(Place.view_count)),
+        'detail': (selectinload(Place.amenities).load_only(Amenity.id),
+                   selectinload(Place.reviews).load_only(Review.id),
+                   undefer(Place.view_count)),
+        # Relationships are lazy, so the row alone is loaded
+        'write': (),
+    }
+    
     def __init__(self):
         super().__init__(Place)
     
+    @reads_replica
     def get_by_owner(self, owner_id: str):
         """Get all places by owner ID"""
         return Place.query.filter_by(owner_id=owner_id).all()
+    
+    @reads_replica
+    def list_filtered(self, amenity_ids=None, match: str = 'all', limit: int = None,
+                      offset: int = 0, profile: str = 'list'):
+        """
+        List places ordered by id, optionally only those with given amenities.
+        
+        The amenity filter is a relational division over ``place_amenity``,
+        read from its ``(amenity_id, place_id)`` index: ``GROUP BY place_id
+        HAVING COUNT(*) = len(amenity_ids)`` for ``match='all'``, at least
+        one link for ``match='any'``. Only the matching ids are grouped.
+        The page of places is selected in the same statement.
+        """
+        query = Place.query.options(*self._options(profile))
+        if amenity_ids:
+            query = query.filter(Place.id.in_(self._with_amenities(amenity_ids, match)))
+        query = query.order_by(Place.id).offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+    
+    @reads_replica
+    def facets(self, amenity_ids=None, match: str = 'all', price_buckets=(0,)):
+        """
+        Facet counts of the places matching an amenity filter (see ``list_filtered``).
+        
+        Two GROUP BY queries: one over ``place_amenity`` for the amenities, one
+        over ``place`` for the price buckets. Bucket ``i`` holds prices from
+        ``price_buckets[i]`` up to the next boundary. The first bucket also
+        holds anything cheaper, and the last bucket has no upper bound.
+        
+        Returns:
+            dict: ``total``, ``amenities`` (id, name, count; most common first)
+            and ``price_buckets`` (min, max, count)
+        """
+        matching = self._with_amenities(amenity_ids, match) if amenity_ids else None
+        place_filter = Place.id.in_(matching) if matching is not None else true()
+        linked = place_amenity.c.place_id.in_(matching) if matching is not None else true()
+        
+        last = len(price_buckets) - 1
+        counted = select(func.count()).select_from(Place).where(place_filter)
+        if last:
+            bucket = case(*[(Place.price < bound, index)
+                            for index, bound in enumerate(price_buckets[1:])], else_=last)
+            per_bucket = {index: n for n, index in db.session.execute(
+                counted.add_columns(bucket).group_by(bucket))}
+        else:
+            per_bucket = {0: db.session.execute(counted).scalar()}
+        
+        count = func.count().label('count')
+        amenities = db.session.execute(
+            select(Amenity.id, Amenity.name, count)
+            .join(place_amenity, place_amenity.c.amenity_id == Amenity.id)
+            .where(linked)
+            .group_by(Amenity.id, Amenity.name)
+            .order_by(count.desc(), Amenity.name)).all()
+        
+        bounds = list(price_buckets) + [None]
+        return {
+            'total': sum(per_bucket.values()),
+            'amenities': [{'id': amenity_id, 'name': name, 'count': n}
+                          for amenity_id, name, n in amenities],
+            'price_buckets': [{'min': bounds[i], 'max': bounds[i + 1], 'count': per_bucket.get(i, 0)}
+                              for i in range(len(price_buckets))],
+        }
+    
+    @staticmethod
+    def _with_amenities(amenity_ids, match):
+        """Ids of places linked to all (or any) of ``amenity_ids``"""
+        amenity_ids = set(amenity_ids)
+        wanted = len(amenity_ids) if match == 'all' else 1
+        return (select(place_amenity.c.place_id)
+                .where(place_amenity.c.amenity_id.in_(amenity_ids))
+                .group_by(place_amenity.c.place_id)
+                .having(func.count() >= wanted))
+    
+    @reads_replica
+    def clusters(self, bbox, zoom: int, max_clusters: int):
+        """Places of ``bbox`` (west, south, east, north) grouped by map tile"""
+        return clusters.clusters(*bbox, zoom, max_clusters)
+    
+    def _before_update(self, obj_id: str, values: dict):
+        """Refile the place's map cells, name trigrams and name when they change"""
+        clusters.place_changed(db.session.connection(), obj_id, values)
+        trigrams.place_renamed(db.session.connection(), obj_id, values)
+        if 'name' in values:
+            suggest.record_name(db.session, obj_id, values['name'])
+    
+    def _before_delete(self, obj_id: str):
+        """Drop the place from the trigram frequencies, and from the name index once the delete commits"""
+        trigrams.record_removal(db.session.connection(), Place, obj_id)
+        suggest.record_removal(db.session, obj_id)
+    
+    @reads_replica
+    def search(self, query: str, limit: int, threshold: float):
+        """``(place, similarity)`` for the places whose name best matches ``query`` (trigrams)"""
+        return _load_ranked(self, trigrams.search(Place, query, limit, threshold))
+    
+    @reads_replica
+    def top_rated(self, limit: int):
+        """Places with the highest Bayesian average rating"""
+        return leaderboard.top_rated(limit, options=self._options('list'))
+    
+    @reads_replica
+    def trending(self, window: timedelta, limit: int, now: datetime = None):
+        """``(place, reviews)`` for the places reviewed most in the ``window`` before ``now``"""
+        return _load_ranked(self, leaderboard.trending(window, limit, now))
+
+
+def _load_ranked(repo, ranked):
+    """Pair ``(id, score)`` rows with their objects (list profile), keeping the order"""
+    objects = {obj.id: obj for obj in repo.model.query.options(*repo._options('list')).filter(
+        repo.model.id.in_([obj_id for obj_id, _ in ranked]))}
+    return [(objects[obj_id], score) for obj_id, score in ranked if obj_id in objects]
 
 
 class ReviewRepository(Repository):
     """Repository for Review operations"""
     
+    owner_column = 'user_id'
+    
     def __init__(self):
         super().__init__(Review)
     
+    @reads_replica
     def get_by_place(self, place_id: str):
         """Get all reviews for a place"""
         return Review.query.filter_by(place_id=place_id).all()
     
+    @reads_replica
     def get_by_user(self, user_id: str):
         """Get all reviews by a user"""
         return Review.query.filter_by(user_id=user_id).all()
     
+    @reads_replica
     def get_by_user_and_place(self, user_id: str, place_id: str):
         """Get review by user and place"""
         return Review.query.filter_by(user_id=user_id, place_id=place_id).first()
     
+    @reads_replica
     def user_has_reviewed_place(self, user_id: str, place_id: str) -> bool:
         """Check if user has already reviewed a place"""
         return self.get_by_user_and_place(user_id, place_id) is not None
+    
+    def _locked(self, obj_id: str):
+        return db.session.query(Review.place_id, Review.rating, Review.created_at).filter(
+            Review.id == obj_id).with_for_update().first()
+    
+    def _before_update(self, obj_id: str, values: dict):
+        """Move the place's rating statistics to the new rating"""
+        review = self._locked(obj_id) if 'rating' in values else None
+        if review is not None:
+            leaderboard.review_rating_changed(db.session.connection(), review.place_id,
+                                              review.rating, values['rating'])
+    
+    def _before_delete(self, obj_id: str):
+        """Take the review out of the place's statistics; returns its (place_id, rating, created_at)"""
+        review = self._locked(obj_id)
+        if review is not None:
+            leaderboard.review_removed(db.session.connection(), *review)
+        return review
 
 
 class AmenityRepository(Repository):
@@ -145,6 +487,7 @@ class AmenityRepository(Repository):
     def __init__(self):
         super().__init__(Amenity)
     
+    @reads_replica
     def get_by_name(self, name: str):
         """Get amenity by name"""
         amenity = Amenity.query.filter_by(name=name).first()
@@ -152,9 +495,135 @@ class AmenityRepository(Repository):
             raise NotFoundError("Amenity not found")
         return amenity
     
+    @reads_replica
+    def search(self, query: str, limit: int, threshold: float):
+        """``(amenity, similarity)`` for the amenities whose name best matches ``query``
+        
+        Tolerates misspellings, unlike ``get_by_name``.
+        """
+        return _load_ranked(self, trigrams.search(Amenity, query, limit, threshold))
+    
+    @reads_replica
     def name_exists(self, name: str, exclude_id: str = None) -> bool:
         """Check if name already exists"""
         query = Amenity.query.filter_by(name=name)
         if exclude_id:
             query = query.filter(Amenity.id != exclude_id)
         return query.first() is not None
+
+
+class RefreshTokenRepository(Repository):
+    """Repository for issued refresh tokens"""
+    
+    # Token rotation must see the latest state of every token
+    use_replicas = False
+    
+    def __init__(self):
+        super().__init__(RefreshToken)
+    
+    def rotate(self, jti: str, new_token: RefreshToken, grace: timedelta = timedelta(0)) -> bool:
+        """
+        Revoke refresh token ``jti`` and store its replacement in one transaction.
+        
+        The revocation is a conditional UPDATE, so when the same token is
+        presented twice concurrently only one caller wins. A token rotated
+        less than ``grace`` ago stands in for its replacement, which is
+        rotated instead while it is still active (two tabs refreshing together).
+        
+        Returns:
+            bool: False if neither ``jti`` nor its replacement could be rotated
+            (nothing is stored)
+        """
+        now = datetime.utcnow()
+        values = {'revoked_at': now, 'replaced_by': new_token.id}
+        revoked = RefreshToken.query.filter_by(id=jti, revoked_at=None).update(
+            values, synchronize_session=False)
+        if revoked != 1 and grace:
+            successor = db.session.execute(select(RefreshToken.replaced_by).where(
+                RefreshToken.id == jti, RefreshToken.revoked_at >= now - grace)).scalar()
+            if successor is not None:
+                revoked = RefreshToken.query.filter_by(id=successor, revoked_at=None).update(
+                    values, synchronize_session=False)
+        if revoked != 1:
+            db.session.rollback()
+            return False
+        db.session.add(new_token)
+        db.session.commit()
+        return True
+    
+    def revoke(self, jti: str) -> bool:
+        """Revoke a single refresh token; returns False if it was not active"""
+        count = RefreshToken.query.filter_by(id=jti, revoked_at=None).update(
+            {'revoked_at': datetime.utcnow()},
+            synchronize_session=False,
+        )
+        db.session.commit()
+        return count == 1
+    
+    def revoke_all_for_user(self, user_id: str) -> int:
+        """Revoke every active refresh token of a user"""
+        count = RefreshToken.query.filter_by(user_id=user_id, revoked_at=None).update(
+            {'revoked_at': datetime.utcnow()},
+            synchronize_session=False,
+        )
+        db.session.commit()
+        return count
+    
+    def purge_expired(self) -> int:
+        """Delete refresh tokens that have expired, rotated or not"""
+        count = RefreshToken.query.filter(RefreshToken.expires_at <= datetime.utcnow()).delete(
+            synchronize_session=False,
+        )
+        db.session.commit()
+        return count
+
+
+class ChangeLogRepository:
+    """Repository for the change log (app/persistence/changes.py)"""
+    
+    # A replica holds a prefix of the log, so reading one only delays entries
+    use_replicas = True
+    
+    @reads_replica
+    def since(self, seq: int, limit: int):
+        """``(entries, has_more)``: up to ``limit`` entries after ``seq``, oldest first"""
+        return changes.read(seq, limit)
+    
+    @reads_replica
+    def head(self) -> int:
+        """The newest ``seq`` (0 when nothing is logged)"""
+        return changes.head()
+    
+    @reads_replica
+    def oldest(self):
+        """The oldest ``seq`` not pruned yet (None when nothing is logged)"""
+        return changes.oldest()
+
+
+class RevokedTokenRepository:
+    """Repository for revoked JWT identifiers"""
+    
+    def add(self, jti: str, expires_at: datetime):
+        """Record a revoked JTI (revoking twice is a no-op)"""
+        if db.session.get(RevokedToken, jti) is None:
+            db.session.add(RevokedToken(jti=jti, expires_at=expires_at))
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Revoked concurrently by another request
+                db.session.rollback()
+    
+    def active_jtis(self, since: datetime = None):
+        """JTIs that have not expired yet, optionally only those revoked after ``since``"""
+        query = db.session.query(RevokedToken.jti).filter(RevokedToken.expires_at > datetime.utcnow())
+        if since is not None:
+            query = query.filter(RevokedToken.created_at >= since)
+        return [row.jti for row in query]
+    
+    def purge_expired(self) -> int:
+        """Delete revocations of tokens that have expired anyway"""
+        count = RevokedToken.query.filter(RevokedToken.expires_at <= datetime.utcnow()).delete(
+            synchronize_session=False,
+        )
+        db.session.commit()
+        return count
@@ -0,0 +1,132 @@
+"""Read-replica routing for the Flask-SQLAlchemy session
+
+Each URI in ``SQLALCHEMY_REPLICA_URIS`` gets its own engine, kept on the app
+rather than registered as a Flask-SQLAlchemy bind, so ``create_all`` never
+touches the replicas. ``RoutingSession`` sends a statement to a random
+replica only when all of these hold:
+
+- it runs inside ``replica_reads()`` (the read-only repository methods),
+- the session has not written anything in its current lifetime,
+- the client did not write recently (read-your-writes).
+
+Everything else, including every flush, goes to the primary. After a request
+that wrote, a short-lived cookie pins that client's reads to the primary for
+``READ_YOUR_WRITES_SECONDS``, long enough for the replicas to catch up. The
+cookie works across worker processes.
+"""
+
+import contextvars
+import functools
+import random
+import time
+from contextlib import contextmanager
+
+from flask import current_app, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+
+STICKY_COOKIE = 'hbnb_read_primary'
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def replica_reads(enabled: bool = True):
+    """Let statements issued inside the block be served by a replica"""
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def reads_replica(method):
+    """Run a repository read method inside ``replica_reads()``
+
+    Repositories can opt out with ``use_replicas = False``.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with replica_reads(self.use_replicas):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def replica_engines(app) -> list:
+    """The replica engines of ``app`` (empty when none are configured)"""
+    return app.extensions.get('read_replicas', [])
+
+
+def _pinned_to_primary() -> bool:
+    """True while the current client is inside its read-your-writes window"""
+    if not has_request_context():
+        return False
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class RoutingSession(Session):
+    """Session that sends replica-eligible reads to a replica engine"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and _replica_reads.get() and not self._flushing
+                and not self.info.get('wrote') and has_app_context()
+                and not _pinned_to_primary()):
+            replicas = replica_engines(current_app)
+            if replicas:
+                return random.choice(replicas)
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    # While a batch runs (app/persistence/batch.py) it commits once at the
+    # end, and a rollback only undoes the current step
+    def commit(self):
+        if 'batch' in self.info:
+            self.flush()
+        else:
+            super().commit()
+
+    def rollback(self):
+        batch = self.info.get('batch')
+        if batch is not None:
+            batch.rollback_step()
+        else:
+            super().rollback()
+
+
+def mark_written(session):
+    """Record that ``session`` wrote; later reads and the client stick to the primary"""
+    session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_flush(session, flush_context):
+    mark_written(session)
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _mark_bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mark_written(orm_execute_state.session)
+
+
+def init_read_replicas(app, db):
+    """
+    Create the replica engines and the read-your-writes cookie for ``app``.
+
+    Does nothing when ``SQLALCHEMY_REPLICA_URIS`` is empty.
+    """
+    uris = app.config.get('SQLALCHEMY_REPLICA_URIS') or []
+    if not uris:
+        return
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    app.extensions['read_replicas'] = [create_engine(uri, **options) for uri in uris]
+
+    @app.after_request
+    def pin_writer_to_primary(response):
+        if db.session.info.get('wrote'):
+            window = current_app.config.get('READ_YOUR_WRITES_SECONDS', 5)
+            response.set_cookie(STICKY_COOKIE, str(time.time() + window),
+                                max_age=window, httponly=True, samesite='Lax')
+        return response
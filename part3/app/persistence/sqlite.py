@@ -0,0 +1,26 @@
+"""SQLite connection tuning applied through SQLAlchemy engine events"""
+
+from sqlalchemy import event
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """
+    Run ``PRAGMA name=value`` on every new DBAPI connection of ``engine``.
+
+    Args:
+        engine: SQLAlchemy engine; ignored unless it uses the sqlite dialect
+        pragmas: Mapping of pragma name to value (e.g. ``{'journal_mode': 'WAL'}``)
+    """
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    statements = [f"PRAGMA {name}={value}" for name, value in pragmas.items()]
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
@@ -0,0 +1,207 @@
+"""In-process prefix index for place-name autocomplete
+
+``/api/v1/places/suggest?prefix=`` is answered from memory: the distinct
+normalized place names (case-folded, accents and repeated spaces removed)
+are kept in a sorted list, and a prefix lookup is one ``bisect`` followed
+by reading the next ``limit`` names. Each name maps to the places that
+carry it.
+
+The index is loaded from the database on first use. After that it is
+updated on every committed place insert, rename and delete made by this
+process:
+
+- ORM writes are collected in ``after_flush``;
+- ``update_owned`` / ``delete_owned`` report through the repository hooks
+  (``record_name`` / ``record_removal``).
+
+Changes are applied in ``after_commit`` and dropped on rollback. Other
+worker processes pick them up when they reload the index, every
+``SUGGEST_REFRESH_SECONDS``.
+"""
+
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, select
+
+from app.models.base_model import db, Place, User
+from app.persistence.routing import RoutingSession
+
+
+def normalize_name(name: str) -> str:
+    """Case-folded ``name`` without accents and with single spaces"""
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.casefold().split())
+
+
+class PrefixIndex:
+    """Sorted distinct normalized names with the places carrying each"""
+
+    def __init__(self):
+        self._keys = []         # sorted distinct normalized names
+        self._names = {}        # normalized name -> display name
+        self._places = {}       # normalized name -> set of place ids
+        self._by_place = {}     # place id -> normalized name
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._during_load = None
+        self.loaded_at = None
+        self.stale = False
+
+    def __len__(self):
+        return len(self._by_place)
+
+    def needs_load(self, refresh_seconds: float = 0) -> bool:
+        if self.loaded_at is None or self.stale:
+            return True
+        return bool(refresh_seconds) and time.monotonic() >= self.loaded_at + refresh_seconds
+
+    def load(self, read_rows):
+        """
+        Replace the contents with the ``(place_id, name)`` rows of ``read_rows()``.
+
+        Changes applied while the rows are read are replayed on top of them.
+        Only one thread loads at a time. When the index already has contents,
+        other threads keep using them instead of waiting.
+        """
+        first = self.loaded_at is None
+        if not self._load_lock.acquire(blocking=first):
+            return
+        try:
+            if first and self.loaded_at is not None:
+                return  # loaded by the thread we waited for
+            with self._lock:
+                self._during_load = []
+                self.stale = False
+            started = time.monotonic()
+            by_place = {place_id: name for place_id, name in read_rows()}
+            with self._lock:
+                replay, self._during_load = self._during_load, None
+                self._keys, self._names, self._places, self._by_place = [], {}, {}, {}
+                for place_id, name in by_place.items():
+                    self._file(place_id, normalize_name(name), name, sort=False)
+                self._keys.sort()
+                for place_id, name in replay:
+                    self._apply(place_id, name)
+                self.loaded_at = started
+        finally:
+            self._load_lock.release()
+
+    def apply(self, changes):
+        """Apply ``(place_id, name)`` changes (``name=None`` removes the place)"""
+        with self._lock:
+            if self._during_load is not None:
+                self._during_load.extend(changes)
+            for place_id, name in changes:
+                self._apply(place_id, name)
+
+    def suggest(self, prefix: str, limit: int):
+        """
+        Up to ``limit`` names starting with ``prefix`` (after normalization),
+        in alphabetical order.
+
+        Returns:
+            list: ``(name, count, place_id)``; ``place_id`` is set only when
+            one place has the name
+        """
+        prefix = normalize_name(prefix)
+        found = []
+        with self._lock:
+            index = bisect_left(self._keys, prefix)
+            for key in self._keys[index:index + limit]:
+                if not key.startswith(prefix):
+                    break
+                places = self._places[key]
+                found.append((self._names[key], len(places),
+                              next(iter(places)) if len(places) == 1 else None))
+        return found
+
+    def _apply(self, place_id, name):
+        self._unfile(place_id)
+        if name is not None:
+            self._file(place_id, normalize_name(name), name)
+
+    def _file(self, place_id, key, name, sort=True):
+        places = self._places.get(key)
+        if places is None:
+            places = self._places[key] = set()
+            if sort:
+                insort(self._keys, key)
+            else:
+                self._keys.append(key)
+        places.add(place_id)
+        self._names[key] = name
+        self._by_place[place_id] = key
+
+    def _unfile(self, place_id):
+        key = self._by_place.pop(place_id, None)
+        if key is None:
+            return
+        places = self._places[key]
+        places.discard(place_id)
+        if not places:
+            del self._places[key], self._names[key]
+            del self._keys[bisect_left(self._keys, key)]
+
+
+def _read_place_names():
+    return db.session.execute(select(Place.id, Place.name)).all()
+
+
+def place_suggestions():
+    """The current app's prefix index, (re)loaded when due"""
+    index = current_app.extensions.get('place_suggestions')
+    if index is None:
+        index = current_app.extensions.setdefault('place_suggestions', PrefixIndex())
+    if index.needs_load(current_app.config.get('SUGGEST_REFRESH_SECONDS', 0)):
+        index.load(_read_place_names)
+    return index
+
+
+def record_name(session, place_id: str, name: str):
+    """Note a place (re)named in ``session``'s transaction"""
+    session.info.setdefault('suggest_changes', []).append((place_id, name))
+
+
+def record_removal(session, place_id: str):
+    """Note a place deleted in ``session``'s transaction"""
+    record_name(session, place_id, None)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _collect_flush(session, flush_context):
+    for obj in session.new:
+        if isinstance(obj, Place):
+            record_name(session, obj.id, obj.name)
+    for obj in session.dirty:
+        if isinstance(obj, Place) and inspect(obj).attrs.name.history.has_changes():
+            record_name(session, obj.id, obj.name)
+    for obj in session.deleted:
+        if isinstance(obj, Place):
+            record_removal(session, obj.id)
+        elif isinstance(obj, User):
+            # The user's places go with it (ON DELETE CASCADE), unseen by the ORM
+            session.info['suggest_reload'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _apply_changes(session):
+    changes = session.info.pop('suggest_changes', None)
+    reload = session.info.pop('suggest_reload', False)
+    if (changes or reload) and has_app_context():
+        index = current_app.extensions.get('place_suggestions')
+        if index is not None:
+            if changes:
+                index.apply(changes)
+            if reload:
+                index.stale = True
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('suggest_changes', None)
+    session.info.pop('suggest_reload', None)
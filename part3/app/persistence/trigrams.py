@@ -0,0 +1,264 @@
+"""Trigram index for fuzzy place and amenity name search
+
+Names are normalized (as for autocomplete: case-folded, no accents) and
+split into words. Each word, padded with two spaces in front and one
+behind, is cut into overlapping three-character trigrams, as PostgreSQL's
+``pg_trgm`` does. ``"apartmnt"`` and ``"Apartment"`` share 7 of their 12
+distinct trigrams.
+
+Every trigram of a name is a row of ``place_trigram`` / ``amenity_trigram``
+keyed by ``(trigram, id)``. A search looks up the trigrams of the query in
+that key and counts the shared trigrams per name. It ranks names by
+similarity ``shared / (trigrams of name + trigrams of query - shared)``
+(Jaccard). No name without a shared trigram is read, and no edit distance
+is computed.
+
+``trigram_frequency`` counts the names holding each trigram. The postings of
+stop trigrams, held by more than ``FUZZY_SEARCH_STOP_TRIGRAM_SHARE`` of the
+names and by more than ``STOP_TRIGRAM_MIN_ENTRIES`` (``" in"`` in "Loft in
+Paris"), are not read. Candidates are the names sharing enough of the
+query's other trigrams to reach the threshold even if they share every stop
+trigram, and at least one. Only for them are the stop trigrams looked up by
+key. The scores are exact, but a name similar to the query through stop
+trigrams alone is not found.
+
+Rows are written with the place or amenity and rewritten on a rename. They
+are removed by ``ON DELETE CASCADE``, after ``record_removal`` has taken
+them out of the frequencies. ``rebuild_trigrams`` recomputes both after
+bulk loads.
+"""
+
+import math
+import re
+from collections import Counter
+
+import click
+from flask import current_app, has_app_context
+from flask.cli import with_appcontext
+from sqlalchemy import Float, cast, event, func, inspect, select
+
+from app.models.base_model import db, Amenity, AmenityTrigram, Place, PlaceTrigram, TrigramFrequency
+from app.persistence.suggest import normalize_name
+from app.persistence.upsert import upsert_increment
+
+DEFAULT_THRESHOLD = 0.3
+DEFAULT_STOP_SHARE = 0.25
+# Below this many names a trigram is cheap to read, however common it is
+STOP_TRIGRAM_MIN_ENTRIES = 1000
+
+# Longest query and most results of the search endpoints
+MAX_SEARCH_QUERY = 100
+MAX_SEARCH_LIMIT = 50
+
+# Model -> (trigram table, id column of the table, entity in trigram_frequency)
+_INDEXES = {
+    Place: (PlaceTrigram.__table__, PlaceTrigram.__table__.c.place_id, 'place'),
+    Amenity: (AmenityTrigram.__table__, AmenityTrigram.__table__.c.amenity_id, 'amenity'),
+}
+
+# trigram_frequency row counting the indexed names (never a trigram)
+_NAMES = ''
+
+_WORD = re.compile(r'\w+')
+
+
+def trigrams(name: str):
+    """Distinct trigrams of the words of ``name``"""
+    grams = set()
+    for word in _WORD.findall(normalize_name(name)):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a: str, b: str) -> float:
+    """Trigram similarity of two names, 0 (nothing shared) to 1"""
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    shared = len(grams_a & grams_b)
+    return shared / (len(grams_a) + len(grams_b) - shared)
+
+
+def _rows(key, entity_id, name):
+    grams = trigrams(name)
+    return [{'trigram': gram, key: entity_id, 'size': len(grams)} for gram in grams]
+
+
+def _count(connection, entity, deltas: Counter):
+    """Add ``deltas`` (trigram -> names) to the frequencies of ``entity``"""
+    rows = [{'entity': entity, 'trigram': gram, 'entries': delta}
+            for gram, delta in deltas.items() if delta]
+    if rows:
+        stmt = upsert_increment(connection.dialect.name, TrigramFrequency.__table__,
+                                ('entity', 'trigram'), ('entries',))
+        connection.execute(stmt, rows)
+
+
+def _indexed(connection, table, id_column, entity_id):
+    return connection.execute(select(table.c.trigram).where(id_column == entity_id)).scalars().all()
+
+
+def index_name(connection, model, entity_id, name, replace=True):
+    """(Re)write the trigram rows of one place or amenity"""
+    table, id_column, entity = _INDEXES[model]
+    deltas = Counter()
+    if replace:
+        deltas.subtract(_indexed(connection, table, id_column, entity_id))
+        connection.execute(table.delete().where(id_column == entity_id))
+    else:
+        deltas[_NAMES] += 1
+    rows = _rows(id_column.key, entity_id, name)
+    if rows:
+        connection.execute(table.insert(), rows)
+    deltas.update(row['trigram'] for row in rows)
+    _count(connection, entity, deltas)
+
+
+def record_removal(connection, model, entity_id):
+    """Take a place or amenity about to be deleted out of the trigram frequencies"""
+    table, id_column, entity = _INDEXES[model]
+    deltas = Counter({_NAMES: -1})
+    deltas.subtract(_indexed(connection, table, id_column, entity_id))
+    _count(connection, entity, deltas)
+
+
+def place_renamed(connection, place_id, values: dict):
+    """Reindex a place whose name is about to be set to ``values['name']``"""
+    if 'name' in values:
+        index_name(connection, Place, place_id, values['name'])
+
+
+def _inserted(mapper, connection, target):
+    # ORM inserts (Repository.add, including through the write coordinator)
+    index_name(connection, mapper.class_, target.id, target.name, replace=False)
+
+
+def _updated(mapper, connection, target):
+    # ORM updates (Repository.update); update_owned goes through place_renamed
+    if inspect(target).attrs.name.history.has_changes():
+        index_name(connection, mapper.class_, target.id, target.name)
+
+
+def _deleted(mapper, connection, target):
+    # ORM deletes (Repository.delete); delete_owned calls record_removal
+    record_removal(connection, mapper.class_, target.id)
+
+
+for _model in _INDEXES:
+    event.listen(_model, 'after_insert', _inserted)
+    event.listen(_model, 'after_update', _updated)
+    event.listen(_model, 'before_delete', _deleted)
+
+
+def _stop_share():
+    if has_app_context():
+        return current_app.config.get('FUZZY_SEARCH_STOP_TRIGRAM_SHARE', DEFAULT_STOP_SHARE)
+    return DEFAULT_STOP_SHARE
+
+
+def search(model, query: str, limit: int, threshold: float = DEFAULT_THRESHOLD):
+    """
+    Ids of the ``model`` rows whose name is most similar to ``query``.
+
+    Returns:
+        list: ``(id, similarity)``, most similar first, similarity >= ``threshold``
+    """
+    grams = trigrams(query)
+    if not grams:
+        return []
+    table, id_column, entity = _INDEXES[model]
+    # similarity <= shared / len(grams): cheap bound first (the epsilon
+    # keeps 0.3 * 10 = 3.0000000000000004 from requiring 4)
+    needed = math.ceil(threshold * len(grams) - 1e-9)
+
+    frequency = TrigramFrequency.__table__
+    entries = dict(db.session.execute(
+        select(frequency.c.trigram, frequency.c.entries)
+        .where(frequency.c.entity == entity, frequency.c.trigram.in_([*grams, _NAMES]))
+    ).all())
+    cutoff = max(STOP_TRIGRAM_MIN_ENTRIES, _stop_share() * entries.get(_NAMES, 0))
+    stop = sorted(gram for gram in grams if entries.get(gram, 0) > cutoff)
+    if stop and len(stop) < len(grams):
+        return _search_without_stop_postings(table, id_column, grams, stop, needed, limit, threshold)
+
+    shared = func.count()
+    score = (cast(shared, Float) / (func.max(table.c.size) + len(grams) - shared)).label('similarity')
+    return db.session.execute(
+        select(id_column, score)
+        .where(table.c.trigram.in_(grams))
+        .group_by(id_column)
+        .having(shared >= needed)
+        .having(score >= threshold)
+        .order_by(score.desc(), id_column)
+        .limit(limit)
+    ).all()
+
+
+def _search_without_stop_postings(table, id_column, grams, stop, needed, limit, threshold):
+    """``search`` reading the postings of the selective trigrams only
+
+    Candidates share at least one selective trigram, and enough of them to
+    reach ``threshold`` if they also share every stop trigram. Their stop
+    trigrams are then looked up by key, one candidate at a time.
+    """
+    size = func.max(table.c.size)
+    candidates = (
+        select(id_column.label('id'), func.count().label('selective'), size.label('size'))
+        .where(table.c.trigram.in_([gram for gram in grams if gram not in stop]))
+        .group_by(id_column)
+        .having(func.count() >= max(1, needed - len(stop)))
+        .having((func.count() + len(stop)) * (1 + threshold) >= threshold * (size + len(grams)))
+        .cte('candidates')
+    )
+    stop_rows = table.alias('stop_rows')
+    stop_shared = (select(func.count())
+                   .where(stop_rows.c.trigram.in_(stop),
+                          stop_rows.c[id_column.key] == candidates.c.id)
+                   .scalar_subquery())
+    scored = select(candidates.c.id, candidates.c.size,
+                    (candidates.c.selective + stop_shared).label('shared')).subquery('scored')
+    score = cast(scored.c.shared, Float) / (scored.c.size + len(grams) - scored.c.shared)
+    return db.session.execute(
+        select(scored.c.id, score.label('similarity'))
+        .where(scored.c.shared >= needed, score >= threshold)
+        .order_by(score.desc(), scored.c.id)
+        .limit(limit)
+    ).all()
+
+
+def rebuild_trigrams(batch_size: int = 5000):
+    """Recompute the trigram rows and frequencies of every place and amenity"""
+    written = 0
+    db.session.execute(TrigramFrequency.__table__.delete())
+    for model, (table, id_column, entity) in _INDEXES.items():
+        db.session.execute(table.delete())
+        frequencies = Counter()
+        rows = []
+        for entity_id, name in db.session.execute(select(model.id, model.name)).all():
+            frequencies[_NAMES] += 1
+            grams = _rows(id_column.key, entity_id, name)
+            frequencies.update(row['trigram'] for row in grams)
+            rows.extend(grams)
+            if len(rows) >= batch_size:
+                db.session.execute(table.insert(), rows)
+                written += len(rows)
+                rows = []
+        if rows:
+            db.session.execute(table.insert(), rows)
+            written += len(rows)
+        if frequencies:
+            db.session.execute(TrigramFrequency.__table__.insert(), [
+                {'entity': entity, 'trigram': gram, 'entries': count}
+                for gram, count in frequencies.items()])
+    db.session.commit()
+    return written
+
+
+@click.command("rebuild-trigrams")
+@with_appcontext
+def rebuild_trigrams_command():
+    """Recompute the name trigrams of all places and amenities (fuzzy search)."""
+    db.engine.echo = False
+    rows = rebuild_trigrams()
+    click.echo(f"Rebuilt name trigrams ({rows} rows)")
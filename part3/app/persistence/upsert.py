@@ -0,0 +1,35 @@
+"""Dialect-specific "insert or add to" statements for counter tables"""
+
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+
+def upsert_increment(dialect_name, table, key_columns, increment_columns):
+    """
+    Build an INSERT that adds to the existing row on a key conflict.
+
+    Execute it with one dict (or a list of dicts for a batch) holding the
+    key columns and the amounts to add, e.g.
+    ``{'place_id': ..., 'bucket': ..., 'count': 1}``. New rows are inserted
+    with those amounts.
+
+    Args:
+        dialect_name: ``connection.dialect.name`` (sqlite, mysql, mariadb, postgresql)
+        table: Core table with a primary key or unique constraint on ``key_columns``
+        key_columns: Names of the conflict columns
+        increment_columns: Names of the columns to add to
+    """
+    if dialect_name == 'sqlite':
+        stmt = sqlite.insert(table)
+        return stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={name: table.c[name] + stmt.excluded[name] for name in increment_columns})
+    if dialect_name == 'postgresql':
+        stmt = postgresql.insert(table)
+        return stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={name: table.c[name] + stmt.excluded[name] for name in increment_columns})
+    if dialect_name in ('mysql', 'mariadb'):
+        stmt = mysql.insert(table)
+        return stmt.on_duplicate_key_update(
+            {name: table.c[name] + stmt.inserted[name] for name in increment_columns})
+    raise NotImplementedError(f"upsert is not supported for {dialect_name}")
@@ -0,0 +1,137 @@
+"""Buffered place view counters
+
+``GET /api/v1/places/<id>`` only increments an in-process counter, so the
+read path never writes to the database. A background thread per process
+flushes the buffered counts every ``VIEW_COUNTER_FLUSH_SECONDS`` (sooner
+once ``VIEW_COUNTER_MAX_PLACES`` places are pending) as one batched
+``INSERT ... ON CONFLICT DO UPDATE`` into ``place_view_count``.
+
+A crashed process loses at most one flush interval of views. Counts are
+also flushed when the process exits normally. With
+``VIEW_COUNTER_FLUSH_SECONDS = 0`` there is no thread and counts are only
+written by ``flush()``.
+"""
+
+import atexit
+import os
+import threading
+from collections import Counter
+
+from flask import current_app, has_app_context
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app.models.base_model import Place, PlaceViewCount
+from app.persistence.upsert import upsert_increment
+
+
+class ViewCounter:
+    """Count place views in memory and write them out in batches"""
+
+    def __init__(self, app, db, interval: float = 10.0, max_places: int = 10000):
+        self.app = app
+        self.db = db
+        self.interval = interval
+        self.max_places = max(1, max_places)
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid = None
+        self.flushes = 0
+
+    def record(self, place_id: str):
+        """Count one view of ``place_id``"""
+        self._ensure_started()
+        with self._lock:
+            self._counts[place_id] += 1
+            full = len(self._counts) >= self.max_places
+        if full:
+            self._wake.set()
+
+    def pending(self) -> int:
+        """Views counted but not written yet"""
+        with self._lock:
+            return sum(self._counts.values())
+
+    def flush(self) -> int:
+        """Write the buffered counts now; return the number of places written"""
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        if not counts:
+            return 0
+        rows = [{'place_id': place_id, 'count': count} for place_id, count in counts.items()]
+        try:
+            with self.app.app_context():
+                self._write(rows)
+        except Exception:
+            self.app.logger.exception("Flushing %d place view counts failed", len(rows))
+            self._restore(counts)
+            return 0
+        self.flushes += 1
+        return len(rows)
+
+    def _write(self, rows):
+        engine = self.db.engine
+        stmt = upsert_increment(engine.dialect.name, PlaceViewCount.__table__,
+                                ('place_id',), ('count',))
+        try:
+            with engine.begin() as connection:
+                connection.execute(stmt, rows)
+        except IntegrityError:
+            # Some places were deleted since they were viewed
+            with engine.begin() as connection:
+                existing = set(connection.scalars(select(Place.__table__.c.id).where(
+                    Place.__table__.c.id.in_([row['place_id'] for row in rows]))))
+                rows = [row for row in rows if row['place_id'] in existing]
+                if rows:
+                    connection.execute(stmt, rows)
+
+    def _restore(self, counts):
+        """Put back counts that could not be written, within the buffer limit"""
+        with self._lock:
+            for place_id, count in counts.items():
+                if place_id in self._counts or len(self._counts) < self.max_places:
+                    self._counts[place_id] += count
+
+    def _ensure_started(self):
+        # Threads do not survive fork(); start one lazily in each worker.
+        # Without an interval, counts are written by explicit flush() only.
+        if self.interval <= 0 or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._counts = Counter()
+                threading.Thread(target=self._run, name='hbnb-views', daemon=True).start()
+                if self._pid is None:
+                    atexit.register(self.flush)
+                self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+
+def init_view_counter(app, db):
+    """Create the place view counter for ``app`` unless ``VIEW_COUNTER`` is off"""
+    if app.config.get('VIEW_COUNTER', True):
+        app.extensions['view_counter'] = ViewCounter(
+            app, db,
+            interval=app.config.get('VIEW_COUNTER_FLUSH_SECONDS', 10),
+            max_places=app.config.get('VIEW_COUNTER_MAX_PLACES', 10000),
+        )
+
+
+def view_counter():
+    """The current app's view counter, or None when views are not counted"""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('view_counter')
+
+
+def record_view(place_id: str):
+    """Count a detail view of ``place_id`` if view counting is enabled"""
+    counter = view_counter()
+    if counter is not None:
+        counter.record(place_id)
@@ -0,0 +1,137 @@
+"""Single-writer coordinator with group commit
+
+SQLite admits one writer at a time, so concurrent request threads that
+commit on their own mostly wait on each other's locks ("database is
+locked" once ``busy_timeout`` runs out). With ``WRITE_COORDINATOR`` enabled,
+``Repository.add`` hands its write to one writer thread per process. The
+thread drains whatever writes are queued (up to ``WRITE_COORDINATOR_MAX_BATCH``,
+optionally waiting ``WRITE_COORDINATOR_MAX_WAIT_MS`` for more), applies them
+in a single transaction and commits once. Each waiting request thread then
+gets its own result or exception back.
+
+If the group transaction fails (e.g. one insert violates a constraint), it is
+rolled back and the writes are replayed one per transaction, so only the
+offending write fails.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from flask import current_app, has_app_context
+
+
+class WriteCoordinator:
+    """Funnel writes through one thread and commit them in groups"""
+
+    def __init__(self, app, db, max_batch: int = 64, max_wait: float = 0.0):
+        self.app = app
+        self.db = db
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pid = None
+        self.commits = 0
+        self.writes = 0
+
+    def submit(self, job):
+        """
+        Run ``job(session)`` in the writer thread and return its result.
+
+        Blocks until the transaction that contains the job has committed.
+        Exceptions raised by the job or the commit are re-raised here.
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((job, future))
+        return future.result()
+
+    def add(self, obj):
+        """Insert ``obj``; it comes back committed and detached"""
+        def job(session):
+            session.add(obj)
+            return obj
+        return self.submit(job)
+
+    def _ensure_started(self):
+        # Threads do not survive fork(); start one lazily in each worker
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                threading.Thread(target=self._run, name='hbnb-writer', daemon=True).start()
+                self._pid = os.getpid()
+
+    def _run(self):
+        with self.app.app_context():
+            # Committed objects keep their loaded state after expunge, so the
+            # request thread can attach them to its own session
+            session = self.db.session.session_factory(expire_on_commit=False)
+            while True:
+                self._commit_group(session, self._next_batch())
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                timeout = deadline - time.monotonic()
+                if timeout > 0:
+                    batch.append(self._queue.get(timeout=timeout))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _commit_group(self, session, batch):
+        try:
+            results = [job(session) for job, _ in batch]
+            session.commit()
+        except Exception:
+            session.rollback()
+            session.expunge_all()
+            for job, future in batch:
+                self._commit_one(session, job, future)
+            return
+        finally:
+            session.expunge_all()
+        self.commits += 1
+        self.writes += len(batch)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _commit_one(self, session, job, future):
+        try:
+            result = job(session)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            future.set_exception(e)
+        else:
+            self.commits += 1
+            self.writes += 1
+            future.set_result(result)
+        finally:
+            session.expunge_all()
+
+
+def init_write_coordinator(app, db):
+    """Create the write coordinator for ``app`` when ``WRITE_COORDINATOR`` is on"""
+    if app.config.get('WRITE_COORDINATOR'):
+        app.extensions['write_coordinator'] = WriteCoordinator(
+            app, db,
+            max_batch=app.config.get('WRITE_COORDINATOR_MAX_BATCH', 64),
+            max_wait=app.config.get('WRITE_COORDINATOR_MAX_WAIT_MS', 0) / 1000,
+        )
+
+
+def write_coordinator():
+    """The current app's write coordinator, or None when writes are direct"""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('write_coordinator')
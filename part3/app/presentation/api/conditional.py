@@ -0,0 +1,34 @@
+"""Conditional requests: ETag and If-Match over the row ``version`` column
+
+Single-object responses carry the row version as a strong ETag
+(``ETag: "3"``). Clients send it back in ``If-Match`` on ``PUT``/``DELETE``
+and the repository only writes when the row is still at that version, so a
+concurrent change is reported as 412 instead of being overwritten.
+"""
+
+from flask import request
+
+
+def etag(obj) -> str:
+    """Strong ETag for the current version of ``obj``"""
+    return f'"{obj.version}"'
+
+
+def etag_headers(obj) -> dict:
+    """Response headers carrying the ETag of ``obj``"""
+    return {'ETag': etag(obj)}
+
+
+def if_match_versions():
+    """
+    Row versions accepted by the request's ``If-Match`` header.
+
+    Returns:
+        None when the header is absent or ``*`` (the write is unconditional),
+        otherwise the set of versions named by strong tags. The set is empty
+        when no tag names a version, so no row can match.
+    """
+    if_match = request.if_match
+    if not if_match or if_match.star_tag:
+        return None
+    return {int(tag) for tag in if_match.as_set() if tag.isdigit()}
@@ -0,0 +1,76 @@
+"""Fast JSON response representation for the flask-restx Api
+
+Uses orjson when it is installed and falls back to the standard library
+encoder otherwise. Both paths write compact UTF-8 bytes directly and encode
+``datetime``/``date`` values as ISO 8601 strings.
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from flask import make_response
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+
+def _default(obj):
+    """Encode types the stdlib encoder does not handle natively"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (Decimal, UUID)):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def stdlib_dumps(data) -> bytes:
+    """Serialize ``data`` to JSON bytes with the standard library (no orjson)"""
+    return json.dumps(data, default=_default, ensure_ascii=False,
+                      separators=(',', ':')).encode('utf-8')
+
+
+if orjson is not None:
+    def dumps(data) -> bytes:
+        """Serialize ``data`` to JSON bytes"""
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+else:
+    dumps = stdlib_dumps
+
+
+def output_json(data, code, headers=None):
+    """Make a Flask response with a JSON encoded body"""
+    resp = make_response(dumps(data), code)
+    resp.headers.extend(headers or {})
+    resp.mimetype = 'application/json'
+    return resp
+
+
+def register_json_representation(api):
+    """Use :func:`output_json` for ``application/json`` responses of ``api``"""
+    api.representations['application/json'] = output_json
+
+
+def project(data, model):
+    """Return only the keys of ``model`` from ``data`` (missing keys become None)"""
+    return {key: data.get(key) for key in model.resolved}
+
+
+def shaped_with(ns, model, code=200, description=None):
+    """
+    Document a response like ``marshal_with`` without marshalling.
+
+    For endpoints whose views already return dicts with exactly the keys of
+    ``model`` (see ``app.presentation.api.serializers``); the payload is
+    handed to the representation as-is. Field masks (``X-Fields``) are not
+    applied.
+    """
+    return ns.response(code, description or 'Success', model)
+
+
+def shaped_list_with(ns, model, code=200, description=None):
+    """Document a list response like ``marshal_list_with`` without marshalling"""
+    return ns.response(code, description or 'Success', [model])
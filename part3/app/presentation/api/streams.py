@@ -0,0 +1,194 @@
+"""In-process publish/subscribe for Server-Sent Events streams
+
+``GET /api/v1/places/<id>/reviews/stream`` subscribes to the place's topic
+on the app's ``EventHub``. The review endpoints publish to it once their
+write has committed. Every subscriber has a bounded queue. A subscriber that
+falls ``REVIEW_STREAM_QUEUE_SIZE`` events behind is dropped instead of
+making the publisher wait or buffering without limit; its stream ends with
+an ``overflow`` event, and the client reloads the reviews and reconnects.
+
+A message is formatted once per publish, not once per subscriber. An idle
+stream sends a comment line every ``REVIEW_STREAM_HEARTBEAT_SECONDS`` (this
+is how a closed connection is noticed). It ends after
+``REVIEW_STREAM_MAX_SECONDS``, and ``EventSource`` reconnects by itself.
+
+The hub lives in one process: a stream only sees the writes handled by
+that process.
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+
+from flask import Response, current_app, has_app_context, stream_with_context
+
+from app.models.base_model import db
+from app.persistence.batch import run_after_commit
+from app.presentation.api.representations import dumps
+
+# Returned by Subscription.next once the subscriber has been dropped
+DROPPED = object()
+
+# Milliseconds EventSource waits before reconnecting
+RETRY_MS = 3000
+
+
+class SubscriberLimitError(Exception):
+    pass
+
+
+class Subscription:
+    """One subscriber's bounded queue of pending messages"""
+
+    def __init__(self, topic, max_queued: int):
+        self.topic = topic
+        self.max_queued = max(1, max_queued)
+        self.dropped = False
+        self._messages = deque()
+        self._ready = threading.Condition()
+
+    def offer(self, message) -> bool:
+        """Queue ``message``; False (and the subscriber dropped) when the queue is full"""
+        with self._ready:
+            if len(self._messages) >= self.max_queued:
+                self.dropped = True
+                self._messages.clear()
+            else:
+                self._messages.append(message)
+            self._ready.notify()
+            return not self.dropped
+
+    def next(self, timeout: float):
+        """The next message, None after ``timeout`` seconds without one, DROPPED once dropped"""
+        with self._ready:
+            if not self._messages and not self.dropped:
+                self._ready.wait(timeout)
+            if self.dropped:
+                return DROPPED
+            return self._messages.popleft() if self._messages else None
+
+
+class EventHub:
+    """Fan messages out to the subscribers of a topic"""
+
+    def __init__(self, max_queued: int = 64, max_subscribers: int = 1000):
+        self.max_queued = max_queued
+        self.max_subscribers = max_subscribers
+        self._topics = defaultdict(set)
+        self._count = 0
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def subscribe(self, topic) -> Subscription:
+        """
+        Start receiving the messages published to ``topic``.
+
+        Raises:
+            SubscriberLimitError: ``max_subscribers`` are subscribed already
+        """
+        subscription = Subscription(topic, self.max_queued)
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                raise SubscriberLimitError("Too many open streams" if self.max_subscribers
+                                           else "Streams are not served by this server process")
+            self._topics[topic].add(subscription)
+            self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Stop delivering to ``subscription`` (unsubscribing twice is a no-op)"""
+        with self._lock:
+            subscribers = self._topics.get(subscription.topic)
+            if subscribers is not None and subscription in subscribers:
+                subscribers.remove(subscription)
+                self._count -= 1
+                if not subscribers:
+                    del self._topics[subscription.topic]
+
+    def subscribers(self, topic=None) -> int:
+        """Subscribers of ``topic`` (of all topics when None)"""
+        with self._lock:
+            return self._count if topic is None else len(self._topics.get(topic, ()))
+
+    def publish(self, topic, message) -> int:
+        """Queue ``message`` for every subscriber of ``topic``; return how many got it"""
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+        delivered = 0
+        for subscription in subscribers:
+            if subscription.offer(message):
+                delivered += 1
+            else:
+                self.unsubscribe(subscription)
+                self.dropped += 1
+        return delivered
+
+
+def init_review_hub(app):
+    """Create the hub of the review streams of ``app``"""
+    app.extensions['review_hub'] = EventHub(
+        max_queued=app.config.get('REVIEW_STREAM_QUEUE_SIZE', 64),
+        max_subscribers=app.config.get('REVIEW_STREAM_MAX_SUBSCRIBERS', 1000),
+    )
+
+
+def limit_review_streams(app, max_streams: int):
+    """Serve at most ``max_streams`` review streams in this process (0: none)
+
+    Each open stream holds a server thread, so the limit must leave threads
+    for the other requests (see ``post_fork`` in gunicorn.conf.py).
+    """
+    hub = app.extensions['review_hub']
+    hub.max_subscribers = max(0, min(hub.max_subscribers, max_streams))
+
+
+def review_hub():
+    """The current app's review hub, or None outside an app"""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('review_hub')
+
+
+def sse_message(event: str, data) -> str:
+    """One Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {dumps(data).decode('utf-8')}\n\n"
+
+
+def publish_review(event: str, review: dict):
+    """Send a committed review write (``created``, ``updated``, ``deleted``) to its place's streams
+
+    Inside a batch (POST /batch) the event waits for the batch to commit.
+    """
+    hub = review_hub()
+    if hub is None:
+        return
+
+    def publish():
+        if hub.subscribers(review['place_id']):
+            hub.publish(review['place_id'], sse_message(event, review))
+    run_after_commit(db.session, publish)
+
+
+def sse_response(hub: EventHub, subscription: Subscription, heartbeat: float, max_seconds: float):
+    """A ``text/event-stream`` response relaying ``subscription`` until it ends"""
+    def stream():
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            deadline = time.monotonic() + max_seconds
+            while (remaining := deadline - time.monotonic()) > 0:
+                message = subscription.next(min(heartbeat, remaining))
+                if message is DROPPED:
+                    yield sse_message('overflow', {'reason': 'client too slow; reload and reconnect'})
+                    return
+                yield ": ping\n\n" if message is None else message
+        finally:
+            hub.unsubscribe(subscription)
+
+    response = Response(stream_with_context(stream()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # Let nginx pass events through instead of buffering them
+        'X-Accel-Buffering': 'no',
+    })
+    # Also when the client is gone before the stream started
+    response.call_on_close(lambda: hub.unsubscribe(subscription))
+    return response
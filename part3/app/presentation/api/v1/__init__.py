@@ -5,5 +5,8 @@ from app.presentation.api.v1.users import api as users_ns
 from app.presentation.api.v1.places import api as places_ns
 from app.presentation.api.v1.reviews import api as reviews_ns
 from app.presentation.api.v1.amenities import api as amenities_ns
+from app.presentation.api.v1.changes import api as changes_ns
+from app.presentation.api.v1.batch import api as batch_ns
 
-__all__ = ['auth_ns', 'users_ns', 'places_ns', 'reviews_ns', 'amenities_ns']
+__all__ = ['auth_ns', 'users_ns', 'places_ns', 'reviews_ns', 'amenities_ns', 'changes_ns',
+           'batch_ns']
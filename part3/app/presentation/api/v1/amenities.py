@@ -1,5 +1,10 @@
+from flask import current_app
 from flask_restx import Namespace, Resource, fields
-from app.persistence.repository import AmenityRepository, ConflictError, NotFoundError, ValidationError
+from app.persistence.repository import AmenityRepository, ConflictError, NotFoundError, ValidationError, PreconditionFailedError
+from app.persistence.trigrams import MAX_SEARCH_LIMIT, MAX_SEARCH_QUERY
+from app.presentation.api.conditional import etag_headers, if_match_versions
+from app.presentation.api.representations import shaped_with, shaped_list_with
+from app.presentation.api.serializers import compile_serializer
 from app.models.base_model import Amenity
 from app.auth.auth_utils import admin_required
 
@@ -13,20 +18,32 @@ amenity_out = api.inherit("AmenityOut", amenity_in, {
     "id": fields.String,
 })
 
+serialize_amenity = compile_serializer(amenity_out)
+
+amenity_match = api.inherit("AmenityMatch", amenity_out, {
+    # Trigram similarity of the name to the query (0-1)
+    "similarity": fields.Float,
+})
+
+search_parser = api.parser()
+search_parser.add_argument("q", required=True, location="args",
+                           help="Amenity name, misspellings allowed")
+search_parser.add_argument("limit", type=int, default=10, location="args")
+
 @api.route("/")
 class Amenities(Resource):
-    @api.marshal_list_with(amenity_out)
+    @shaped_list_with(api, amenity_out)
     def get(self):
         """List all amenities"""
         try:
             repo = AmenityRepository()
             amenities = repo.list_all()
-            return [amenity.to_dict() for amenity in amenities]
+            return [serialize_amenity(amenity) for amenity in amenities]
         except Exception as e:
             api.abort(500, str(e))
 
     @api.expect(amenity_in, validate=True)
-    @api.marshal_with(amenity_out, code=201)
+    @shaped_with(api, amenity_out, code=201)
     @admin_required
     def post(self):
         """Create a new amenity (Admin only)"""
@@ -42,45 +59,64 @@ class Amenities(Resource):
             
             amenity = Amenity(name=data['name'].strip())
             created_amenity = repo.add(amenity)
-            return created_amenity.to_dict(), 201
+            return serialize_amenity(created_amenity), 201
         except ConflictError as e:
             api.abort(409, str(e))
         except ValidationError as e:
             api.abort(400, str(e))
 
+@api.route("/search")
+class AmenitySearch(Resource):
+    @api.expect(search_parser)
+    @shaped_list_with(api, amenity_match)
+    def get(self):
+        """Amenities whose name resembles a query, most similar first"""
+        args = search_parser.parse_args()
+        if not args['q'].strip() or len(args['q']) > MAX_SEARCH_QUERY:
+            api.abort(400, f"q must have 1 to {MAX_SEARCH_QUERY} characters")
+        if not 1 <= args['limit'] <= MAX_SEARCH_LIMIT:
+            api.abort(400, f"limit must be between 1 and {MAX_SEARCH_LIMIT}")
+        matches = AmenityRepository().search(
+            args['q'], args['limit'], current_app.config.get('FUZZY_SEARCH_THRESHOLD', 0.3))
+        return [dict(serialize_amenity(amenity), similarity=score) for amenity, score in matches]
+
 @api.route("/<string:amenity_id>")
 class AmenityById(Resource):
-    @api.marshal_with(amenity_out)
+    @shaped_with(api, amenity_out)
     def get(self, amenity_id):
         """Get a specific amenity"""
         try:
             repo = AmenityRepository()
             amenity = repo.get(amenity_id)
-            return amenity.to_dict()
+            return serialize_amenity(amenity), 200, etag_headers(amenity)
         except NotFoundError as e:
             api.abort(404, str(e))
 
     @api.expect(amenity_in, validate=True)
-    @api.marshal_with(amenity_out)
+    @shaped_with(api, amenity_out)
     @admin_required
     def put(self, amenity_id):
         """Update an amenity (Admin only)"""
         try:
             data = api.payload
             repo = AmenityRepository()
-            amenity = repo.update(amenity_id, data)
-            return amenity.to_dict()
+            amenity = repo.update(amenity_id, data, versions=if_match_versions())
+            return serialize_amenity(amenity), 200, etag_headers(amenity)
         except NotFoundError as e:
             api.abort(404, str(e))
         except ConflictError as e:
             api.abort(409, str(e))
+        except PreconditionFailedError as e:
+            api.abort(412, str(e))
 
     @admin_required
     def delete(self, amenity_id):
         """Delete an amenity (Admin only)"""
         try:
             repo = AmenityRepository()
-            repo.delete(amenity_id)
+            repo.delete(amenity_id, versions=if_match_versions())
             return {"message": "Amenity deleted successfully"}, 200
         except NotFoundError as e:
             api.abort(404, str(e))
+        except PreconditionFailedError as e:
+            api.abort(412, str(e))
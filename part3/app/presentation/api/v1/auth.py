@@ -1,8 +1,12 @@
 from flask_restx import Namespace, Resource, fields
-from flask import request
-from flask_jwt_extended import create_access_token
-from app.auth.auth_utils import hash_password, verify_password
-from app.persistence.repository import UserRepository, ConflictError, NotFoundError, ValidationError
+from flask import current_app, request
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity, decode_token
+from flask_jwt_extended.config import config as jwt_config
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import PyJWTError
+from datetime import datetime, timedelta
+from app.auth.auth_utils import hash_password, verify_password, create_token_pair, revoke_token, admin_required
+from app.persistence.repository import UserRepository, RefreshTokenRepository, ConflictError, NotFoundError, ValidationError
 from app.models.base_model import db, User
 
 api = Namespace("auth", description="Authentication operations")
@@ -21,9 +25,24 @@ register_model = api.model("Register", {
 
 token_response = api.model("TokenResponse", {
     "access_token": fields.String(description="JWT access token"),
+    "refresh_token": fields.String(description="JWT refresh token (single use, see /auth/refresh)"),
     "user_id": fields.String(description="User ID"),
 })
 
+logout_model = api.model("Logout", {
+    "refresh_token": fields.String(required=False, description="Refresh token to revoke as well"),
+})
+
+revoke_model = api.model("Revoke", {
+    "jti": fields.String(required=False, description="JTI of the token to revoke"),
+    "user_id": fields.String(required=False, description="Revoke every refresh token of this user"),
+})
+
+
+def _expires_at(claims):
+    """Expiry of a decoded token as a naive UTC datetime"""
+    return datetime.utcfromtimestamp(claims['exp'])
+
 @api.route("/register")
 class Register(Resource):
     @api.expect(register_model, validate=True)
@@ -61,14 +80,13 @@ class Register(Resource):
             
             repo.add(user)
             
-            # Generate JWT token with is_admin claim
-            access_token = create_access_token(
-                identity=str(user.id),
-                additional_claims={"is_admin": user.is_admin}
-            )
+            # Generate JWT tokens (access token carries the is_admin claim)
+            access_token, refresh_token, record = create_token_pair(user)
+            RefreshTokenRepository().add(record)
             
             return {
                 "access_token": access_token,
+                "refresh_token": refresh_token,
                 "user_id": user.id,
             }, 201
         except ConflictError as e:
@@ -101,16 +119,101 @@ class Login(Resource):
             if not user.verify_password(data['password']):
                 api.abort(401, "Invalid email or password")
             
-            # Step 3: Generate JWT token with is_admin claim
-            access_token = create_access_token(
-                identity=str(user.id),
-                additional_claims={"is_admin": user.is_admin}
-            )
+            # Step 3: Generate JWT tokens (access token carries the is_admin claim)
+            access_token, refresh_token, record = create_token_pair(user)
+            RefreshTokenRepository().add(record)
             
-            # Step 4: Return the token
+            # Step 4: Return the tokens
             return {
                 "access_token": access_token,
+                "refresh_token": refresh_token,
                 "user_id": user.id,
             }, 200
         except Exception as e:
             api.abort(500, str(e))
+
+@api.route("/refresh")
+class Refresh(Resource):
+    @api.marshal_with(token_response, code=200)
+    @jwt_required(refresh=True)
+    def post(self):
+        """Exchange a refresh token for a new access/refresh token pair (no password check)"""
+        jti = get_jwt()["jti"]
+        token_repo = RefreshTokenRepository()
+        try:
+            token = token_repo.get(jti)
+        except NotFoundError:
+            api.abort(401, "Invalid refresh token")
+        
+        grace = timedelta(seconds=current_app.config.get('REFRESH_TOKEN_REUSE_GRACE_SECONDS', 0))
+        if token.revoked_at is not None and (
+                token.replaced_by is None or token.revoked_at < datetime.utcnow() - grace):
+            # A rotated token was presented again after the grace window (or
+            # a revoked one at all): treat it as stolen and end every session
+            # of that user
+            token_repo.revoke_all_for_user(token.user_id)
+            api.abort(401, "Refresh token has been revoked")
+        
+        # Re-read the user so is_admin changes apply to the new access token
+        try:
+            user = UserRepository().get(get_jwt_identity())
+        except NotFoundError:
+            api.abort(401, "Invalid refresh token")
+        
+        access_token, refresh_token, record = create_token_pair(user)
+        if not token_repo.rotate(jti, record, grace):
+            api.abort(401, "Refresh token has been revoked")
+        
+        return {
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "user_id": user.id,
+        }, 200
+
+@api.route("/logout")
+class Logout(Resource):
+    @api.expect(logout_model, validate=False)
+    @jwt_required()
+    def post(self):
+        """Revoke the current access token (and the given refresh token)"""
+        claims = get_jwt()
+        revoke_token(claims['jti'], _expires_at(claims))
+        
+        data = request.get_json(silent=True) or {}
+        if data.get('refresh_token'):
+            try:
+                refresh_claims = decode_token(data['refresh_token'])
+            except (PyJWTError, JWTExtendedException):
+                api.abort(400, "Invalid refresh token")
+            if refresh_claims.get('type') != 'refresh' or refresh_claims.get('sub') != get_jwt_identity():
+                api.abort(400, "Invalid refresh token")
+            RefreshTokenRepository().revoke(refresh_claims['jti'])
+            revoke_token(refresh_claims['jti'], _expires_at(refresh_claims))
+        
+        return {"message": "Logged out successfully"}, 200
+
+@api.route("/revoke")
+class Revoke(Resource):
+    @api.expect(revoke_model, validate=True)
+    @admin_required
+    def post(self):
+        """Revoke a token by JTI and/or all refresh tokens of a user (Admin only)"""
+        data = api.payload or {}
+        if not data.get('jti') and not data.get('user_id'):
+            api.abort(400, "jti or user_id is required")
+        
+        token_repo = RefreshTokenRepository()
+        if data.get('jti'):
+            # The token itself is not available: keep the revocation for the
+            # longest lifetime a token can have
+            lifetime = max(jwt_config.access_expires or timedelta(0),
+                           jwt_config.refresh_expires or timedelta(0))
+            token_repo.revoke(data['jti'])
+            revoke_token(data['jti'], datetime.utcnow() + lifetime)
+        
+        revoked_sessions = 0
+        if data.get('user_id'):
+            # Access tokens already issued stay valid until they expire
+            revoked_sessions = token_repo.revoke_all_for_user(data['user_id'])
+        
+        return {"message": "Token(s) revoked", "revoked_sessions": revoked_sessions}, 200
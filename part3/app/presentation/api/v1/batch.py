@@ -0,0 +1,150 @@
+import time
+
+from flask import current_app, request
+from flask_restx import Namespace, Resource, fields
+from flask_jwt_extended import jwt_required
+from sqlalchemy.exc import IntegrityError
+from werkzeug.test import EnvironBuilder
+from app.models.base_model import db
+from app.persistence.batch import Batch
+from app.presentation.api.representations import shaped_with
+
+api = Namespace("batch", description="Several API requests in one transaction")
+
+METHODS = ("GET", "POST", "PUT", "DELETE")
+
+# Resources a batch can address; auth, streams and batches cannot be nested
+PATH_PREFIXES = ("/api/v1/users/", "/api/v1/places/", "/api/v1/reviews/", "/api/v1/amenities/")
+
+batch_request = api.model("BatchRequest", {
+    "method": fields.String(required=True, enum=list(METHODS)),
+    # e.g. /api/v1/places/<id> (a query string is allowed)
+    "path": fields.String(required=True),
+    # JSON body of POST / PUT
+    "body": fields.Raw,
+    # Sent as If-Match (see the ETag of GET)
+    "if_match": fields.String,
+})
+
+batch_in = api.model("BatchIn", {
+    "requests": fields.List(fields.Nested(batch_request), required=True),
+    # Commit nothing if any request fails; the rest are not run
+    "atomic": fields.Boolean(default=False),
+})
+
+batch_result = api.model("BatchResult", {
+    "status": fields.Integer,
+    # The JSON response, None when it has none
+    "body": fields.Raw,
+})
+
+batch_out = api.model("BatchOut", {
+    # False when an atomic batch was rolled back
+    "committed": fields.Boolean,
+    "results": fields.List(fields.Nested(batch_result)),
+})
+
+NOT_RUN = {"status": 424, "body": {"message": "Not run: an earlier request of the atomic batch failed"}}
+
+OUT_OF_TIME = {"status": 503, "body": {"message": "Not run: the batch ran out of time"}}
+
+
+def _check(item):
+    """Reason ``item`` cannot be run, None when it can"""
+    method = item['method'].upper()
+    path = item['path'].partition('?')[0]
+    if method not in METHODS:
+        return f"method must be one of {', '.join(METHODS)}"
+    if (not (path + '/').startswith(PATH_PREFIXES) or path.endswith('/stream')
+            or '/..' in path):
+        return f"path {item['path']!r} cannot be used in a batch"
+    if method in ("POST", "PUT") and not isinstance(item.get('body'), dict):
+        return f"{method} {item['path']} needs a JSON object body"
+    return None
+
+
+def _dispatch(item):
+    """Run one request through the app's own routing, on this request's session"""
+    path, _, query = item['path'].partition('?')
+    headers = {}
+    if request.headers.get('Authorization'):
+        headers['Authorization'] = request.headers['Authorization']
+    if item.get('if_match'):
+        headers['If-Match'] = item['if_match']
+    method = item['method'].upper()
+    builder = EnvironBuilder(path=path, query_string=query, method=method, headers=headers,
+                             base_url=request.host_url,
+                             json=item['body'] if method in ("POST", "PUT") else None)
+    try:
+        # Shares the app context, so the request's session and transaction
+        with current_app.request_context(builder.get_environ()):
+            response = current_app.full_dispatch_request()
+    except Exception:
+        current_app.logger.exception("Batch request %s %s failed", method, item['path'])
+        return {"status": 500, "body": {"message": "Internal server error"}}
+    finally:
+        builder.close()
+    return {"status": response.status_code, "body": response.get_json(silent=True)}
+
+
+@api.route("/")
+class BatchRequests(Resource):
+    # Validated in post(), once the size of the body is known to be within limits
+    @api.expect(batch_in)
+    @shaped_with(api, batch_out)
+    @api.response(411, "The request has no Content-Length")
+    @api.response(413, "Too many requests in the batch, or the body is too large")
+    @jwt_required()
+    def post(self):
+        """Run several requests in order, in one database transaction"""
+        max_bytes = current_app.config.get('BATCH_MAX_BYTES', 1024 * 1024)
+        max_requests = current_app.config.get('BATCH_MAX_REQUESTS', 50)
+        max_seconds = current_app.config.get('BATCH_MAX_SECONDS', 2)
+        # The JSON parser reads at most Content-Length bytes; a chunked body has none
+        if request.content_length is None:
+            api.abort(411, "A batch needs a Content-Length")
+        if request.content_length > max_bytes:
+            api.abort(413, f"A batch body is limited to {max_bytes} bytes")
+        batch_in.validate(api.payload, self.api.refresolver, self.api.format_checker)
+        items = api.payload['requests']
+        if not items:
+            api.abort(400, "requests must not be empty")
+        if len(items) > max_requests:
+            api.abort(413, f"A batch holds at most {max_requests} requests")
+        for index, item in enumerate(items):
+            problem = _check(item)
+            if problem:
+                api.abort(400, f"requests[{index}]: {problem}")
+        atomic = api.payload.get('atomic', False)
+
+        batch = Batch(db.session())
+        batch.begin(writes=any(item['method'].upper() != "GET" for item in items))
+        # Bounds how long the batch holds the write lock (checked between requests)
+        deadline = time.monotonic() + max_seconds
+        results, failed = [], False
+        try:
+            for index, item in enumerate(items):
+                if failed and atomic:
+                    results.append(NOT_RUN)
+                    continue
+                if index and time.monotonic() > deadline:
+                    results.append(OUT_OF_TIME)
+                    failed = True
+                    continue
+                batch.begin_step()
+                result = _dispatch(item)
+                batch.end_step(result['status'] < 400)
+                failed = failed or result['status'] >= 400
+                results.append(result)
+            committed = not (failed and atomic)
+            if committed:
+                batch.commit()
+            else:
+                batch.rollback()
+        except IntegrityError as e:
+            batch.rollback()
+            api.abort(409, f"Batch failed to commit: {str(e)}")
+        except Exception:
+            batch.rollback()
+            raise
+        return {"committed": committed, "results": results}
@@ -0,0 +1,69 @@
+from flask import current_app
+from flask_restx import Namespace, Resource, fields
+from app.persistence.changes import compact
+from app.persistence.repository import ChangeLogRepository
+from app.presentation.api.representations import shaped_with
+from app.presentation.api.serializers import compile_serializer
+
+api = Namespace("changes", description="Change feed for incremental sync")
+
+change_out = api.model("Change", {
+    "seq": fields.Integer,
+    # user, place, review or amenity
+    "entity": fields.String,
+    "id": fields.String(attribute="entity_id"),
+    # upsert (refetch the row) or delete (drop it)
+    "op": fields.String,
+    "at": fields.DateTime(attribute="changed_at"),
+})
+
+serialize_change = compile_serializer(change_out)
+
+changes_out = api.model("Changes", {
+    # The last change of each row within the page, oldest first
+    "changes": fields.List(fields.Nested(change_out)),
+    # Pass as ``since`` for the next page
+    "next": fields.Integer,
+    "has_more": fields.Boolean,
+})
+
+head_out = api.model("ChangesHead", {
+    "seq": fields.Integer,
+})
+
+changes_parser = api.parser()
+changes_parser.add_argument("since", type=int, default=0, location="args",
+                            help="seq of the last change already applied")
+changes_parser.add_argument("limit", type=int, default=100, location="args")
+
+@api.route("/")
+class Changes(Resource):
+    @api.expect(changes_parser)
+    @shaped_with(api, changes_out)
+    @api.response(410, "Changes after since were pruned; sync again from the full lists")
+    def get(self):
+        """Changes to users, places, reviews and amenities after a seq"""
+        args = changes_parser.parse_args()
+        max_page = current_app.config.get('CHANGES_MAX_PAGE', 1000)
+        if args['since'] < 0:
+            api.abort(400, "since must not be negative")
+        if not 1 <= args['limit'] <= max_page:
+            api.abort(400, f"limit must be between 1 and {max_page}")
+        repo = ChangeLogRepository()
+        entries, has_more = repo.since(args['since'], args['limit'])
+        # A gap after since is either rolled back writes or pruned entries
+        if args['since'] and entries and entries[0].seq > args['since'] + 1 \
+                and repo.oldest() == entries[0].seq:
+            api.abort(410, "Changes after since were pruned; sync again from the full lists")
+        return {
+            "changes": [serialize_change(entry) for entry in compact(entries)],
+            "next": entries[-1].seq if entries else args['since'],
+            "has_more": has_more,
+        }
+
+@api.route("/head")
+class ChangesHead(Resource):
+    @shaped_with(api, head_out)
+    def get(self):
+        """The newest seq: read it, then the full lists, then changes since it"""
+        return {"seq": ChangeLogRepository().head()}
@@ -1,7 +1,19 @@
+from datetime import timedelta
+from flask import current_app
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from app.persistence.repository import PlaceRepository, AmenityRepository, UserRepository, ConflictError, NotFoundError, ValidationError
+from app.persistence.repository import PlaceRepository, AmenityRepository, UserRepository, ConflictError, NotFoundError, ValidationError, ForbiddenError, PreconditionFailedError
+from app.presentation.api.conditional import etag_headers, if_match_versions
+from app.presentation.api.representations import shaped_with, shaped_list_with
+from app.presentation.api.serializers import compile_serializer
+from app.presentation.api.streams import SubscriberLimitError, review_hub, sse_response
 from app.models.base_model import db, Place
+from app.persistence.clusters import MAX_ZOOM, parse_bbox
+from app.persistence.facets import facet_cache, parse_price_buckets
+from app.persistence.leaderboard import parse_window
+from app.persistence.suggest import place_suggestions
+from app.persistence.trigrams import MAX_SEARCH_LIMIT, MAX_SEARCH_QUERY
+from app.persistence.views import record_view
 
 api = Namespace("places", description="Places operations")
 
@@ -18,22 +30,133 @@ place_out = api.inherit("PlaceOut", place_in, {
     "owner_id": fields.String,
     "amenity_ids": fields.List(fields.String),
     "review_ids": fields.List(fields.String),
+    # Detail views, updated every VIEW_COUNTER_FLUSH_SECONDS
+    "view_count": fields.Integer,
 })
 
+serialize_place = compile_serializer(place_out, sources={
+    "amenity_ids": "[amenity.id for amenity in obj.amenities]",
+    "review_ids": "[review.id for review in obj.reviews]",
+})
+
+place_ranked = api.inherit("PlaceRanked", place_out, {
+    "review_count": fields.Integer,
+    # Bayesian average rating (by=rating) or reviews in the window (by=trending)
+    "score": fields.Float,
+})
+
+list_parser = api.parser()
+list_parser.add_argument("amenities", location="args",
+                         help="Comma-separated amenity ids the places must have")
+list_parser.add_argument("match", choices=("all", "any"), default="all", location="args",
+                         help="Require all of the amenities, or any of them")
+list_parser.add_argument("limit", type=int, location="args")
+list_parser.add_argument("offset", type=int, default=0, location="args")
+
+MAX_AMENITY_FILTER = 20
+
+facets_parser = list_parser.copy()
+facets_parser.remove_argument("limit")
+facets_parser.remove_argument("offset")
+facets_parser.add_argument("price_buckets", location="args",
+                           help="Ascending bucket boundaries, e.g. 0,50,100,200")
+
+amenity_facet = api.model("AmenityFacet", {
+    "id": fields.String,
+    "name": fields.String,
+    "count": fields.Integer,
+})
+
+price_facet = api.model("PriceFacet", {
+    "min": fields.Float,
+    # None for the last, open-ended bucket
+    "max": fields.Float,
+    "count": fields.Integer,
+})
+
+facets_out = api.model("PlaceFacets", {
+    "total": fields.Integer,
+    "amenities": fields.List(fields.Nested(amenity_facet)),
+    "price_buckets": fields.List(fields.Nested(price_facet)),
+})
+
+clusters_parser = api.parser()
+clusters_parser.add_argument("bbox", required=True, location="args",
+                             help="west,south,east,north in degrees")
+clusters_parser.add_argument("zoom", type=int, required=True, location="args",
+                             help=f"Map zoom level (0-{MAX_ZOOM})")
+
+place_cluster = api.model("PlaceCluster", {
+    "count": fields.Integer,
+    # Mean position of the places in the cluster
+    "latitude": fields.Float,
+    "longitude": fields.Float,
+    "min_price": fields.Float,
+    # Set only for clusters of a single place
+    "place_id": fields.String,
+})
+
+clusters_out = api.model("PlaceClusters", {
+    # Zoom level of the tiles the places were grouped by
+    "level": fields.Integer,
+    "clusters": fields.List(fields.Nested(place_cluster)),
+})
+
+suggest_parser = api.parser()
+suggest_parser.add_argument("prefix", required=True, location="args",
+                            help="Beginning of a place name (case and accents are ignored)")
+suggest_parser.add_argument("limit", type=int, default=10, location="args")
+
+place_suggestion = api.model("PlaceSuggestion", {
+    "name": fields.String,
+    # Places with this name; place_id is set only when there is one
+    "count": fields.Integer,
+    "place_id": fields.String,
+})
+
+search_parser = api.parser()
+search_parser.add_argument("q", required=True, location="args",
+                           help="Place name, misspellings allowed")
+search_parser.add_argument("limit", type=int, default=10, location="args")
+
+place_match = api.inherit("PlaceMatch", place_out, {
+    # Trigram similarity of the name to the query (0-1)
+    "similarity": fields.Float,
+})
+
+top_parser = api.parser()
+top_parser.add_argument("by", choices=("rating", "trending"), default="rating", location="args")
+top_parser.add_argument("window", default="7d", location="args",
+                        help="Trending window, e.g. 24h or 7d")
+top_parser.add_argument("limit", type=int, default=10, location="args")
+
 @api.route("/")
 class Places(Resource):
-    @api.marshal_list_with(place_out)
+    @api.expect(list_parser)
+    @shaped_list_with(api, place_out)
     def get(self):
-        """List all places"""
+        """List places, optionally filtered by amenities and paginated"""
+        args = list_parser.parse_args()
+        amenity_ids = [a.strip() for a in (args['amenities'] or '').split(',') if a.strip()]
+        if len(amenity_ids) > MAX_AMENITY_FILTER:
+            api.abort(400, f"at most {MAX_AMENITY_FILTER} amenities can be filtered on")
+        if args['limit'] is not None and not 1 <= args['limit'] <= 1000:
+            api.abort(400, "limit must be between 1 and 1000")
+        if args['offset'] < 0:
+            api.abort(400, "offset must not be negative")
         try:
             repo = PlaceRepository()
-            places = repo.list_all()
-            return [place.to_dict() for place in places]
+            if amenity_ids or args['limit'] is not None or args['offset']:
+                places = repo.list_filtered(amenity_ids, args['match'],
+                                            args['limit'], args['offset'])
+            else:
+                places = repo.list_all(profile='list')
+            return [serialize_place(place) for place in places]
         except Exception as e:
             api.abort(500, str(e))
 
     @api.expect(place_in, validate=True)
-    @api.marshal_with(place_out, code=201)
+    @shaped_with(api, place_out, code=201)
     @jwt_required()
     def post(self):
         """Create a new place"""
@@ -65,26 +188,116 @@ class Places(Resource):
             
             repo = PlaceRepository()
             created_place = repo.add(place)
-            return created_place.to_dict(), 201
+            return serialize_place(created_place), 201
         except ConflictError as e:
             api.abort(409, str(e))
         except ValidationError as e:
             api.abort(400, str(e))
 
+@api.route("/facets")
+class PlaceFacets(Resource):
+    @api.expect(facets_parser)
+    @shaped_with(api, facets_out)
+    def get(self):
+        """Amenity and price bucket counts of the places matching a filter"""
+        args = facets_parser.parse_args()
+        amenity_ids = sorted({a.strip() for a in (args['amenities'] or '').split(',') if a.strip()})
+        if len(amenity_ids) > MAX_AMENITY_FILTER:
+            api.abort(400, f"at most {MAX_AMENITY_FILTER} amenities can be filtered on")
+        try:
+            buckets = (parse_price_buckets(args['price_buckets']) if args['price_buckets']
+                       else [float(b) for b in current_app.config.get('FACET_PRICE_BUCKETS', [0])])
+        except ValueError as e:
+            api.abort(400, str(e))
+        match = args['match'] if amenity_ids else 'all'
+        repo = PlaceRepository()
+        return facet_cache().get_or_compute(
+            (tuple(amenity_ids), match, tuple(buckets)),
+            lambda: repo.facets(amenity_ids, match, buckets))
+
+@api.route("/clusters")
+class PlaceClusters(Resource):
+    @api.expect(clusters_parser)
+    @shaped_with(api, clusters_out)
+    def get(self):
+        """Places of a map bounding box grouped into grid cells"""
+        args = clusters_parser.parse_args()
+        if not 0 <= args['zoom'] <= MAX_ZOOM:
+            api.abort(400, f"zoom must be between 0 and {MAX_ZOOM}")
+        try:
+            bbox = parse_bbox(args['bbox'])
+        except ValueError as e:
+            api.abort(400, str(e))
+        return PlaceRepository().clusters(
+            bbox, args['zoom'], current_app.config.get('MAX_PLACE_CLUSTERS', 500))
+
+@api.route("/suggest")
+class PlaceSuggestions(Resource):
+    @api.expect(suggest_parser)
+    @shaped_list_with(api, place_suggestion)
+    def get(self):
+        """Place names starting with a prefix, for autocomplete"""
+        args = suggest_parser.parse_args()
+        max_results = current_app.config.get('SUGGEST_MAX_RESULTS', 20)
+        if not 1 <= args['limit'] <= max_results:
+            api.abort(400, f"limit must be between 1 and {max_results}")
+        if not args['prefix'].strip():
+            api.abort(400, "prefix must not be empty")
+        return [{'name': name, 'count': count, 'place_id': place_id}
+                for name, count, place_id in place_suggestions().suggest(args['prefix'], args['limit'])]
+
+@api.route("/search")
+class PlaceSearch(Resource):
+    @api.expect(search_parser)
+    @shaped_list_with(api, place_match)
+    def get(self):
+        """Places whose name resembles a query, most similar first"""
+        args = search_parser.parse_args()
+        if not args['q'].strip() or len(args['q']) > MAX_SEARCH_QUERY:
+            api.abort(400, f"q must have 1 to {MAX_SEARCH_QUERY} characters")
+        if not 1 <= args['limit'] <= MAX_SEARCH_LIMIT:
+            api.abort(400, f"limit must be between 1 and {MAX_SEARCH_LIMIT}")
+        matches = PlaceRepository().search(
+            args['q'], args['limit'], current_app.config.get('FUZZY_SEARCH_THRESHOLD', 0.3))
+        return [dict(serialize_place(place), similarity=score) for place, score in matches]
+
+@api.route("/top")
+class TopPlaces(Resource):
+    @api.expect(top_parser)
+    @shaped_list_with(api, place_ranked)
+    def get(self):
+        """Best rated places, or the places reviewed most within a recent window"""
+        args = top_parser.parse_args()
+        if not 1 <= args['limit'] <= 100:
+            api.abort(400, "limit must be between 1 and 100")
+        repo = PlaceRepository()
+        if args['by'] == 'rating':
+            ranked = [(place, place.rating_score) for place in repo.top_rated(args['limit'])]
+        else:
+            max_window = timedelta(days=current_app.config.get('TRENDING_MAX_WINDOW_DAYS', 30))
+            try:
+                window = parse_window(args['window'], max_window)
+            except ValueError as e:
+                api.abort(400, str(e))
+            ranked = repo.trending(window, args['limit'])
+        return [dict(serialize_place(place), review_count=place.review_count, score=score)
+                for place, score in ranked]
+
 @api.route("/<string:place_id>")
 class PlaceById(Resource):
-    @api.marshal_with(place_out)
+    @shaped_with(api, place_out)
     def get(self, place_id):
         """Get a specific place"""
         try:
             repo = PlaceRepository()
-            place = repo.get(place_id)
-            return place.to_dict()
+            place = repo.get(place_id, profile='detail')
+            record_view(place.id)
+            return serialize_place(place), 200, etag_headers(place)
         except NotFoundError as e:
             api.abort(404, str(e))
 
     @api.expect(place_in, validate=False)
-    @api.marshal_with(place_out)
+    @shaped_with(api, place_out)
     @jwt_required()
     def put(self, place_id):
         """Update a place"""
@@ -93,18 +306,19 @@ class PlaceById(Resource):
             claims = get_jwt()
             is_admin = claims.get('is_admin', False)
             
-            repo = PlaceRepository()
-            place = repo.get(place_id)
+            data = {key: value for key, value in (api.payload or {}).items() if key in place_in}
             
             # Admins can update any place, non-admins can only update their own
-            if place.owner_id != current_user_id and not is_admin:
-                api.abort(403, "You can only update your own places")
-            
-            data = api.payload
-            place = repo.update(place_id, data)
-            return place.to_dict()
+            repo = PlaceRepository()
+            place = repo.update_owned(place_id, data, current_user_id, is_admin,
+                                      versions=if_match_versions())
+            return serialize_place(place), 200, etag_headers(place)
         except NotFoundError as e:
             api.abort(404, str(e))
+        except ForbiddenError:
+            api.abort(403, "You can only update your own places")
+        except PreconditionFailedError as e:
+            api.abort(412, str(e))
         except ConflictError as e:
             api.abort(409, str(e))
 
@@ -116,14 +330,40 @@ class PlaceById(Resource):
             claims = get_jwt()
             is_admin = claims.get('is_admin', False)
             
-            repo = PlaceRepository()
-            place = repo.get(place_id)
-            
             # Admins can delete any place, non-admins can only delete their own
-            if place.owner_id != current_user_id and not is_admin:
-                api.abort(403, "You can only delete your own places")
-            
-            repo.delete(place_id)
+            repo = PlaceRepository()
+            repo.delete_owned(place_id, current_user_id, is_admin, versions=if_match_versions())
             return {"message": "Place deleted successfully"}, 200
         except NotFoundError as e:
             api.abort(404, str(e))
+        except ForbiddenError:
+            api.abort(403, "You can only delete your own places")
+        except PreconditionFailedError as e:
+            api.abort(412, str(e))
+
+@api.route("/<string:place_id>/reviews/stream")
+class PlaceReviewStream(Resource):
+    @api.produces(["text/event-stream"])
+    @api.response(200, "Server-Sent Events: created, updated and deleted reviews (JSON data)")
+    @api.response(503, "Too many open streams")
+    def get(self, place_id):
+        """Stream the place's review writes as they commit
+
+        Events come from the server process that handles the stream: with
+        several worker processes, a subscriber only sees the writes made
+        through its own worker (follow /changes to see every write).
+        """
+        try:
+            PlaceRepository().get(place_id, profile='write')
+        except NotFoundError as e:
+            api.abort(404, str(e))
+        # The stream can stay open for minutes; do not hold a connection
+        db.session.close()
+        hub = review_hub()
+        try:
+            subscription = hub.subscribe(place_id)
+        except SubscriberLimitError as e:
+            api.abort(503, str(e))
+        return sse_response(hub, subscription,
+                            heartbeat=current_app.config.get('REVIEW_STREAM_HEARTBEAT_SECONDS', 15),
+                            max_seconds=current_app.config.get('REVIEW_STREAM_MAX_SECONDS', 600))
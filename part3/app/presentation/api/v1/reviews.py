@@ -1,6 +1,10 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from app.persistence.repository import ReviewRepository, UserRepository, PlaceRepository, ConflictError, NotFoundError, ValidationError
+from app.persistence.repository import ReviewRepository, UserRepository, PlaceRepository, ConflictError, NotFoundError, ValidationError, ForbiddenError, PreconditionFailedError
+from app.presentation.api.conditional import etag_headers, if_match_versions
+from app.presentation.api.representations import shaped_with, shaped_list_with
+from app.presentation.api.serializers import compile_serializer
+from app.presentation.api.streams import publish_review
 from app.models.base_model import db, Review
 
 api = Namespace("reviews", description="Reviews operations")
@@ -19,20 +23,22 @@ review_out = api.model("ReviewOut", {
     "place_id": fields.String,
 })
 
+serialize_review = compile_serializer(review_out)
+
 @api.route("/")
 class Reviews(Resource):
-    @api.marshal_list_with(review_out)
+    @shaped_list_with(api, review_out)
     def get(self):
         """List all reviews"""
         try:
             repo = ReviewRepository()
             reviews = repo.list_all()
-            return [review.to_dict() for review in reviews]
+            return [serialize_review(review) for review in reviews]
         except Exception as e:
             api.abort(500, str(e))
 
     @api.expect(review_in, validate=True)
-    @api.marshal_with(review_out, code=201)
+    @shaped_with(api, review_out, code=201)
     @jwt_required()
     def post(self):
         """Create a new review"""
@@ -54,7 +60,7 @@ class Reviews(Resource):
             # Get the place
             place_repo = PlaceRepository()
             try:
-                place = place_repo.get(data['place_id'])
+                place = place_repo.get(data['place_id'], profile='write')
             except NotFoundError:
                 api.abort(404, "Place not found")
             
@@ -75,7 +81,9 @@ class Reviews(Resource):
             )
             
             created_review = review_repo.add(review)
-            return created_review.to_dict(), 201
+            serialized = serialize_review(created_review)
+            publish_review('created', serialized)
+            return serialized, 201
         except (ValidationError, ValueError) as e:
             api.abort(400, str(e))
         except ConflictError as e:
@@ -83,18 +91,18 @@ class Reviews(Resource):
 
 @api.route("/<string:review_id>")
 class ReviewById(Resource):
-    @api.marshal_with(review_out)
+    @shaped_with(api, review_out)
     def get(self, review_id):
         """Get a specific review"""
         try:
             repo = ReviewRepository()
             review = repo.get(review_id)
-            return review.to_dict()
+            return serialize_review(review), 200, etag_headers(review)
         except NotFoundError as e:
             api.abort(404, str(e))
 
     @api.expect(review_in, validate=False)
-    @api.marshal_with(review_out)
+    @shaped_with(api, review_out)
     @jwt_required()
     def put(self, review_id):
         """Update a review"""
@@ -103,27 +111,30 @@ class ReviewById(Resource):
             claims = get_jwt()
             is_admin = claims.get('is_admin', False)
             
-            repo = ReviewRepository()
-            review = repo.get(review_id)
-            
-            # Admins can update any review, non-admins can only update their own
-            if review.user_id != current_user_id and not is_admin:
-                api.abort(403, "You can only update your own reviews")
-            
             data = api.payload
+            update_data = {}
             
             if 'text' in data and data['text']:
-                review.text = data['text'].strip()
+                update_data['text'] = data['text'].strip()
             if 'rating' in data and data['rating'] is not None:
                 rating = int(data['rating'])
                 if rating < 1 or rating > 5:
                     api.abort(400, "rating must be between 1 and 5")
-                review.rating = rating
+                update_data['rating'] = rating
             
-            db.session.commit()
-            return review.to_dict()
+            # Admins can update any review, non-admins can only update their own
+            repo = ReviewRepository()
+            review = repo.update_owned(review_id, update_data, current_user_id, is_admin,
+                                       versions=if_match_versions())
+            serialized = serialize_review(review)
+            publish_review('updated', serialized)
+            return serialized, 200, etag_headers(review)
         except NotFoundError as e:
             api.abort(404, str(e))
+        except ForbiddenError:
+            api.abort(403, "You can only update your own reviews")
+        except PreconditionFailedError as e:
+            api.abort(412, str(e))
         except (ValidationError, ValueError) as e:
             api.abort(400, str(e))
 
@@ -135,14 +146,16 @@ class ReviewById(Resource):
             claims = get_jwt()
             is_admin = claims.get('is_admin', False)
             
-            repo = ReviewRepository()
-            review = repo.get(review_id)
-            
             # Admins can delete any review, non-admins can only delete their own
-            if review.user_id != current_user_id and not is_admin:
-                api.abort(403, "You can only delete your own reviews")
-            
-            repo.delete(review_id)
+            repo = ReviewRepository()
+            deleted = repo.delete_owned(review_id, current_user_id, is_admin,
+                                        versions=if_match_versions())
+            if deleted is not None:
+                publish_review('deleted', {'id': review_id, 'place_id': deleted.place_id})
             return {"message": "Review deleted successfully"}, 200
         except NotFoundError as e:
             api.abort(404, str(e))
+        except ForbiddenError:
+            api.abort(403, "You can only delete your own reviews")
+        except PreconditionFailedError as e:
+            api.abort(412, str(e))
@@ -1,6 +1,9 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from app.persistence.repository import UserRepository, ConflictError, NotFoundError, ValidationError
+from app.persistence.repository import UserRepository, ConflictError, NotFoundError, ValidationError, ForbiddenError, PreconditionFailedError
+from app.presentation.api.conditional import etag_headers, if_match_versions
+from app.presentation.api.representations import shaped_with, shaped_list_with
+from app.presentation.api.serializers import compile_serializer
 from app.models.base_model import db, User
 from app.auth.auth_utils import admin_required
 
@@ -21,20 +24,22 @@ user_out = api.model("UserOut", {
     "is_admin": fields.Boolean,
 })
 
+serialize_user = compile_serializer(user_out)
+
 @api.route("/")
 class Users(Resource):
-    @api.marshal_list_with(user_out)
+    @shaped_list_with(api, user_out)
     def get(self):
         """List all users"""
         try:
             repo = UserRepository()
             users = repo.list_all()
-            return [user.to_dict() for user in users]
+            return [serialize_user(user) for user in users]
         except Exception as e:
             api.abort(500, str(e))
 
     @api.expect(user_in, validate=True)
-    @api.marshal_with(user_out, code=201)
+    @shaped_with(api, user_out, code=201)
     @admin_required
     def post(self):
         """Create a new user (Admin only)"""
@@ -68,7 +73,7 @@ class Users(Resource):
             user.hash_password(data['password'].strip())
             
             created_user = repo.add(user)
-            return created_user.to_dict(), 201
+            return serialize_user(created_user), 201
         except ConflictError as e:
             api.abort(409, str(e))
         except ValidationError as e:
@@ -76,18 +81,18 @@ class Users(Resource):
 
 @api.route("/<string:user_id>")
 class UserById(Resource):
-    @api.marshal_with(user_out)
+    @shaped_with(api, user_out)
     def get(self, user_id):
         """Get a specific user"""
         try:
             repo = UserRepository()
             user = repo.get(user_id)
-            return user.to_dict()
+            return serialize_user(user), 200, etag_headers(user)
         except NotFoundError as e:
             api.abort(404, str(e))
 
     @api.expect(user_in, validate=False)
-    @api.marshal_with(user_out)
+    @shaped_with(api, user_out)
     @jwt_required()
     def put(self, user_id):
         """Update a user"""
@@ -97,13 +102,8 @@ class UserById(Resource):
             is_admin = claims.get('is_admin', False)
             
             repo = UserRepository()
-            user = repo.get(user_id)
             data = api.payload
             
-            # Non-admin users can only update their own profile
-            if user_id != current_user_id and not is_admin:
-                api.abort(403, "You can only update your own profile")
-            
             # Admins can update any field (first_name, last_name, email, password, is_admin)
             # Non-admins can only update first_name and last_name
             update_data = {}
@@ -117,8 +117,7 @@ class UserById(Resource):
                 if 'email' in data and data['email']:
                     new_email = data['email'].strip().lower()
                     # Check if email is already in use by another user
-                    existing_user = repo.get_by_email(new_email)
-                    if existing_user and existing_user.id != user_id:
+                    if repo.email_exists(new_email, exclude_id=user_id):
                         api.abort(409, "Email already exists")
                     update_data['email'] = new_email
                 if 'password' in data and data['password']:
@@ -133,10 +132,16 @@ class UserById(Resource):
                 if 'last_name' in data and data['last_name']:
                     update_data['last_name'] = data['last_name'].strip()
             
-            user = repo.update(user_id, update_data)
-            return user.to_dict()
+            # Non-admin users can only update their own profile
+            user = repo.update_owned(user_id, update_data, current_user_id, is_admin,
+                                     versions=if_match_versions())
+            return serialize_user(user), 200, etag_headers(user)
         except NotFoundError as e:
             api.abort(404, str(e))
+        except ForbiddenError:
+            api.abort(403, "You can only update your own profile")
+        except PreconditionFailedError as e:
+            api.abort(412, str(e))
         except ConflictError as e:
             api.abort(409, str(e))
 
@@ -145,13 +150,14 @@ class UserById(Resource):
         """Delete a user"""
         try:
             current_user_id = get_jwt_identity()
-            repo = UserRepository()
-            current_user = repo.get(current_user_id)
+            is_admin = get_jwt().get('is_admin', False)
             
-            if user_id != current_user_id and not current_user.is_admin:
-                api.abort(403, "You can only delete your own profile")
-            
-            repo.delete(user_id)
+            repo = UserRepository()
+            repo.delete_owned(user_id, current_user_id, is_admin, versions=if_match_versions())
             return {"message": "User deleted successfully"}, 200
         except NotFoundError as e:
             api.abort(404, str(e))
+        except ForbiddenError:
+            api.abort(403, "You can only delete your own profile")
+        except PreconditionFailedError as e:
+            api.abort(412, str(e))
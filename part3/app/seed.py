@@ -0,0 +1,275 @@
+"""Deterministic data generator exposed as the ``flask seed`` command.
+
+Rows are generated from a seeded ``random.Random`` and written in batches
+through Core ``INSERT`` statements (one ``executemany`` per batch), so the
+ORM unit of work is never involved. All generated users share a single
+bcrypt hash computed once up front.
+
+Usage::
+
+    flask --app run seed --users 50000 --places 200000 --reviews-per-place 4
+"""
+
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app.models.base_model import db, User, Place, Review, Amenity, place_amenity
+from app.models.ids import uuid7_string
+from app.persistence.clusters import rebuild_place_cells
+from app.persistence.leaderboard import rebuild_review_stats
+from app.persistence.trigrams import rebuild_trigrams
+
+# City centres used to cluster generated places (lat, lon, spread in degrees)
+CITY_CLUSTERS = [
+    ("New York", 40.7128, -74.0060, 0.15),
+    ("Miami", 25.7617, -80.1918, 0.10),
+    ("Denver", 39.7392, -104.9903, 0.20),
+    ("San Francisco", 37.7749, -122.4194, 0.08),
+    ("Washington", 38.9072, -77.0369, 0.10),
+    ("Los Angeles", 34.0522, -118.2437, 0.25),
+    ("Chicago", 41.8781, -87.6298, 0.15),
+    ("Honolulu", 21.3099, -157.8581, 0.05),
+    ("Riyadh", 24.7136, 46.6753, 0.20),
+    ("Jeddah", 21.4858, 39.1925, 0.12),
+    ("London", 51.5074, -0.1278, 0.15),
+    ("Paris", 48.8566, 2.3522, 0.10),
+]
+
+AMENITY_NAMES = [
+    "WiFi", "Swimming Pool", "Air Conditioning", "Kitchen", "Free Parking",
+    "Washer", "Dryer", "Heating", "TV", "Gym", "Hot Tub", "Fireplace",
+    "Workspace", "Breakfast", "Pets Allowed", "EV Charger", "Balcony",
+    "Sea View", "Elevator", "Crib",
+]
+
+FIRST_NAMES = ["Fahad", "Nabil", "Sara", "Noura", "Omar", "Lina", "John", "Maria",
+               "Ahmed", "Emma", "Yusuf", "Layla", "David", "Hana", "Khalid", "Reem"]
+LAST_NAMES = ["Alshammari", "Al-Ghamdi", "Al-Duwaisi", "Smith", "Garcia", "Haddad",
+              "Nguyen", "Khan", "Brown", "Saleh", "Otaibi", "Martin"]
+PLACE_KINDS = ["Apartment", "Villa", "Cabin", "Penthouse", "Studio", "Townhouse",
+               "Bungalow", "Loft", "Cottage", "Suite"]
+PLACE_ADJECTIVES = ["Cozy", "Modern", "Rustic", "Luxury", "Charming", "Quiet",
+                    "Sunny", "Spacious", "Historic", "Minimalist"]
+REVIEW_TEXTS = [
+    "Great stay, would book again.",
+    "Clean and exactly as described.",
+    "Host was very responsive.",
+    "Location was perfect for exploring the city.",
+    "A bit noisy at night but otherwise fine.",
+    "Not as pictured, disappointing.",
+    "Amazing views and comfortable beds.",
+]
+
+
+def _uuid(rng):
+    """Return a deterministic uuid4-formatted string drawn from ``rng``."""
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _ordered(row_id, created):
+    """``row_id`` as a uuid7 of ``created`` when the app uses ``ID_STRATEGY = 'uuid7'``.
+
+    Keeps the random bits of ``row_id``, so the output stays deterministic
+    and uses the same random draws as the default strategy.
+    """
+    if current_app.config.get('ID_STRATEGY', 'uuid4') != 'uuid7':
+        return row_id
+    bits = uuid.UUID(row_id).int
+    timestamp_ms = int(created.replace(tzinfo=timezone.utc).timestamp() * 1000)
+    return uuid7_string(timestamp_ms, bits >> 64, bits)
+
+
+def _timestamp(rng, now, max_days=365):
+    """Return a datetime within the last ``max_days`` days."""
+    return now - timedelta(seconds=rng.randrange(max_days * 86400))
+
+
+def _insert_batches(table, rows, batch_size, label):
+    """Insert ``rows`` (an iterable of dicts) in batches, committing each batch."""
+    batch = []
+    total = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(table.insert(), batch)
+            db.session.commit()
+            total += len(batch)
+            batch = []
+            click.echo(f"  {label}: {total}")
+    if batch:
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+        total += len(batch)
+    click.echo(f"  {label}: {total} (done)")
+    return total
+
+
+def generate_users(rng, count, password_hash, now, user_ids):
+    """Yield user rows, appending each generated id to ``user_ids``."""
+    for i in range(count):
+        user_id = _uuid(rng)
+        created = _timestamp(rng, now)
+        user_id = _ordered(user_id, created)
+        user_ids.append(user_id)
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        yield {
+            "id": user_id,
+            "first_name": first,
+            "last_name": last,
+            "email": f"{first.lower()}.{last.lower()}.{i}@seed.hbnb.io",
+            "password": password_hash,
+            "is_admin": False,
+            "created_at": created,
+            "updated_at": created,
+        }
+
+
+def generate_places(rng, count, user_ids, now, place_owners):
+    """Yield place rows clustered around city centres.
+
+    ``place_owners`` receives ``(place_id, owner_id)`` for each place so that
+    reviews can later avoid owners reviewing their own place.
+    """
+    for _ in range(count):
+        place_id = _uuid(rng)
+        owner_id = rng.choice(user_ids)
+        city, lat, lon, spread = rng.choice(CITY_CLUSTERS)
+        latitude = max(-90.0, min(90.0, rng.gauss(lat, spread)))
+        longitude = max(-180.0, min(180.0, rng.gauss(lon, spread)))
+        kind = rng.choice(PLACE_KINDS)
+        created = _timestamp(rng, now)
+        place_id = _ordered(place_id, created)
+        place_owners.append((place_id, owner_id))
+        yield {
+            "id": place_id,
+            "name": f"{rng.choice(PLACE_ADJECTIVES)} {kind} in {city}",
+            "description": f"A {kind.lower()} close to the centre of {city}.",
+            "price": round(rng.lognormvariate(4.6, 0.5), 2),
+            "latitude": round(latitude, 6),
+            "longitude": round(longitude, 6),
+            "owner_id": owner_id,
+            "created_at": created,
+            "updated_at": created,
+        }
+
+
+def generate_amenities(rng, count, now, amenity_ids):
+    """Yield amenity rows, appending each generated id to ``amenity_ids``."""
+    for i in range(count):
+        amenity_id = _ordered(_uuid(rng), now)
+        amenity_ids.append(amenity_id)
+        if i < len(AMENITY_NAMES):
+            name = AMENITY_NAMES[i]
+        else:
+            name = f"{AMENITY_NAMES[i % len(AMENITY_NAMES)]} {i // len(AMENITY_NAMES)}"
+        yield {"id": amenity_id, "name": name, "created_at": now, "updated_at": now}
+
+
+def generate_place_amenities(rng, place_owners, amenity_ids, per_place):
+    """Yield place_amenity link rows (distinct amenities per place)."""
+    per_place = min(per_place, len(amenity_ids))
+    for place_id, _ in place_owners:
+        for amenity_id in rng.sample(amenity_ids, rng.randint(0, per_place)):
+            yield {"place_id": place_id, "amenity_id": amenity_id}
+
+
+def generate_reviews(rng, place_owners, user_ids, per_place, now):
+    """Yield review rows with at most one review per (user, place) pair."""
+    for place_id, owner_id in place_owners:
+        count = min(rng.randint(0, 2 * per_place), len(user_ids) - 1)
+        reviewers = set()
+        while len(reviewers) < count:
+            user_id = rng.choice(user_ids)
+            if user_id != owner_id:
+                reviewers.add(user_id)
+        for user_id in sorted(reviewers):
+            created = _timestamp(rng, now)
+            yield {
+                "id": _ordered(_uuid(rng), created),
+                "text": rng.choice(REVIEW_TEXTS),
+                "rating": rng.choices((1, 2, 3, 4, 5), weights=(1, 2, 5, 10, 8))[0],
+                "user_id": user_id,
+                "place_id": place_id,
+                "created_at": created,
+                "updated_at": created,
+            }
+
+
+def seed_database(users=100, places=500, amenities=len(AMENITY_NAMES),
+                  amenities_per_place=5, reviews_per_place=3, seed=42,
+                  batch_size=5000, password="password123"):
+    """Populate the current app's database and return the row counts.
+
+    The same arguments always produce the same rows.
+    """
+    from app import bcrypt
+
+    if places > 0 and users < 1:
+        raise ValueError("at least 1 user is required to own the places")
+    if places > 0 and reviews_per_place > 0 and users < 2:
+        raise ValueError("at least 2 users are required to seed reviews (owners do not review their own places)")
+
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 1)
+    password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+
+    user_ids, place_owners, amenity_ids = [], [], []
+    counts = {}
+    counts["users"] = _insert_batches(
+        User.__table__, generate_users(rng, users, password_hash, now, user_ids),
+        batch_size, "users")
+    counts["amenities"] = _insert_batches(
+        Amenity.__table__, generate_amenities(rng, amenities, now, amenity_ids),
+        batch_size, "amenities")
+    counts["places"] = _insert_batches(
+        Place.__table__, generate_places(rng, places, user_ids, now, place_owners),
+        batch_size, "places")
+    counts["place_amenity"] = _insert_batches(
+        place_amenity, generate_place_amenities(rng, place_owners, amenity_ids, amenities_per_place),
+        batch_size, "place_amenity")
+    counts["reviews"] = _insert_batches(
+        Review.__table__, generate_reviews(rng, place_owners, user_ids, reviews_per_place, now),
+        batch_size, "reviews")
+    # Core inserts bypass the per-review leaderboard updates, place cells
+    # and name trigrams
+    rebuild_review_stats(batch_size)
+    rebuild_place_cells(batch_size)
+    rebuild_trigrams(batch_size)
+    return counts
+
+
+@click.command("seed")
+@click.option("--users", default=100, show_default=True, help="Number of users")
+@click.option("--places", default=500, show_default=True, help="Number of places")
+@click.option("--amenities", default=len(AMENITY_NAMES), show_default=True, help="Number of amenities")
+@click.option("--amenities-per-place", default=5, show_default=True, help="Maximum amenities linked to each place")
+@click.option("--reviews-per-place", default=3, show_default=True, help="Average reviews per place")
+@click.option("--seed", default=42, show_default=True, help="Random seed")
+@click.option("--batch-size", default=5000, show_default=True, help="Rows per INSERT batch")
+@click.option("--password", default="password123", show_default=True, help="Password shared by all generated users")
+@click.option("--reset", is_flag=True, help="Drop and recreate all tables first")
+@with_appcontext
+def seed_command(users, places, amenities, amenities_per_place, reviews_per_place,
+                 seed, batch_size, password, reset):
+    """Generate deterministic sample data."""
+    # Statement echo (DevelopmentConfig) would dominate the run time
+    db.engine.echo = False
+    if reset:
+        db.drop_all()
+        db.create_all()
+    started = time.perf_counter()
+    try:
+        counts = seed_database(users, places, amenities, amenities_per_place,
+                               reviews_per_place, seed, batch_size, password)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    click.echo(f"Inserted {total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} rows/s)")
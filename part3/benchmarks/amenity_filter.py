@@ -0,0 +1,86 @@
+"""
+Benchmark: filtering places by amenities with and without the reverse index
+
+Times ``PlaceRepository.list_filtered`` (one GROUP BY / HAVING query over
+``place_amenity``, first page of 20) for one amenity, all of three and any
+of three, with the ``(amenity_id, place_id)`` index present and dropped.
+
+The database is seeded once into a temporary SQLite file.
+
+Usage:
+    python benchmarks/amenity_filter.py [--places 50000] [--repeat 20]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from app import create_app
+from app.models.base_model import db, Amenity
+from app.persistence.repository import PlaceRepository
+from app.seed import seed_database
+from config import TestingConfig
+
+INDEX = 'ix_place_amenity_amenity_id_place_id'
+
+
+def timed(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--places', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='hbnb-bench-')
+    try:
+        class BenchConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'amenities.db')}"
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            seed_database(users=100, places=args.places, reviews_per_place=0)
+            ids = [amenity.id for amenity in Amenity.query.order_by(Amenity.name).limit(3)]
+            repo = PlaceRepository()
+            cases = [
+                ('1 amenity', [ids[0]], 'all'),
+                ('all of 3', ids, 'all'),
+                ('any of 3', ids, 'any'),
+            ]
+            print(f"{args.places} places, first page of 20, mean of {args.repeat} calls")
+            print(f"{'filter':>10}{'matches':>9}{'no index ms':>13}{'index ms':>10}")
+            results = {}
+            for indexed in (False, True):
+                if not indexed:
+                    db.session.execute(text(f"DROP INDEX {INDEX}"))
+                else:
+                    db.session.execute(text(
+                        f"CREATE INDEX {INDEX} ON place_amenity (amenity_id, place_id)"))
+                db.session.commit()
+                for name, amenity_ids, match in cases:
+                    results[name, indexed] = timed(
+                        lambda: repo.list_filtered(amenity_ids, match, limit=20), args.repeat)
+            for name, amenity_ids, match in cases:
+                matches = len(repo.list_filtered(amenity_ids, match))
+                print(f"{name:>10}{matches:>9}{results[name, False]:>13.1f}"
+                      f"{results[name, True]:>10.1f}")
+            db.session.remove()
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
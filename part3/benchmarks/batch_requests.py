@@ -0,0 +1,92 @@
+"""
+Benchmark: separate PUT /api/v1/places/<id> requests vs one POST /api/v1/batch
+
+An owner updates the price of ``n`` of their places, either with ``n``
+requests (one transaction and commit each) or with one batch (one
+transaction, one commit). Requests go through the Flask test client, so
+the times include routing, authentication and serialization but no network
+round trips, which a batch also saves.
+
+Each run uses a fresh SQLite file with the DevelopmentConfig PRAGMAs (WAL).
+
+Usage:
+    python benchmarks/batch_requests.py [--sizes 1 10 50] [--repeat 5]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.models.base_model import db, Place, User
+from app.seed import seed_database
+from config import DevelopmentConfig
+
+
+def run(path, size, repeat):
+    """Return (ms for separate requests, ms for one batch) per ``size`` updates"""
+    class BenchConfig(DevelopmentConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        SQLALCHEMY_ECHO = False
+        DEBUG = False
+        TOKEN_BLOCKLIST_SYNC_SECONDS = 0
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        seed_database(users=2, places=0, reviews_per_place=0)
+        owner = User.query.first()
+        db.session.add_all([Place(name=f'Loft {i}', description='Test', price=80.0, latitude=24.7,
+                                  longitude=46.7, owner_id=owner.id) for i in range(size)])
+        db.session.commit()
+        places = [place_id for (place_id,) in db.session.query(Place.id)]
+        headers = {'Authorization': f"Bearer {create_access_token(identity=owner.id)}"}
+        db.session.remove()
+
+    http = app.test_client()
+    separate = batched = 0.0
+    for round_ in range(repeat):
+        started = time.perf_counter()
+        for place_id in places:
+            response = http.put(f'/api/v1/places/{place_id}', json={'price': 100.0 + round_},
+                                headers=headers)
+            assert response.status_code == 200
+        separate += time.perf_counter() - started
+
+        requests = [{'method': 'PUT', 'path': f'/api/v1/places/{place_id}',
+                     'body': {'price': 200.0 + round_}} for place_id in places]
+        started = time.perf_counter()
+        response = http.post('/api/v1/batch/', json={'requests': requests, 'atomic': True},
+                             headers=headers)
+        batched += time.perf_counter() - started
+        assert response.json['committed'] is True
+    with app.app_context():
+        db.engine.dispose()
+    return separate / repeat * 1000, batched / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='hbnb-bench-')
+    try:
+        print(f"mean of {args.repeat} rounds")
+        print(f"{'updates':>8}{'requests ms':>13}{'batch ms':>10}{'speedup':>9}")
+        for size in args.sizes:
+            separate, batched = run(os.path.join(workdir, f'batch-{size}.db'), size, args.repeat)
+            print(f"{size:>8}{separate:>13.1f}{batched:>10.1f}{separate / batched:>8.1f}x")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
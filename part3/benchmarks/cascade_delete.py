@@ -0,0 +1,102 @@
+"""
+Benchmark: deleting a place that has many reviews
+
+Compares the two ways the ORM can remove a place and its children:
+
+- orm cascade: the reviews collection is loaded and every review is deleted
+  by the unit of work (the behaviour before ``passive_deletes``)
+- db cascade:  ``PlaceRepository.delete`` issues one DELETE for the place and
+  the database removes the reviews through ON DELETE CASCADE
+
+Each run uses a fresh SQLite file with the same rows.
+
+Usage:
+    python benchmarks/cascade_delete.py [--reviews 50000]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+
+from app import create_app
+from app.models.base_model import db, User, Place, Review
+from app.persistence.repository import PlaceRepository
+from app.seed import seed_database
+from config import TestingConfig
+
+
+def orm_cascade(place_id):
+    """Load the reviews so the unit of work deletes them one by one"""
+    place = db.session.get(Place, place_id)
+    for review in list(place.reviews):
+        db.session.delete(review)
+    db.session.delete(place)
+    db.session.commit()
+
+
+def db_cascade(place_id):
+    PlaceRepository().delete(place_id)
+
+
+def run(path, reviews, strategy):
+    """Seed a place with ``reviews`` reviews, delete it and return (seconds, statements)"""
+    class BenchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        seed_database(users=2, places=1, reviews_per_place=0)
+        place = Place.query.one()
+        user_id = User.query.filter(User.id != place.owner_id).first().id
+        now = datetime(2026, 1, 1)
+        db.session.execute(Review.__table__.insert(), [
+            {'id': str(uuid.uuid4()), 'text': 'Benchmark review', 'rating': 4,
+             'user_id': user_id, 'place_id': place.id, 'created_at': now, 'updated_at': now}
+            for _ in range(reviews)
+        ])
+        db.session.commit()
+        place_id = place.id
+        db.session.remove()
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, "before_cursor_execute", listener)
+        started = time.perf_counter()
+        strategy(place_id)
+        elapsed = time.perf_counter() - started
+        event.remove(db.engine, "before_cursor_execute", listener)
+
+        assert Review.query.count() == 0
+        db.session.remove()
+        db.engine.dispose()
+    return elapsed, len(statements)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--reviews', type=int, default=50000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='hbnb-bench-')
+    try:
+        print(f"1 place with {args.reviews} reviews")
+        print(f"{'strategy':<14}{'ms':>10}{'statements':>12}")
+        for label, strategy in (('orm cascade', orm_cascade), ('db cascade', db_cascade)):
+            path = os.path.join(workdir, f"{label.replace(' ', '_')}.db")
+            seconds, count = run(path, args.reviews, strategy)
+            print(f"{label:<14}{seconds * 1000:>10.1f}{count:>12}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: syncing places from the change feed vs downloading the full list
+
+After a number of place updates, a client catches up either by
+downloading GET /api/v1/places/ again, or by reading GET /api/v1/changes
+since its last seq and fetching each upserted place with
+GET /api/v1/places/<id>. Requests go through the Flask test client, so
+the times include routing and serialization but no network; bytes are
+the response bodies.
+
+The database is seeded once into a temporary SQLite file.
+
+Usage:
+    python benchmarks/change_feed.py [--places 20000] [--changed 1,10,100,1000]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.models.base_model import db, Place
+from app.persistence.repository import PlaceRepository
+from app.seed import seed_database
+from config import TestingConfig
+
+
+def full_download(client):
+    response = client.get('/api/v1/places/')
+    return len(response.data)
+
+
+def delta_sync(client, since):
+    received = 0
+    while True:
+        response = client.get(f'/api/v1/changes/?since={since}&limit=1000')
+        received += len(response.data)
+        page = response.json
+        for change in page['changes']:
+            if change['entity'] == 'place' and change['op'] == 'upsert':
+                received += len(client.get(f"/api/v1/places/{change['id']}").data)
+        since = page['next']
+        if not page['has_more']:
+            return received
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--places', type=int, default=20000)
+    parser.add_argument('--changed', default='1,10,100,1000',
+                        help='Comma-separated numbers of places updated between syncs')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='hbnb-bench-')
+    try:
+        class BenchConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'changes.db')}"
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            seed_database(users=100, places=args.places, reviews_per_place=1)
+            db.session.remove()
+            rows = db.session.query(Place.id, Place.owner_id).all()
+            repo = PlaceRepository()
+            client = app.test_client()
+            rng = random.Random(7)
+
+            print(f"{args.places} places")
+            print(f"{'changed':>8}{'full ms':>9}{'full KiB':>10}{'delta ms':>10}{'delta KiB':>11}")
+            for changed in [int(n) for n in args.changed.split(',')]:
+                since = client.get('/api/v1/changes/head').json['seq']
+                for place_id, owner_id in rng.sample(rows, changed):
+                    repo.update_owned(place_id, {'price': rng.randint(20, 500)}, owner_id)
+                db.session.remove()
+
+                started = time.perf_counter()
+                full_bytes = full_download(client)
+                full_ms = (time.perf_counter() - started) * 1000
+                started = time.perf_counter()
+                delta_bytes = delta_sync(client, since)
+                delta_ms = (time.perf_counter() - started) * 1000
+                print(f"{changed:>8}{full_ms:>9.0f}{full_bytes / 1024:>10.0f}"
+                      f"{delta_ms:>10.1f}{delta_bytes / 1024:>11.1f}")
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: GET /api/v1/places/facets computed vs served from the cache
+
+Times the two GROUP BY queries behind the endpoint (cache cleared before
+every call) and the cached response, without a filter and with an
+amenity filter.
+
+The database is seeded once into a temporary SQLite file.
+
+Usage:
+    python benchmarks/facets.py [--places 50000] [--repeat 20]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.models.base_model import db, Amenity
+from app.persistence.facets import facet_cache
+from app.seed import seed_database
+from config import TestingConfig
+
+
+def timed(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--places', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='hbnb-bench-')
+    try:
+        class BenchConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'facets.db')}"
+
+        app = create_app(BenchConfig)
+        client = app.test_client()
+        with app.app_context():
+            seed_database(users=100, places=args.places, reviews_per_place=0)
+            ids = [amenity.id for amenity in Amenity.query.order_by(Amenity.name).limit(2)]
+            db.session.remove()
+
+        urls = [
+            ('no filter', '/api/v1/places/facets'),
+            ('2 amenities', f"/api/v1/places/facets?amenities={','.join(ids)}"),
+        ]
+        print(f"{args.places} places, mean of {args.repeat} requests")
+        print(f"{'filter':>12}{'computed ms':>13}{'cached ms':>11}")
+        with app.app_context():
+            cache = facet_cache()
+            for name, url in urls:
+                def computed():
+                    cache.clear()
+                    assert client.get(url).status_code == 200
+                cold = timed(computed, args.repeat)
+                warm = timed(lambda: client.get(url), args.repeat)
+                print(f"{name:>12}{cold:>13.1f}{warm:>11.2f}")
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
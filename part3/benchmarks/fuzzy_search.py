@@ -0,0 +1,87 @@
+"""
+Benchmark: fuzzy place-name search, trigram index vs scanning every name
+
+For a few misspelled queries, times PlaceRepository.search (trigram index,
+what GET /api/v1/places/search calls) with and without skipping stop
+trigrams, against reading every place name and scoring it in Python, by
+trigram similarity and by difflib's edit-based ratio. "same" tells whether
+skipping stop trigrams returned the same top 10.
+
+The database is seeded once into a temporary SQLite file.
+
+Usage:
+    python benchmarks/fuzzy_search.py [--places 50000] [--repeat 5]
+"""
+
+import argparse
+import difflib
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+
+from app import create_app
+from app.models.base_model import db, Place
+from app.persistence.repository import PlaceRepository
+from app.persistence.trigrams import similarity
+from app.seed import seed_database
+from config import TestingConfig
+
+QUERIES = ['apartmnt in chicgo', 'cozy vila in paris', 'luxury pentouse new yrok']
+
+
+def timed(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def scan(query, score):
+    names = db.session.execute(select(Place.id, Place.name)).all()
+    return sorted(((score(query, name), place_id) for place_id, name in names), reverse=True)[:10]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--places', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='hbnb-bench-')
+    try:
+        class BenchConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'fuzzy.db')}"
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            seed_database(users=100, places=args.places, reviews_per_place=0)
+            db.session.remove()
+
+            repo = PlaceRepository()
+            edit_ratio = lambda a, b: difflib.SequenceMatcher(None, a.lower(), b.lower()).ratio()
+            print(f"{args.places} places, mean of {args.repeat} searches (top 10)")
+            print(f"{'query':>26}{'index ms':>10}{'all grams ms':>14}{'scan ms':>10}"
+                  f"{'difflib ms':>12}{'hits':>6}{'same':>6}")
+            for query in QUERIES:
+                indexed, hits = timed(lambda: repo.search(query, 10, 0.3), args.repeat)
+                app.config['FUZZY_SEARCH_STOP_TRIGRAM_SHARE'] = 1.0
+                every, exact = timed(lambda: repo.search(query, 10, 0.3), args.repeat)
+                app.config['FUZZY_SEARCH_STOP_TRIGRAM_SHARE'] = BenchConfig.FUZZY_SEARCH_STOP_TRIGRAM_SHARE
+                scanned, _ = timed(lambda: scan(query, similarity), args.repeat)
+                edited, _ = timed(lambda: scan(query, edit_ratio), 1)
+                same = 'yes' if hits == exact else 'no'
+                print(f"{query:>26}{indexed:>10.1f}{every:>14.1f}{scanned:>10.1f}{edited:>12.1f}"
+                      f"{len(hits):>6}{same:>6}")
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
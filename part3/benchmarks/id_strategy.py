@@ -0,0 +1,119 @@
+"""
+Benchmark: uuid4 vs time-ordered uuid7 primary keys (ID_STRATEGY)
+
+Inserts rows shaped like ``place`` (a 36-character string key,
+``created_at`` with its own index, about 200 bytes of payload) in
+committed batches into a SQLite file with a small page cache. It then
+walks them in creation order, 100 rows per page, with keyset pagination:
+``ORDER BY created_at, id`` through the ``created_at`` index for uuid4,
+``ORDER BY id`` on the key for uuid7.
+
+Two layouts are measured:
+
+- ``rowid``: an ordinary SQLite table, where the key is a separate
+  unique index;
+- ``clustered``: ``WITHOUT ROWID``, where rows are stored in key order,
+  as InnoDB (MySQL) stores every table.
+
+Usage:
+    python benchmarks/id_strategy.py [--rows 300000] [--batch 1000] [--cache-mib 8]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, text
+
+from app.models.ids import ID_STRATEGIES
+
+SCHEMA = """
+CREATE TABLE place (
+    id VARCHAR(36) NOT NULL PRIMARY KEY,
+    created_at DATETIME NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    description VARCHAR(1000) NOT NULL
+){suffix}
+"""
+
+
+def run(path, layout, strategy, rows, batch, cache_mib):
+    engine = create_engine(f"sqlite:///{path}")
+
+    @event.listens_for(engine, "connect")
+    def pragmas(dbapi_connection, record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA cache_size=-{cache_mib * 1024}")
+        cursor.close()
+
+    make_id = ID_STRATEGIES[strategy]
+    with engine.begin() as connection:
+        connection.execute(text(SCHEMA.format(suffix=' WITHOUT ROWID' if layout == 'clustered' else '')))
+        connection.execute(text("CREATE INDEX ix_place_created_at ON place (created_at)"))
+
+    insert = text("INSERT INTO place (id, created_at, name, description) "
+                  "VALUES (:id, :created_at, :name, :description)")
+    created = datetime(2026, 1, 1)
+    started = time.perf_counter()
+    for start in range(0, rows, batch):
+        params = []
+        for _ in range(min(batch, rows - start)):
+            created += timedelta(milliseconds=1)
+            params.append({'id': make_id(), 'created_at': created,
+                           'name': 'Cozy Apartment in Paris', 'description': 'x' * 160})
+        with engine.begin() as connection:
+            connection.execute(insert, params)
+    insert_rate = rows / (time.perf_counter() - started)
+
+    if strategy == 'uuid7':
+        first = text("SELECT * FROM place ORDER BY id LIMIT 100")
+        following = text("SELECT * FROM place WHERE id > :id ORDER BY id LIMIT 100")
+    else:
+        first = text("SELECT * FROM place ORDER BY created_at, id LIMIT 100")
+        following = text("SELECT * FROM place WHERE (created_at, id) > (:created_at, :id) "
+                         "ORDER BY created_at, id LIMIT 100")
+    engine.dispose()
+    started = time.perf_counter()
+    scanned = 0
+    with engine.connect() as connection:
+        page = connection.execute(first).all()
+        while page:
+            scanned += len(page)
+            last = page[-1]
+            page = connection.execute(following, {'id': last.id, 'created_at': last.created_at}).all()
+    scan_ms = (time.perf_counter() - started) * 1000
+    assert scanned == rows
+    engine.dispose()
+    return insert_rate, scan_ms, os.path.getsize(path) / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=300000)
+    parser.add_argument('--batch', type=int, default=1000)
+    parser.add_argument('--cache-mib', type=int, default=8)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='hbnb-bench-')
+    try:
+        print(f"{args.rows} rows, batches of {args.batch}, {args.cache_mib} MiB page cache")
+        print(f"{'layout':>10}{'ids':>7}{'inserts/s':>11}{'scan ms':>9}{'MiB':>7}")
+        for layout in ('rowid', 'clustered'):
+            for strategy in ('uuid4', 'uuid7'):
+                path = os.path.join(workdir, f'{layout}-{strategy}.db')
+                rate, scan_ms, size = run(path, layout, strategy, args.rows, args.batch, args.cache_mib)
+                print(f"{layout:>10}{strategy:>7}{rate:>11.0f}{scan_ms:>9.0f}{size:>7.0f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
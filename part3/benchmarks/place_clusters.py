@@ -0,0 +1,73 @@
+"""
+Benchmark: map view via GET /api/v1/places/ vs GET /api/v1/places/clusters
+
+Times downloading every place (what a map view needs without clustering)
+against the clusters of a world view and of a city view, and reports the
+response sizes.
+
+The database is seeded once into a temporary SQLite file.
+
+Usage:
+    python benchmarks/place_clusters.py [--places 50000] [--repeat 10]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.models.base_model import db
+from app.seed import seed_database
+from config import TestingConfig
+
+VIEWS = [
+    ('all places', '/api/v1/places/'),
+    ('world z2', '/api/v1/places/clusters?bbox=-180,-85,180,85&zoom=2'),
+    ('europe z5', '/api/v1/places/clusters?bbox=-10,35,30,60&zoom=5'),
+    ('paris z12', '/api/v1/places/clusters?bbox=2.25,48.82,2.42,48.90&zoom=12'),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--places', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='hbnb-bench-')
+    try:
+        class BenchConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'clusters.db')}"
+            VIEW_COUNTER = False
+
+        app = create_app(BenchConfig)
+        client = app.test_client()
+        with app.app_context():
+            seed_database(users=100, places=args.places, reviews_per_place=0)
+            db.session.remove()
+
+        print(f"{args.places} places, mean of {args.repeat} requests")
+        print(f"{'view':>11}{'ms':>9}{'KiB':>10}{'items':>8}")
+        with app.app_context():
+            for name, url in VIEWS:
+                response = client.get(url)
+                assert response.status_code == 200
+                body = response.json
+                items = len(body if isinstance(body, list) else body['clusters'])
+                started = time.perf_counter()
+                for _ in range(args.repeat):
+                    client.get(url)
+                elapsed = (time.perf_counter() - started) / args.repeat * 1000
+                print(f"{name:>11}{elapsed:>9.1f}{len(response.data) / 1024:>10.1f}{items:>8}")
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
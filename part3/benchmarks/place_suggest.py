@@ -0,0 +1,110 @@
+"""
+Benchmark: place-name autocomplete (GET /api/v1/places/suggest)
+
+Loads an in-memory prefix index with distinct generated names (no
+database) and reports lookup latency percentiles for random 1-6 character
+prefixes, both on the index and through the endpoint, and the cost of the
+incremental update applied when a place is created, renamed or deleted.
+For comparison it times 50 of the lookups as a case-insensitive
+``LIKE 'prefix%'`` query on the place table of a SQLite database.
+
+Usage:
+    python benchmarks/place_suggest.py [--names 1000000] [--lookups 5000]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+
+from app import create_app
+from app.models.base_model import db, Place
+from app.persistence.suggest import PrefixIndex, normalize_name
+from app.seed import CITY_CLUSTERS, PLACE_ADJECTIVES, PLACE_KINDS
+from config import TestingConfig
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+    return pick(0.5), pick(0.99)
+
+
+def names(count, rng):
+    for number in range(count):
+        yield (f"p{number}", f"{rng.choice(PLACE_ADJECTIVES)} {rng.choice(PLACE_KINDS)} "
+                             f"in {rng.choice(CITY_CLUSTERS)[0]} {number}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--names', type=int, default=1000000)
+    parser.add_argument('--lookups', type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    rows = list(names(args.names, rng))
+    prefixes = [normalize_name(name)[:rng.randint(1, 6)] for _, name in rng.sample(rows, args.lookups)]
+
+    workdir = tempfile.mkdtemp(prefix='hbnb-bench-')
+    try:
+        class BenchConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'suggest.db')}"
+            # The places below have no owner row
+            SQLITE_PRAGMAS = {'synchronous': 'OFF'}
+
+        app = create_app(BenchConfig)
+        client = app.test_client()
+        with app.app_context():
+            index = app.extensions['place_suggestions'] = PrefixIndex()
+            started = time.perf_counter()
+            index.load(lambda: rows)
+            print(f"{args.names} names loaded in {time.perf_counter() - started:.1f}s")
+
+            def timed(function, inputs):
+                samples = []
+                for value in inputs:
+                    started = time.perf_counter()
+                    function(value)
+                    samples.append(time.perf_counter() - started)
+                return percentiles(samples)
+
+            results = [
+                ('index lookup', timed(lambda prefix: index.suggest(prefix, 10), prefixes)),
+                ('GET /suggest', timed(
+                    lambda prefix: client.get(f'/api/v1/places/suggest?prefix={prefix}'), prefixes)),
+                ('create', timed(lambda n: index.apply([(f"new{n}", f"Annex {n}")]),
+                                 range(args.lookups))),
+                ('rename', timed(lambda n: index.apply([(f"new{n}", f"Zeta {n}")]),
+                                 range(args.lookups))),
+                ('delete', timed(lambda n: index.apply([(f"new{n}", None)]), range(args.lookups))),
+            ]
+
+            # The same prefixes against a LIKE query (no DB writes above)
+            db.session.execute(Place.__table__.insert(), [
+                {'id': place_id, 'name': name, 'description': '', 'price': 1.0,
+                 'latitude': 0.0, 'longitude': 0.0, 'owner_id': 'owner'}
+                for place_id, name in rows])
+            db.session.commit()
+            like = timed(lambda prefix: db.session.execute(
+                select(Place.name).where(Place.name.ilike(f"{prefix}%")).order_by(Place.name).limit(10)
+            ).all(), prefixes[:50])
+            results.append(('SQL LIKE', like))
+            db.engine.dispose()
+
+        print(f"{'operation':>13}{'p50 ms':>9}{'p99 ms':>9}")
+        for name, (p50, p99) in results:
+            print(f"{name:>13}{p50:>9.3f}{p99:>9.3f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark: GET /api/v1/places/<id> throughput with place view counting
+
+Threads read random places through the test client for a fixed duration in
+three modes:
+
+- off:      VIEW_COUNTER = False
+- buffered: the in-memory counter, flushed every VIEW_COUNTER_FLUSH_SECONDS
+- direct:   one UPSERT per view in the request (what buffering avoids)
+
+Each mode uses a fresh SQLite file (DevelopmentConfig PRAGMAs, WAL) seeded
+with the same places.
+
+Usage:
+    python benchmarks/place_views.py [--threads 8] [--seconds 5] [--places 2000]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.models.base_model import db, Place, PlaceViewCount
+from app.persistence.views import ViewCounter
+from app.seed import seed_database
+from config import DevelopmentConfig
+
+
+class DirectViewCounter(ViewCounter):
+    """Write every view as it happens"""
+
+    def record(self, place_id):
+        self._write([{'place_id': place_id, 'count': 1}])
+
+
+def run(path, mode, threads, seconds, places):
+    """Return (requests/s, p50 ms, p99 ms, views stored) for one mode"""
+    class BenchConfig(DevelopmentConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        SQLALCHEMY_ECHO = False
+        DEBUG = False
+        TOKEN_BLOCKLIST_SYNC_SECONDS = 0
+        VIEW_COUNTER = mode != 'off'
+        VIEW_COUNTER_FLUSH_SECONDS = 1
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        seed_database(users=50, places=places, reviews_per_place=2)
+        place_ids = [place_id for (place_id,) in db.session.query(Place.id)]
+        db.session.remove()
+    if mode == 'direct':
+        app.extensions['view_counter'] = DirectViewCounter(app, db)
+
+    latencies = [[] for _ in range(threads)]
+    deadline = time.time() + seconds
+
+    def client(index):
+        http = app.test_client()
+        rng = random.Random(index)
+        while time.time() < deadline:
+            started = time.perf_counter()
+            assert http.get(f'/api/v1/places/{rng.choice(place_ids)}').status_code == 200
+            latencies[index].append(time.perf_counter() - started)
+
+    workers = [threading.Thread(target=client, args=(i,)) for i in range(threads)]
+    started = time.time()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.time() - started
+
+    with app.app_context():
+        counter = app.extensions.get('view_counter')
+        if counter is not None:
+            counter.flush()
+        stored = db.session.query(db.func.coalesce(db.func.sum(PlaceViewCount.count), 0)).scalar()
+        db.session.remove()
+        db.engine.dispose()
+    samples = sorted(sample for per_thread in latencies for sample in per_thread)
+    p50 = samples[len(samples) // 2] * 1000
+    p99 = samples[int(len(samples) * 0.99)] * 1000
+    return len(samples) / elapsed, p50, p99, stored
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--places', type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='hbnb-bench-')
+    try:
+        print(f"{args.threads} threads, {args.seconds:.0f}s per mode, {args.places} places")
+        print(f"{'mode':>10}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'views stored':>14}")
+        for mode in ('off', 'buffered', 'direct'):
+            rate, p50, p99, stored = run(os.path.join(workdir, f"{mode}.db"), mode,
+                                         args.threads, args.seconds, args.places)
+            print(f"{mode:>10}{rate:>9.0f}{p50:>9.2f}{p99:>9.2f}{stored:>14}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
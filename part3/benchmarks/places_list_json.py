@@ -0,0 +1,88 @@
+"""
+Benchmark: GET /api/v1/places/ response building at 10k places
+
+Times the serialization stages of the list endpoint on a seeded database:
+
+- before:   ``to_dict()`` + restx ``marshal`` + restx default ``output_json``
+- project:  ``to_dict()`` projected to PlaceOut + fast ``output_json``
+- compiled: ``serialize_place`` (one pass over the ORM object) + fast ``output_json``
+
+plus the full request through the test client (which also includes loading
+the rows and their relationships).
+
+Usage:
+    python benchmarks/places_list_json.py [--places 10000] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_restx import marshal
+from flask_restx.representations import output_json as restx_output_json
+
+from app import create_app
+from app.models.base_model import db
+from app.persistence.repository import PlaceRepository
+from app.presentation.api.representations import output_json, project
+from app.presentation.api.v1.places import place_out, serialize_place
+from app.seed import seed_database
+from config import TestingConfig
+
+
+def best_of(repeat, func):
+    """Return the best wall time of ``repeat`` calls, in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--places', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app(TestingConfig)
+    with app.app_context():
+        seed_database(users=500, places=args.places, reviews_per_place=1, batch_size=5000)
+        places = PlaceRepository().list_all(profile='list')
+        dicts = [place.to_dict() for place in places]
+        shaped = [project(d, place_out) for d in dicts]
+
+        with app.test_request_context():
+            timings = {
+                'to_dict': best_of(args.repeat, lambda: [place.to_dict() for place in places]),
+                'restx marshal': best_of(args.repeat, lambda: marshal(dicts, place_out)),
+                'project': best_of(args.repeat, lambda: [project(d, place_out) for d in dicts]),
+                'serialize_place': best_of(args.repeat, lambda: [serialize_place(place) for place in places]),
+                'restx output_json': best_of(args.repeat, lambda: restx_output_json(shaped, 200)),
+                'fast output_json': best_of(args.repeat, lambda: output_json(shaped, 200)),
+                'before (total)': best_of(args.repeat, lambda: restx_output_json(
+                    marshal([place.to_dict() for place in places], place_out), 200)),
+                'project (total)': best_of(args.repeat, lambda: output_json(
+                    [project(place.to_dict(), place_out) for place in places], 200)),
+                'compiled (total)': best_of(args.repeat, lambda: output_json(
+                    [serialize_place(place) for place in places], 200)),
+            }
+
+        db.session.remove()
+
+    # Outside the app context, so every request starts with an empty session
+    client = app.test_client()
+    client.get('/api/v1/places/')
+    timings['GET /places/'] = best_of(args.repeat, lambda: client.get('/api/v1/places/'))
+
+    print(f"{args.places} places, best of {args.repeat}")
+    for label, ms in timings.items():
+        print(f"  {label:<28}{ms:>10.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
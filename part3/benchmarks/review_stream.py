@@ -0,0 +1,94 @@
+"""
+Benchmark: polling GET /api/v1/reviews/ vs the review event stream
+
+Viewers of one place page either poll the review list every
+``--poll-seconds``, or keep GET /api/v1/places/<id>/reviews/stream open.
+For each number of viewers this prints the server time spent per minute:
+
+- polling: measured time of one GET /api/v1/reviews/ (Flask test client,
+  no network) times the polls of all viewers;
+- streaming: measured time of publishing one review write to every
+  viewer's queue and taking it off again, times ``--writes-per-minute``,
+  plus the keep-alive comments.
+
+The database is seeded once into a temporary SQLite file.
+
+Usage:
+    python benchmarks/review_stream.py [--reviews 2000] [--poll-seconds 5] [--writes-per-minute 10]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.models.base_model import db
+from app.presentation.api.streams import EventHub, sse_message
+from app.seed import seed_database
+from config import TestingConfig
+
+REVIEW = {'id': 'a' * 36, 'text': 'Lovely place, would stay again', 'rating': 5,
+          'user_id': 'b' * 36, 'place_id': 'c' * 36}
+
+
+def timed(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def fan_out(viewers):
+    hub = EventHub(max_queued=64, max_subscribers=viewers)
+    subscriptions = [hub.subscribe(REVIEW['place_id']) for _ in range(viewers)]
+
+    def publish():
+        hub.publish(REVIEW['place_id'], sse_message('created', REVIEW))
+        for subscription in subscriptions:
+            subscription.next(0)
+    return publish
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--reviews', type=int, default=2000)
+    parser.add_argument('--poll-seconds', type=float, default=5)
+    parser.add_argument('--writes-per-minute', type=float, default=10)
+    parser.add_argument('--heartbeat-seconds', type=float, default=15)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='hbnb-bench-')
+    try:
+        class BenchConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'stream.db')}"
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            seed_database(users=200, places=max(1, args.reviews // 4), reviews_per_place=4)
+            db.session.remove()
+            client = app.test_client()
+            poll_ms = timed(lambda: client.get('/api/v1/reviews/'), 5)
+            ping_ms = timed(lambda: sse_message('ping', {}), 1000)
+
+            polls = 60 / args.poll_seconds
+            pings = 60 / args.heartbeat_seconds
+            print(f"{args.reviews} reviews, one poll = {poll_ms:.1f} ms, "
+                  f"{args.writes_per_minute:g} review writes/min")
+            print(f"{'viewers':>8}{'poll req/min':>14}{'poll ms/min':>13}{'stream ms/min':>15}")
+            for viewers in (10, 100, 1000):
+                publish_ms = timed(fan_out(viewers), 20)
+                stream_ms = args.writes_per_minute * publish_ms + viewers * pings * ping_ms
+                print(f"{viewers:>8}{viewers * polls:>14.0f}{viewers * polls * poll_ms:>13.0f}"
+                      f"{stream_ms:>15.1f}")
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
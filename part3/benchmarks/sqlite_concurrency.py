@@ -0,0 +1,129 @@
+"""
+Benchmark: read throughput on SQLite while reviews are being written concurrently
+
+Compares SQLite defaults (rollback journal) with the DevelopmentConfig PRAGMA
+profile (WAL). Reader threads look up the reviews of a random place while
+writer threads keep inserting reviews.
+
+Usage:
+    python benchmarks/sqlite_concurrency.py [--seconds 5] [--readers 4] [--writers 2]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from app.models.base_model import db, Place, Review, User
+from app.seed import seed_database
+from config import DevelopmentConfig, TestingConfig
+
+PROFILES = {
+    'default': {},
+    'wal': DevelopmentConfig.SQLITE_PRAGMAS,
+}
+
+
+def run_profile(pragmas, seconds, readers, writers):
+    """Run one profile and return (reads, writes, lock errors)"""
+    workdir = tempfile.mkdtemp(prefix='hbnb-bench-')
+
+    class BenchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+        SQLITE_PRAGMAS = pragmas
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        seed_database(users=200, places=2000, reviews_per_place=2, batch_size=2000)
+        place_ids = [row.id for row in db.session.query(Place.id)]
+        user_ids = [row.id for row in db.session.query(User.id)]
+        db.session.remove()
+
+    stop = threading.Event()
+    counters = {'reads': 0, 'writes': 0, 'locked': 0}
+    lock = threading.Lock()
+
+    def reader():
+        rng = random.Random()
+        count = 0
+        with app.app_context():
+            while not stop.is_set():
+                try:
+                    Review.query.filter_by(place_id=rng.choice(place_ids)).all()
+                    db.session.commit()
+                    count += 1
+                except OperationalError:
+                    db.session.rollback()
+                    with lock:
+                        counters['locked'] += 1
+            db.session.remove()
+        with lock:
+            counters['reads'] += count
+
+    def writer():
+        rng = random.Random()
+        count = 0
+        with app.app_context():
+            while not stop.is_set():
+                now = datetime.utcnow()
+                try:
+                    db.session.add(Review(
+                        id=str(uuid.uuid4()),
+                        text='Benchmark review',
+                        rating=rng.randint(1, 5),
+                        user_id=rng.choice(user_ids),
+                        place_id=rng.choice(place_ids),
+                        created_at=now,
+                        updated_at=now,
+                    ))
+                    db.session.commit()
+                    count += 1
+                except OperationalError:
+                    db.session.rollback()
+                    with lock:
+                        counters['locked'] += 1
+            db.session.remove()
+        with lock:
+            counters['writes'] += count
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    with app.app_context():
+        db.engine.dispose()
+    shutil.rmtree(workdir, ignore_errors=True)
+    return counters['reads'], counters['writes'], counters['locked']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{'profile':<10}{'reads/s':>12}{'writes/s':>12}{'lock errors':>14}")
+    for name, pragmas in PROFILES.items():
+        reads, writes, locked = run_profile(pragmas, args.seconds, args.readers, args.writers)
+        print(f"{name:<10}{reads / args.seconds:>12.0f}{writes / args.seconds:>12.0f}{locked:>14}")
+
+
+if __name__ == '__main__':
+    main()
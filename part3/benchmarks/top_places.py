@@ -0,0 +1,105 @@
+"""
+Benchmark: top places by rating and by recent reviews
+
+Compares computing the leaderboards from the review table on every call
+(AVG / COUNT over all reviews, GROUP BY place) with reading the
+incrementally maintained ``place.rating_score`` index and trending totals
+(what GET /api/v1/places/top calls). "trending, job behind" is the same
+window before ``flask advance-trending`` caught up, which sums the hourly
+``place_review_bucket`` counters instead.
+
+The database is seeded once into a temporary SQLite file.
+
+Usage:
+    python benchmarks/top_places.py [--places 20000] [--reviews-per-place 8] [--repeat 20]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select
+
+from app import create_app
+from app.models.base_model import db, Review
+from app.persistence.leaderboard import advance_trending
+from app.persistence.repository import PlaceRepository
+from app.seed import seed_database
+from config import TestingConfig
+
+LIMIT = 10
+# seed_database dates its reviews in the year before 2026-01-01
+UNTIL = datetime(2026, 1, 1)
+WINDOW = timedelta(days=7)
+SINCE = UNTIL - WINDOW
+
+
+def aggregate_rating():
+    prior = 5 * 3.0
+    score = (prior + func.sum(Review.rating)) / (5 + func.count())
+    return db.session.execute(select(Review.place_id, score.label('score'))
+                              .group_by(Review.place_id)
+                              .order_by(score.desc()).limit(LIMIT)).all()
+
+
+def aggregate_trending():
+    total = func.count().label('reviews')
+    return db.session.execute(select(Review.place_id, total)
+                              .where(Review.created_at.between(SINCE, UNTIL))
+                              .group_by(Review.place_id)
+                              .order_by(total.desc()).limit(LIMIT)).all()
+
+
+def timed(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--places', type=int, default=20000)
+    parser.add_argument('--reviews-per-place', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='hbnb-bench-')
+    try:
+        class BenchConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'top.db')}"
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            seed_database(users=max(50, args.reviews_per_place * 4), places=args.places,
+                          reviews_per_place=args.reviews_per_place)
+            advance_trending(UNTIL)
+            db.session.commit()
+            reviews = Review.query.count()
+            print(f"{args.places} places, {reviews} reviews, mean of {args.repeat} calls")
+            print(f"{'leaderboard':>20}{'aggregate ms':>14}{'maintained ms':>15}")
+            repo = PlaceRepository()
+            rows = [
+                ('rating', aggregate_rating, lambda: repo.top_rated(LIMIT)),
+                ('trending', aggregate_trending, lambda: repo.trending(WINDOW, LIMIT, UNTIL)),
+                ('trending, job behind', aggregate_trending,
+                 lambda: repo.trending(WINDOW, LIMIT, UNTIL + timedelta(hours=1))),
+            ]
+            for name, aggregate, maintained in rows:
+                before = timed(aggregate, args.repeat)
+                after = timed(maintained, args.repeat)
+                print(f"{name:>20}{before:>14.1f}{after:>15.1f}")
+            db.session.remove()
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
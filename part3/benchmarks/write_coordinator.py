@@ -0,0 +1,99 @@
+"""
+Benchmark: POST /api/v1/places/ throughput with and without the write coordinator
+
+For each client count, a fresh SQLite file (DevelopmentConfig PRAGMAs, WAL)
+is seeded with users and ``clients`` threads create places through the test
+client for a fixed duration, first committing directly from each request
+thread, then through the single writer thread with group commit.
+
+Usage:
+    python benchmarks/write_coordinator.py [--clients 8 32 128] [--seconds 5]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.models.base_model import db, User
+from app.persistence.writer import write_coordinator
+from app.seed import seed_database
+from config import DevelopmentConfig
+
+
+def run(path, clients, seconds, coordinated):
+    """Return (writes/s, failed requests, commits) for one configuration"""
+    class BenchConfig(DevelopmentConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        SQLALCHEMY_ECHO = False
+        DEBUG = False
+        WRITE_COORDINATOR = coordinated
+        TOKEN_BLOCKLIST_SYNC_SECONDS = 0
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        seed_database(users=clients, places=0, reviews_per_place=0)
+        tokens = [create_access_token(identity=user.id) for user in User.query]
+        db.session.remove()
+
+    counts = [0] * clients
+    failures = [0] * clients
+    deadline = time.time() + seconds
+    payload = {'name': 'Loft', 'description': 'Near the station',
+               'price': 80.0, 'latitude': 24.7, 'longitude': 46.7}
+
+    def client(index):
+        http = app.test_client()
+        headers = {'Authorization': f'Bearer {tokens[index]}'}
+        while time.time() < deadline:
+            if http.post('/api/v1/places/', json=payload, headers=headers).status_code == 201:
+                counts[index] += 1
+            else:
+                failures[index] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - started
+
+    with app.app_context():
+        coordinator = write_coordinator()
+        commits = coordinator.commits if coordinator else sum(counts)
+        db.session.remove()
+        db.engine.dispose()
+    return sum(counts) / elapsed, sum(failures), commits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, nargs='+', default=[8, 32, 128])
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='hbnb-bench-')
+    try:
+        print(f"{args.seconds:.0f}s per run")
+        print(f"{'clients':>8}{'mode':>14}{'writes/s':>10}{'failed':>8}{'commits':>9}")
+        for clients in args.clients:
+            for coordinated in (False, True):
+                mode = 'coordinator' if coordinated else 'direct'
+                path = os.path.join(workdir, f"{mode}-{clients}.db")
+                rate, failed, commits = run(path, clients, args.seconds, coordinated)
+                print(f"{clients:>8}{mode:>14}{rate:>10.0f}{failed:>8}{commits:>9}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
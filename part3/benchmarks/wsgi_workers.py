@@ -0,0 +1,123 @@
+"""
+Benchmark: request throughput of the gunicorn deployment from 1 to N workers
+
+Seeds a temporary SQLite database, then for each worker count starts
+``gunicorn -c gunicorn.conf.py wsgi:app`` and drives GET /api/v1/places/<id>
+from several client processes for a fixed duration.
+
+Usage:
+    python benchmarks/wsgi_workers.py [--workers 1 2 4] [--seconds 10] [--clients 8]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import requests
+
+from app import create_app
+from app.models.base_model import db, Place
+from app.seed import seed_database
+from config import TestingConfig
+
+
+def seed(path, places):
+    """Create the benchmark database and return some place ids"""
+    class SeedConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+
+    app = create_app(SeedConfig)
+    with app.app_context():
+        seed_database(users=200, places=places, reviews_per_place=2)
+        place_ids = [row.id for row in db.session.query(Place.id).limit(1000)]
+        db.session.remove()
+        db.engine.dispose()
+    return place_ids
+
+
+def client(url, place_ids, deadline, results):
+    """Issue requests until ``deadline`` and report the number completed"""
+    session = requests.Session()
+    rng = random.Random()
+    count = 0
+    while time.time() < deadline:
+        response = session.get(f"{url}/api/v1/places/{rng.choice(place_ids)}")
+        if response.status_code == 200:
+            count += 1
+    results.put(count)
+
+
+def wait_until_up(url, timeout=30):
+    """Poll the server until it answers"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(f"{url}/api/v1/amenities/", timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn did not start")
+
+
+def run(workers, seconds, clients, db_path, place_ids, port):
+    """Start gunicorn with ``workers`` workers and return requests/second"""
+    env = dict(os.environ,
+               FLASK_ENV='production',
+               SQLALCHEMY_DATABASE_URI=f"sqlite:///{db_path}",
+               GUNICORN_WORKERS=str(workers),
+               GUNICORN_BIND=f"127.0.0.1:{port}",
+               GUNICORN_ACCESSLOG='')
+    server = subprocess.Popen(['gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+                              cwd=BASE_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_up(url)
+        results = multiprocessing.Queue()
+        deadline = time.time() + seconds
+        procs = [multiprocessing.Process(target=client, args=(url, place_ids, deadline, results))
+                 for _ in range(clients)]
+        for proc in procs:
+            proc.start()
+        total = sum(results.get() for _ in procs)
+        for proc in procs:
+            proc.join()
+    finally:
+        server.terminate()
+        server.wait()
+    return total / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--places', type=int, default=5000)
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='hbnb-bench-')
+    try:
+        db_path = os.path.join(workdir, 'bench.db')
+        place_ids = seed(db_path, args.places)
+        print(f"{os.cpu_count()} CPUs, {args.clients} client processes, {args.seconds:.0f}s per run")
+        print(f"{'workers':>8}{'req/s':>10}")
+        for workers in args.workers:
+            rate = run(workers, args.seconds, args.clients, db_path, place_ids, args.port)
+            print(f"{workers:>8}{rate:>10.0f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
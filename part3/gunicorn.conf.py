@@ -0,0 +1,74 @@
+"""
+Gunicorn configuration for HBnB
+
+The application is imported once in the master (preload_app) and shared with
+the workers copy-on-write:
+
+- the garbage collector is disabled in the master and its heap is frozen
+  right before each fork, so collections in the workers never write to the
+  pages of objects created at import time;
+- each worker re-enables the collector and disposes the SQLAlchemy engine
+  pool inherited from the master, so no database connection is shared
+  across processes;
+- workers are threaded (gthread); each caps its review streams below its
+  thread count, and a sync worker serves none;
+- a worker that shuts down writes its buffered place view counts.
+
+Every setting can be overridden with an environment variable.
+"""
+
+import gc
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '5000')}")
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# Threaded workers: an open review stream holds one thread, not a whole
+# worker, and does not count against the worker timeout
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 0))
+accesslog = os.getenv('GUNICORN_ACCESSLOG', '-') or None  # empty disables
+preload_app = True
+
+# Avoid freeing objects in the master, which would dirty shared pages
+gc.disable()
+
+
+def pre_fork(server, worker):
+    """Move every object created so far to the permanent generation"""
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Re-enable the collector and drop connections inherited from the master"""
+    gc.enable()
+
+    from app.models.base_model import db
+    from app.persistence.routing import replica_engines
+
+    app = server.app.wsgi()
+    with app.app_context():
+        for engine in [*db.engines.values(), *replica_engines(app)]:
+            # close=False leaves the parent's connections untouched
+            engine.dispose(close=False)
+
+    # A stream would block a sync worker until the timeout kills it; in a
+    # threaded worker, keep one thread free for the other requests
+    from app.presentation.api.streams import limit_review_streams
+
+    if type(worker).__name__ == 'SyncWorker':
+        limit_review_streams(app, 0)
+    elif type(worker).__name__ == 'ThreadWorker':
+        limit_review_streams(app, server.cfg.threads - 1)
+
+
+def worker_exit(server, worker):
+    """Write the worker's buffered place view counts before it exits"""
+    from app.persistence.views import ViewCounter
+
+    counter = server.app.wsgi().extensions.get('view_counter')
+    if isinstance(counter, ViewCounter):
+        counter.flush()
@@ -17,4 +17,4 @@ config_class = config_map.get(env, DevelopmentConfig)
 app = create_app(config_class)
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    app.run(host="0.0.0.0", port=5000, debug=app.config.get("DEBUG", False))
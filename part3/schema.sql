@@ -3,6 +3,16 @@
 -- This script creates all tables with proper relationships and constraints
 
 -- Drop tables if they exist (in reverse order of dependencies)
+DROP TABLE IF EXISTS revoked_token;
+DROP TABLE IF EXISTS refresh_token;
+DROP TABLE IF EXISTS trigram_frequency;
+DROP TABLE IF EXISTS amenity_trigram;
+DROP TABLE IF EXISTS place_trigram;
+DROP TABLE IF EXISTS place_cell;
+DROP TABLE IF EXISTS place_view_count;
+DROP TABLE IF EXISTS place_trending;
+DROP TABLE IF EXISTS trending_window;
+DROP TABLE IF EXISTS place_review_bucket;
 DROP TABLE IF EXISTS place_amenity;
 DROP TABLE IF EXISTS review;
 DROP TABLE IF EXISTS place;
@@ -18,7 +28,8 @@ CREATE TABLE user (
     password VARCHAR(255) NOT NULL,
     is_admin BOOLEAN DEFAULT FALSE NOT NULL,
     created_at DATETIME NOT NULL,
-    updated_at DATETIME NOT NULL
+    updated_at DATETIME NOT NULL,
+    version INT NOT NULL DEFAULT 1
 );
 
 -- Create Amenity table
@@ -26,7 +37,8 @@ CREATE TABLE amenity (
     id CHAR(36) PRIMARY KEY,
     name VARCHAR(255) UNIQUE NOT NULL,
     created_at DATETIME NOT NULL,
-    updated_at DATETIME NOT NULL
+    updated_at DATETIME NOT NULL,
+    version INT NOT NULL DEFAULT 1
 );
 
 -- Create Place table
@@ -38,8 +50,12 @@ CREATE TABLE place (
     latitude FLOAT NOT NULL,
     longitude FLOAT NOT NULL,
     owner_id CHAR(36) NOT NULL,
+    review_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    rating_score FLOAT NULL,
     created_at DATETIME NOT NULL,
     updated_at DATETIME NOT NULL,
+    version INT NOT NULL DEFAULT 1,
     FOREIGN KEY (owner_id) REFERENCES user(id) ON DELETE CASCADE
 );
 
@@ -52,6 +68,7 @@ CREATE TABLE review (
     place_id CHAR(36) NOT NULL,
     created_at DATETIME NOT NULL,
     updated_at DATETIME NOT NULL,
+    version INT NOT NULL DEFAULT 1,
     FOREIGN KEY (user_id) REFERENCES user(id) ON DELETE CASCADE,
     FOREIGN KEY (place_id) REFERENCES place(id) ON DELETE CASCADE,
     UNIQUE(user_id, place_id)
@@ -66,9 +83,120 @@ CREATE TABLE place_amenity (
     FOREIGN KEY (amenity_id) REFERENCES amenity(id) ON DELETE CASCADE
 );
 
+-- Create Place_Review_Bucket table (reviews per place per hour, for trending places)
+CREATE TABLE place_review_bucket (
+    place_id CHAR(36) NOT NULL,
+    bucket DATETIME NOT NULL,
+    count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, place_id),
+    FOREIGN KEY (place_id) REFERENCES place(id) ON DELETE CASCADE
+);
+
+-- Create Trending_Window table (maintained trending windows and their first bucket)
+CREATE TABLE trending_window (
+    hours INT PRIMARY KEY,
+    start DATETIME NOT NULL
+);
+
+-- Create Place_Trending table (reviews per place within a maintained trending window)
+CREATE TABLE place_trending (
+    hours INT NOT NULL,
+    place_id CHAR(36) NOT NULL,
+    reviews INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (hours, place_id),
+    FOREIGN KEY (place_id) REFERENCES place(id) ON DELETE CASCADE
+);
+
+-- Create Place_View_Count table (detail views, written in batches)
+CREATE TABLE place_view_count (
+    place_id CHAR(36) PRIMARY KEY,
+    count BIGINT NOT NULL DEFAULT 0,
+    FOREIGN KEY (place_id) REFERENCES place(id) ON DELETE CASCADE
+);
+
+-- Create Place_Cell table (places by map tile per zoom level, for clustering)
+CREATE TABLE place_cell (
+    level SMALLINT NOT NULL,
+    x INT NOT NULL,
+    y INT NOT NULL,
+    place_id CHAR(36) NOT NULL,
+    latitude FLOAT NOT NULL,
+    longitude FLOAT NOT NULL,
+    price FLOAT NOT NULL,
+    PRIMARY KEY (level, x, y, place_id),
+    FOREIGN KEY (place_id) REFERENCES place(id) ON DELETE CASCADE
+);
+
+-- Create Place_Trigram / Amenity_Trigram tables (name trigrams, for fuzzy search)
+CREATE TABLE place_trigram (
+    trigram VARCHAR(12) NOT NULL,
+    place_id CHAR(36) NOT NULL,
+    size SMALLINT NOT NULL,
+    PRIMARY KEY (trigram, place_id),
+    FOREIGN KEY (place_id) REFERENCES place(id) ON DELETE CASCADE
+);
+
+CREATE TABLE amenity_trigram (
+    trigram VARCHAR(12) NOT NULL,
+    amenity_id CHAR(36) NOT NULL,
+    size SMALLINT NOT NULL,
+    PRIMARY KEY (trigram, amenity_id),
+    FOREIGN KEY (amenity_id) REFERENCES amenity(id) ON DELETE CASCADE
+);
+
+-- Create Trigram_Frequency table (names containing each trigram; '' counts the names)
+CREATE TABLE trigram_frequency (
+    entity VARCHAR(16) NOT NULL,
+    trigram VARCHAR(12) NOT NULL,
+    entries INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (entity, trigram)
+);
+
+-- Create Change_Log table (append-only write log, for /changes)
+CREATE TABLE change_log (
+    seq BIGINT AUTO_INCREMENT PRIMARY KEY,
+    entity VARCHAR(16) NOT NULL,
+    entity_id CHAR(36) NOT NULL,
+    op VARCHAR(6) NOT NULL,
+    changed_at DATETIME NOT NULL
+);
+
+-- Create Refresh_Token table (issued refresh tokens, id = token JTI)
+CREATE TABLE refresh_token (
+    id CHAR(36) PRIMARY KEY,
+    user_id CHAR(36) NOT NULL,
+    expires_at DATETIME NOT NULL,
+    revoked_at DATETIME NULL,
+    replaced_by CHAR(36) NULL,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    version INT NOT NULL DEFAULT 1,
+    FOREIGN KEY (user_id) REFERENCES user(id) ON DELETE CASCADE
+);
+
+-- Create Revoked_Token table (logged-out / revoked JWT identifiers)
+CREATE TABLE revoked_token (
+    jti CHAR(36) PRIMARY KEY,
+    expires_at DATETIME NOT NULL,
+    created_at DATETIME NOT NULL
+);
+
 -- Create indexes for better query performance
 CREATE INDEX idx_user_email ON user(email);
 CREATE INDEX idx_amenity_name ON amenity(name);
 CREATE INDEX idx_place_owner_id ON place(owner_id);
+CREATE INDEX idx_place_amenity_amenity_place ON place_amenity(amenity_id, place_id);
+CREATE INDEX idx_place_rating_score ON place(rating_score);
+CREATE INDEX idx_place_review_bucket_place_id ON place_review_bucket(place_id);
+CREATE INDEX idx_place_trending_hours_reviews ON place_trending(hours, reviews);
+CREATE INDEX idx_place_trending_place_id ON place_trending(place_id);
+CREATE INDEX idx_place_cell_place_id ON place_cell(place_id);
+CREATE INDEX idx_place_trigram_place_id ON place_trigram(place_id);
+CREATE INDEX idx_amenity_trigram_amenity_id ON amenity_trigram(amenity_id);
+CREATE INDEX idx_change_log_changed_at ON change_log(changed_at);
 CREATE INDEX idx_review_user_id ON review(user_id);
 CREATE INDEX idx_review_place_id ON review(place_id);
+CREATE INDEX idx_refresh_token_user_id ON refresh_token(user_id);
+CREATE INDEX idx_refresh_token_expires_at ON refresh_token(expires_at);
+CREATE INDEX idx_revoked_token_expires_at ON revoked_token(expires_at);
+CREATE INDEX idx_revoked_token_created_at ON revoked_token(created_at);
@@ -0,0 +1 @@
+"""Tests for HBnB Part 3"""
@@ -0,0 +1,67 @@
+"""
+Fixtures shared by the test modules; a module that needs a differently
+configured app overrides ``app``
+"""
+
+import pytest
+from sqlalchemy import event
+from app import create_app
+from app.models.base_model import db, User
+from config import TestingConfig
+
+
+@pytest.fixture
+def app():
+    """Create application for testing"""
+    app = create_app(TestingConfig)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+
+@pytest.fixture
+def register(client):
+    """Register users through the API: ``register(email, admin=False)`` returns the token response
+
+    An admin is promoted in the database, then refreshes for a token with the claim.
+    """
+    def register(email, admin=False):
+        tokens = client.post('/api/v1/auth/register', json={
+            'first_name': 'User',
+            'last_name': 'Test',
+            'email': email,
+            'password': 'secret123'
+        }).json
+        if admin:
+            user = db.session.get(User, tokens['user_id'])
+            user.is_admin = True
+            db.session.commit()
+            tokens = client.post('/api/v1/auth/refresh', headers={
+                'Authorization': f"Bearer {tokens['refresh_token']}"
+            }).json
+        return tokens
+    return register
+
+
+@pytest.fixture
+def statements(app):
+    """Record the SQL statements issued while the test runs"""
+    issued = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        # Periodic token blocklist syncs are not part of the code under test
+        if 'revoked_token' not in statement:
+            issued.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield issued
+    event.remove(db.engine, "before_cursor_execute", record)
@@ -0,0 +1,82 @@
+"""
+Tests for filtering places by amenities (GET /api/v1/places/?amenities=...)
+"""
+
+import pytest
+from sqlalchemy import event, inspect
+from app.models.base_model import db, User, Place, Amenity
+
+
+@pytest.fixture
+def amenities(app):
+    """Places ``p0``..``p5`` with amenities, returned as {name: id}"""
+    owner = User(first_name='Owner', last_name='Test', email='owner@test.com')
+    owner.hash_password('secret123')
+    wifi, pool, gym = Amenity(name='WiFi'), Amenity(name='Pool'), Amenity(name='Gym')
+    links = [[wifi, pool, gym], [wifi, pool], [wifi], [pool, gym], [], [gym]]
+    db.session.add_all([owner, wifi, pool, gym])
+    db.session.flush()
+    for index, place_amenities in enumerate(links):
+        place = Place(name=f'p{index}', description='Test', price=50.0,
+                      latitude=10.0, longitude=20.0, owner_id=owner.id)
+        place.amenities = place_amenities
+        db.session.add(place)
+    db.session.commit()
+    ids = {amenity.name: amenity.id for amenity in (wifi, pool, gym)}
+    db.session.remove()
+    return ids
+
+
+def _names(response):
+    assert response.status_code == 200
+    return sorted(place['name'] for place in response.json)
+
+
+def test_reverse_index_exists(app):
+    indexes = inspect(db.engine).get_indexes('place_amenity')
+    assert ['amenity_id', 'place_id'] in [index['column_names'] for index in indexes]
+
+
+def test_match_all_and_any(client, amenities):
+    wifi_pool = f"{amenities['WiFi']},{amenities['Pool']}"
+
+    assert _names(client.get(f'/api/v1/places/?amenities={wifi_pool}')) == ['p0', 'p1']
+    assert _names(client.get(f'/api/v1/places/?amenities={wifi_pool}&match=any')) == [
+        'p0', 'p1', 'p2', 'p3']
+    assert _names(client.get(f"/api/v1/places/?amenities={amenities['Gym']}")) == [
+        'p0', 'p3', 'p5']
+    # Repeated ids count once
+    assert _names(client.get(
+        f"/api/v1/places/?amenities={amenities['WiFi']},{amenities['WiFi']}")) == ['p0', 'p1', 'p2']
+    assert _names(client.get(f'/api/v1/places/?amenities={wifi_pool},unknown')) == []
+
+
+def test_filter_is_one_query(app, client, amenities):
+    """Filtering, grouping and pagination happen in a single SELECT on place"""
+    issued = []
+    record = lambda conn, cursor, statement, *args: issued.append(statement)
+    event.listen(db.engine, "before_cursor_execute", record)
+    client.get(f"/api/v1/places/?amenities={amenities['WiFi']},{amenities['Gym']}&limit=1")
+    event.remove(db.engine, "before_cursor_execute", record)
+
+    place_queries = [s for s in issued if s.startswith('SELECT place.')]
+    assert len(place_queries) == 1
+    assert 'GROUP BY place_amenity.place_id' in place_queries[0] and 'HAVING' in place_queries[0]
+
+
+def test_pagination_composes_with_filter(client, amenities):
+    url = f"/api/v1/places/?amenities={amenities['Gym']}&limit=2"
+    first = client.get(url).json
+    second = client.get(url + '&offset=2').json
+
+    assert len(first) == 2 and len(second) == 1
+    pages = [place['id'] for place in first + second]
+    assert pages == sorted(pages)
+    assert sorted(place['name'] for place in first + second) == ['p0', 'p3', 'p5']
+    assert len(client.get('/api/v1/places/?limit=4').json) == 4
+
+
+@pytest.mark.parametrize('query', ['match=some', 'limit=0', 'limit=1001', 'offset=-1',
+                                   'amenities=' + ','.join(str(i) for i in range(21))])
+def test_rejects_bad_arguments(client, query):
+    assert client.get(f'/api/v1/places/?{query}').status_code == 400
@@ -0,0 +1,132 @@
+"""
+Tests for authentication: login, registration and refresh token rotation
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from flask_jwt_extended import decode_token
+from app.auth.auth_utils import prune_refresh_tokens_command
+from app.models.base_model import db, User, RefreshToken
+
+
+@pytest.fixture
+def tokens(client):
+    """Register a user and return its token response"""
+    response = client.post('/api/v1/auth/register', json={
+        'first_name': 'User',
+        'last_name': 'Test',
+        'email': 'user@test.com',
+        'password': 'user123'
+    })
+    assert response.status_code == 201
+    return response.json
+
+
+def _refresh(client, refresh_token):
+    return client.post('/api/v1/auth/refresh',
+                       headers={'Authorization': f'Bearer {refresh_token}'})
+
+
+def _age_rotations(seconds):
+    """Move every rotation ``seconds`` into the past"""
+    for token in RefreshToken.query.filter(RefreshToken.revoked_at.isnot(None)):
+        token.revoked_at -= timedelta(seconds=seconds)
+    db.session.commit()
+
+
+def test_register_returns_refresh_token(tokens):
+    """Registration returns both tokens"""
+    assert tokens['access_token']
+    assert tokens['refresh_token']
+    assert RefreshToken.query.count() == 1
+
+
+def test_login_returns_refresh_token(client, tokens):
+    """Login returns both tokens"""
+    response = client.post('/api/v1/auth/login', json={
+        'email': 'user@test.com',
+        'password': 'user123'
+    })
+    assert response.status_code == 200
+    assert response.json['refresh_token']
+
+
+def test_refresh_rotates_tokens(client, tokens, monkeypatch):
+    """Refreshing issues a new pair without verifying the password"""
+    def fail(*args, **kwargs):
+        raise AssertionError("bcrypt must not be used on refresh")
+    monkeypatch.setattr(User, 'verify_password', fail)
+
+    response = _refresh(client, tokens['refresh_token'])
+    assert response.status_code == 200
+    assert response.json['refresh_token'] != tokens['refresh_token']
+
+    # The new access token works on protected endpoints
+    headers = {'Authorization': f"Bearer {response.json['access_token']}"}
+    response = client.put(f"/api/v1/users/{tokens['user_id']}",
+                          json={'first_name': 'New'}, headers=headers)
+    assert response.status_code == 200
+
+
+def test_refresh_token_is_single_use(client, tokens):
+    """Reusing a rotated refresh token after the grace window revokes the whole session family"""
+    rotated = _refresh(client, tokens['refresh_token']).json
+    _age_rotations(60)
+
+    assert _refresh(client, tokens['refresh_token']).status_code == 401
+    # The token issued by the legitimate rotation was revoked as well
+    assert _refresh(client, rotated['refresh_token']).status_code == 401
+
+
+def test_access_token_cannot_refresh(client, tokens):
+    """Only refresh tokens are accepted by /auth/refresh"""
+    assert _refresh(client, tokens['access_token']).status_code == 422
+
+
+def test_refresh_picks_up_admin_changes(client, tokens):
+    """New access tokens reflect the current is_admin flag"""
+    user = db.session.get(User, tokens['user_id'])
+    user.is_admin = True
+    db.session.commit()
+
+    response = _refresh(client, tokens['refresh_token'])
+    headers = {'Authorization': f"Bearer {response.json['access_token']}"}
+    response = client.post('/api/v1/amenities/', json={'name': 'WiFi'}, headers=headers)
+    assert response.status_code == 201
+
+
+def test_refresh_token_reuse_within_grace(client, tokens):
+    """Two tabs refreshing with the same token both get a pair; the session survives"""
+    first = _refresh(client, tokens['refresh_token'])
+    second = _refresh(client, tokens['refresh_token'])
+    assert first.status_code == second.status_code == 200
+
+    # The second refresh rotated the first one's token: one active token remains
+    first_jti = decode_token(first.json['refresh_token'])['jti']
+    second_jti = decode_token(second.json['refresh_token'])['jti']
+    assert RefreshToken.query.filter_by(revoked_at=None).one().id == second_jti
+    assert db.session.get(RefreshToken, first_jti).revoked_at is not None
+    assert _refresh(client, second.json['refresh_token']).status_code == 200
+
+
+def test_refresh_token_grace_covers_one_rotation(client, tokens):
+    """Only the token immediately preceding the active one is accepted again"""
+    rotated = _refresh(client, tokens['refresh_token']).json
+    latest = _refresh(client, rotated['refresh_token']).json
+
+    assert _refresh(client, tokens['refresh_token']).status_code == 401
+    # Presented inside the window, so no session was revoked
+    assert _refresh(client, latest['refresh_token']).status_code == 200
+
+
+def test_prune_refresh_tokens(app, tokens):
+    """Expired refresh tokens are deleted, live ones are kept"""
+    expired = RefreshToken(id='expired', user_id=tokens['user_id'],
+                           expires_at=datetime.utcnow() - timedelta(seconds=1))
+    db.session.add(expired)
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(prune_refresh_tokens_command)
+    assert result.exit_code == 0
+    assert 'Pruned 1 refresh tokens' in result.output
+    assert [token.user_id for token in RefreshToken.query] == [tokens['user_id']]
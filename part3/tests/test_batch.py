@@ -0,0 +1,182 @@
+"""
+Tests for batched requests (POST /api/v1/batch)
+"""
+
+import sqlite3
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.models.base_model import db, User, Place, Review, Amenity, ChangeLog
+from app.persistence.batch import Batch
+from app.presentation.api.streams import review_hub
+from config import TestingConfig
+
+
+@pytest.fixture
+def ids(app):
+    """An owner with a place, a guest, an admin and two amenities, returned as {name: id}"""
+    users = {name: User(first_name=name.title(), last_name='Test', email=f'{name}@test.com',
+                        is_admin=name == 'admin')
+             for name in ('owner', 'guest', 'admin')}
+    for user in users.values():
+        user.hash_password('secret123')
+    db.session.add_all(users.values())
+    db.session.flush()
+    place = Place(name='Loft', description='Test', price=50.0, latitude=10.0,
+                  longitude=20.0, owner_id=users['owner'].id)
+    amenities = [Amenity(name='Wi-Fi'), Amenity(name='Parking')]
+    db.session.add_all([place, *amenities])
+    db.session.commit()
+    ids = {name: user.id for name, user in users.items()}
+    ids.update(place=place.id, wifi=amenities[0].id, parking=amenities[1].id)
+    db.session.remove()
+    return ids
+
+
+def _auth(user_id, is_admin=False):
+    token = create_access_token(identity=user_id, additional_claims={'is_admin': is_admin})
+    return {'Authorization': f"Bearer {token}"}
+
+
+def _batch(client, user_id, requests, atomic=False, is_admin=False, status=200):
+    response = client.post('/api/v1/batch/', json={'requests': requests, 'atomic': atomic},
+                           headers=_auth(user_id, is_admin))
+    assert response.status_code == status, response.json
+    return response.json
+
+
+def test_requests_run_in_order_and_commit_together(client, ids):
+    place_url = f"/api/v1/places/{ids['place']}"
+    result = _batch(client, ids['guest'], [
+        {'method': 'POST', 'path': '/api/v1/reviews/',
+         'body': {'text': 'Lovely', 'rating': 5, 'place_id': ids['place']}},
+        {'method': 'PUT', 'path': place_url, 'body': {'price': 80.0}},
+        {'method': 'GET', 'path': place_url},
+        {'method': 'GET', 'path': '/api/v1/places/?limit=1'},
+    ])
+
+    assert result['committed'] is True
+    assert [item['status'] for item in result['results']] == [201, 403, 200, 200]
+    review_id = result['results'][0]['body']['id']
+    # Later requests see the earlier writes of the batch
+    assert result['results'][2]['body']['review_ids'] == [review_id]
+    assert len(result['results'][3]['body']) == 1
+    assert db.session.get(Review, review_id).place_id == ids['place']
+    assert db.session.get(Place, ids['place']).price == 50.0
+
+
+def test_failed_request_is_undone_alone(client, ids):
+    result = _batch(client, ids['admin'], [
+        {'method': 'PUT', 'path': f"/api/v1/amenities/{ids['wifi']}", 'body': {'name': 'Wireless'}},
+        # Fails in the flush (unique name), after the UPDATE was sent
+        {'method': 'PUT', 'path': f"/api/v1/amenities/{ids['parking']}", 'body': {'name': 'Wireless'}},
+        {'method': 'POST', 'path': '/api/v1/amenities/', 'body': {'name': 'Pool'}},
+    ], is_admin=True)
+
+    assert [item['status'] for item in result['results']] == [200, 409, 201]
+    assert sorted(amenity.name for amenity in Amenity.query) == ['Parking', 'Pool', 'Wireless']
+    assert [(entry.entity_id, entry.op) for entry in ChangeLog.query.filter(ChangeLog.seq > 6)] == [
+        (ids['wifi'], 'upsert'), (result['results'][2]['body']['id'], 'upsert')]
+
+
+def test_atomic_batch_commits_nothing_after_a_failure(client, ids):
+    before = ChangeLog.query.count()
+    result = _batch(client, ids['owner'], [
+        {'method': 'PUT', 'path': f"/api/v1/places/{ids['place']}", 'body': {'price': 80.0}},
+        {'method': 'POST', 'path': '/api/v1/amenities/', 'body': {'name': 'Pool'}},
+        {'method': 'DELETE', 'path': f"/api/v1/places/{ids['place']}"},
+    ], atomic=True)
+
+    assert result['committed'] is False
+    assert [item['status'] for item in result['results']] == [200, 403, 424]
+    assert db.session.get(Place, ids['place']).price == 50.0
+    assert ChangeLog.query.count() == before
+
+
+def test_review_events_wait_for_the_commit(app, client, ids):
+    subscription = review_hub().subscribe(ids['place'])
+    review = {'method': 'POST', 'path': '/api/v1/reviews/',
+              'body': {'text': 'Lovely', 'rating': 5, 'place_id': ids['place']}}
+    forbidden = {'method': 'DELETE', 'path': f"/api/v1/places/{ids['place']}"}
+
+    _batch(client, ids['guest'], [review, forbidden], atomic=True)
+    assert subscription.next(0) is None
+    _batch(client, ids['guest'], [review, forbidden])
+    assert subscription.next(0).startswith('event: created\n')
+
+
+def test_sub_requests_use_the_callers_token(client, ids):
+    result = _batch(client, ids['owner'], [
+        {'method': 'PUT', 'path': f"/api/v1/users/{ids['owner']}", 'body': {'first_name': 'Olga'}},
+        {'method': 'PUT', 'path': f"/api/v1/users/{ids['guest']}", 'body': {'first_name': 'Olga'}},
+    ])
+    assert [item['status'] for item in result['results']] == [200, 403]
+    assert client.post('/api/v1/batch/', json={'requests': [
+        {'method': 'GET', 'path': '/api/v1/places/'}]}).status_code == 401
+
+
+@pytest.mark.parametrize('requests', [
+    [],
+    [{'method': 'POST', 'path': '/api/v1/auth/login', 'body': {}}],
+    [{'method': 'POST', 'path': '/api/v1/batch/', 'body': {'requests': []}}],
+    [{'method': 'GET', 'path': '/api/v1/places/x/reviews/stream'}],
+    [{'method': 'GET', 'path': '/api/v1/places/../auth/login'}],
+    [{'method': 'PATCH', 'path': '/api/v1/places/'}],
+    [{'method': 'POST', 'path': '/api/v1/places/'}],
+])
+def test_rejects_invalid_batches(client, ids, requests):
+    _batch(client, ids['owner'], requests, status=400)
+
+
+def test_size_limits(app, client, ids):
+    requests = [{'method': 'GET', 'path': '/api/v1/places/'}] * (app.config['BATCH_MAX_REQUESTS'] + 1)
+    _batch(client, ids['owner'], requests, status=413)
+    app.config['BATCH_MAX_BYTES'] = 100
+    _batch(client, ids['owner'], requests[:2], status=413)
+
+
+def test_body_size_is_checked_before_parsing(client, ids):
+    # Unauthenticated: refused before the body is read, even when it is invalid
+    assert client.post('/api/v1/batch/', data='{' * 10, content_type='application/json',
+                       headers={'Content-Length': '10'}).status_code == 401
+
+    response = client.post('/api/v1/batch/', data='{"requests": []}', content_type='application/json',
+                           headers={**_auth(ids['owner']), 'Transfer-Encoding': 'chunked'})
+    assert response.status_code == 411
+
+
+def test_remaining_requests_are_not_run_after_the_deadline(app, client, ids):
+    app.config['BATCH_MAX_SECONDS'] = 0
+    result = _batch(client, ids['owner'], [
+        {'method': 'PUT', 'path': f"/api/v1/places/{ids['place']}", 'body': {'price': 80.0}},
+        {'method': 'PUT', 'path': f"/api/v1/places/{ids['place']}", 'body': {'price': 90.0}},
+    ])
+    assert result['committed'] is True
+    assert [item['status'] for item in result['results']] == [200, 503]
+    assert db.session.get(Place, ids['place']).price == 80.0
+
+
+@pytest.mark.parametrize('writes', [False, True])
+def test_only_writing_batches_take_the_write_lock(tmp_path, writes):
+    path = tmp_path / 'batch.db'
+
+    class FileConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        db.create_all()
+        Batch(db.session()).begin(writes=writes)
+        db.session.get(Place, 'x')
+        other = sqlite3.connect(path, timeout=0)
+        try:
+            if writes:
+                with pytest.raises(sqlite3.OperationalError, match='locked'):
+                    other.execute('BEGIN IMMEDIATE')
+            else:
+                other.execute('BEGIN IMMEDIATE')
+                other.rollback()
+        finally:
+            other.close()
+            db.session.remove()
+            db.engine.dispose()
@@ -0,0 +1,152 @@
+"""
+Tests for token revocation: Bloom filter, logout and admin revocation
+"""
+
+import os
+import uuid
+from datetime import datetime, timedelta
+from app import create_app
+from app.auth import auth_utils
+from app.auth.blocklist import BloomFilter, TokenBlocklist
+from app.models.base_model import db, RevokedToken
+from config import TestingConfig
+
+
+def _auth(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def _update_self(client, tokens):
+    return client.put(f"/api/v1/users/{tokens['user_id']}",
+                      json={'first_name': 'Changed'}, headers=_auth(tokens['access_token']))
+
+
+# ==================== Data structures ====================
+
+def test_bloom_filter_has_no_false_negatives():
+    """Every added item is reported as present"""
+    bloom = BloomFilter(1000)
+    items = [str(uuid.uuid4()) for _ in range(1000)]
+    for item in items:
+        bloom.add(item)
+    assert all(item in bloom for item in items)
+
+
+def test_bloom_filter_false_positive_rate():
+    """The false positive rate stays near the configured error rate"""
+    bloom = BloomFilter(1000, error_rate=0.01)
+    for _ in range(1000):
+        bloom.add(str(uuid.uuid4()))
+    false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(10000))
+    assert false_positives < 300
+
+
+def test_blocklist_grows_past_capacity():
+    """The blocklist stays exact when more JTIs than its capacity are added"""
+    blocklist = TokenBlocklist(capacity=10)
+    jtis = [str(uuid.uuid4()) for _ in range(100)]
+    blocklist.update(jtis)
+    assert len(blocklist) == 100
+    assert all(jti in blocklist for jti in jtis)
+    assert str(uuid.uuid4()) not in blocklist
+
+
+# ==================== Endpoints ====================
+
+def test_logout_revokes_access_token(client, register):
+    """The access token is rejected after logout"""
+    tokens = register('user@test.com')
+    assert _update_self(client, tokens).status_code == 200
+
+    response = client.post('/api/v1/auth/logout', headers=_auth(tokens['access_token']))
+    assert response.status_code == 200
+    assert _update_self(client, tokens).status_code == 401
+
+
+def test_logout_revokes_refresh_token(client, register):
+    """A refresh token passed to logout can no longer be used"""
+    tokens = register('user@test.com')
+    client.post('/api/v1/auth/logout', json={'refresh_token': tokens['refresh_token']},
+                headers=_auth(tokens['access_token']))
+
+    response = client.post('/api/v1/auth/refresh', headers=_auth(tokens['refresh_token']))
+    assert response.status_code == 401
+
+
+def test_logout_rejects_foreign_refresh_token(client, register):
+    """Users cannot revoke someone else's refresh token"""
+    alice = register('alice@test.com')
+    bob = register('bob@test.com')
+    response = client.post('/api/v1/auth/logout', json={'refresh_token': bob['refresh_token']},
+                           headers=_auth(alice['access_token']))
+    assert response.status_code == 400
+
+
+def test_admin_revokes_token_by_jti(app, client, register):
+    """Admins can revoke any token by JTI"""
+    from flask_jwt_extended import decode_token
+    admin = register('admin@test.com', admin=True)
+    user = register('user@test.com')
+    jti = decode_token(user['access_token'])['jti']
+
+    response = client.post('/api/v1/auth/revoke', json={'jti': jti}, headers=_auth(admin['access_token']))
+    assert response.status_code == 200
+    assert _update_self(client, user).status_code == 401
+
+
+def test_admin_revokes_user_sessions(client, register):
+    """Revoking a user ends their refresh token sessions"""
+    admin = register('admin@test.com', admin=True)
+    user = register('user@test.com')
+
+    response = client.post('/api/v1/auth/revoke', json={'user_id': user['user_id']},
+                           headers=_auth(admin['access_token']))
+    assert response.json['revoked_sessions'] == 1
+    response = client.post('/api/v1/auth/refresh', headers=_auth(user['refresh_token']))
+    assert response.status_code == 401
+
+
+def test_revoke_requires_admin(client, register):
+    """Regular users cannot use the revoke endpoint"""
+    user = register('user@test.com')
+    response = client.post('/api/v1/auth/revoke', json={'user_id': user['user_id']},
+                           headers=_auth(user['access_token']))
+    assert response.status_code == 403
+
+
+# ==================== Persistence ====================
+
+def test_blocklist_reloaded_at_startup(tmp_path):
+    """Revocations survive a restart, expired ones are purged"""
+    class FileConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp_path, 'tokens.db')}"
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        auth_utils.revoke_token('active-jti', datetime.utcnow() + timedelta(hours=1))
+        auth_utils.revoke_token('expired-jti', datetime.utcnow() - timedelta(hours=1))
+        db.session.remove()
+
+    auth_utils.token_blocklist.load([])
+    app = create_app(FileConfig)
+    with app.app_context():
+        assert 'active-jti' in auth_utils.token_blocklist
+        assert 'expired-jti' not in auth_utils.token_blocklist
+        assert db.session.get(RevokedToken, 'expired-jti') is None
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_sync_picks_up_other_process_revocations(app, client, monkeypatch, register):
+    """Revocations written by another process are seen after the sync interval"""
+    from flask_jwt_extended import decode_token
+    tokens = register('user@test.com')
+    jti = decode_token(tokens['access_token'])['jti']
+
+    # Simulate another worker writing the revocation directly to the database
+    db.session.add(RevokedToken(jti=jti, expires_at=datetime.utcnow() + timedelta(hours=1)))
+    db.session.commit()
+    assert _update_self(client, tokens).status_code == 200
+
+    monkeypatch.setitem(auth_utils._blocklist_sync, 'next_sync', 0.0)
+    assert _update_self(client, tokens).status_code == 401
@@ -0,0 +1,53 @@
+"""
+Tests for database-level ON DELETE CASCADE of places, users and their children
+"""
+
+import pytest
+from app import create_app
+from app.models.base_model import db, User, Place, Review, Amenity, place_amenity
+from app.persistence.repository import PlaceRepository, UserRepository
+from app.seed import seed_database
+from config import TestingConfig
+
+
+@pytest.fixture
+def app():
+    """Create application for testing"""
+    app = create_app(TestingConfig)
+
+    with app.app_context():
+        db.create_all()
+        seed_database(users=10, places=5, amenities=6, amenities_per_place=3,
+                      reviews_per_place=4)
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_delete_place_does_not_load_reviews(app, statements):
+    """Deleting a place leaves its reviews and amenity links to the database"""
+    place = Place.query.filter(Place.reviews.any()).first()
+    place_id = place.id
+    statements.clear()
+
+    PlaceRepository().delete(place_id)
+
+    assert [s for s in statements if 'FROM review' in s] == []
+    assert Review.query.filter_by(place_id=place_id).count() == 0
+    assert db.session.query(place_amenity).filter_by(place_id=place_id).count() == 0
+    assert Amenity.query.count() == 6
+
+
+def test_delete_user_cascades_to_places_and_reviews(app, statements):
+    """Deleting a user removes their places, reviews and reviews of their places"""
+    user = User.query.filter(User.places.any()).first()
+    user_id = user.id
+    place_ids = [p.id for p in Place.query.filter_by(owner_id=user_id)]
+    statements.clear()
+
+    UserRepository().delete(user_id)
+
+    assert [s for s in statements if 'FROM place' in s or 'FROM review' in s] == []
+    assert Place.query.filter_by(owner_id=user_id).count() == 0
+    assert Review.query.filter_by(user_id=user_id).count() == 0
+    assert Review.query.filter(Review.place_id.in_(place_ids)).count() == 0
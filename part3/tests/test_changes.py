@@ -0,0 +1,141 @@
+"""
+Tests for the change log and the change feed (GET /api/v1/changes)
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+from app.models.base_model import db, User, Place, Amenity, ChangeLog
+from app.persistence.changes import prune
+from app.persistence.repository import AmenityRepository, UserRepository
+
+
+@pytest.fixture
+def ids(app):
+    """An owner with one place and a second user, returned as {name: id}"""
+    owner = User(first_name='Owner', last_name='Test', email='owner@test.com')
+    guest = User(first_name='Guest', last_name='Test', email='guest@test.com')
+    for user in (owner, guest):
+        user.hash_password('secret123')
+    db.session.add_all([owner, guest])
+    db.session.flush()
+    place = Place(name='Loft', description='Test', price=50.0, latitude=10.0,
+                  longitude=20.0, owner_id=owner.id)
+    db.session.add(place)
+    db.session.commit()
+    ids = {'owner': owner.id, 'guest': guest.id, 'place': place.id}
+    db.session.remove()
+    return ids
+
+
+def _auth(user_id):
+    return {'Authorization': f"Bearer {create_access_token(identity=user_id)}"}
+
+
+def _changes(client, since=0, limit=None):
+    url = f'/api/v1/changes/?since={since}' + (f'&limit={limit}' if limit else '')
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.json
+
+
+def _events(page):
+    return [(change['entity'], change['id'], change['op']) for change in page['changes']]
+
+
+def test_orm_writes_are_logged(client, ids):
+    page = _changes(client)
+    assert _events(page) == [('user', ids['owner'], 'upsert'), ('user', ids['guest'], 'upsert'),
+                             ('place', ids['place'], 'upsert')]
+    assert [change['seq'] for change in page['changes']] == [1, 2, 3]
+    assert page['next'] == 3 and page['has_more'] is False
+    assert _changes(client, since=3) == {'changes': [], 'next': 3, 'has_more': False}
+
+
+def test_reviews_also_log_their_place(client, ids):
+    review = client.post('/api/v1/reviews/', json={
+        'text': 'Lovely', 'rating': 5, 'place_id': ids['place']}, headers=_auth(ids['guest'])).json
+    assert _events(_changes(client, since=3)) == [('review', review['id'], 'upsert'),
+                                                  ('place', ids['place'], 'upsert')]
+
+    client.put(f"/api/v1/reviews/{review['id']}", json={'text': 'Great', 'rating': 4},
+               headers=_auth(ids['guest']))
+    client.delete(f"/api/v1/reviews/{review['id']}", headers=_auth(ids['guest']))
+    # Compacted to the last entry of each row; deletes go last within a write
+    assert _events(_changes(client, since=5)) == [('place', ids['place'], 'upsert'),
+                                                  ('review', review['id'], 'delete')]
+
+
+def test_bulk_writes_are_logged(client, ids):
+    client.put(f"/api/v1/places/{ids['place']}", json={'price': 80.0}, headers=_auth(ids['owner']))
+    assert _events(_changes(client, since=3)) == [('place', ids['place'], 'upsert')]
+
+    client.delete(f"/api/v1/places/{ids['place']}", headers=_auth(ids['owner']))
+    page = _changes(client, since=3)
+    assert _events(page) == [('place', ids['place'], 'delete')]
+    assert page['changes'][0]['seq'] == 5 and page['next'] == 5
+
+
+def test_rejected_writes_are_not_logged(client, ids):
+    response = client.put(f"/api/v1/places/{ids['place']}", json={'price': 80.0},
+                          headers=_auth(ids['guest']))
+    assert response.status_code == 403
+    response = client.delete(f"/api/v1/places/{ids['place']}", headers=_auth(ids['guest']))
+    assert response.status_code == 403
+    assert ChangeLog.query.count() == 3
+
+
+def test_cascaded_rows_are_covered_by_the_delete(client, ids):
+    amenity = AmenityRepository().add(Amenity(name='Wi-Fi'))
+    place = db.session.get(Place, ids['place'])
+    place.amenities.append(amenity)
+    db.session.commit()
+    AmenityRepository().delete(amenity.id)
+    UserRepository().delete(ids['owner'])
+
+    assert _events(_changes(client, since=3)) == [
+        ('place', ids['place'], 'upsert'), ('amenity', amenity.id, 'delete'),
+        ('user', ids['owner'], 'delete')]
+
+
+def test_deleted_users_reviews_log_their_places(client, ids):
+    """Places that lose a deleted user's reviews are upserted; the user's own places are not"""
+    client.post('/api/v1/reviews/', json={'text': 'Lovely', 'rating': 5, 'place_id': ids['place']},
+                headers=_auth(ids['guest']))
+    own = client.post('/api/v1/places/', json={
+        'name': 'Cabin', 'description': 'Test', 'price': 40.0, 'latitude': 1.0, 'longitude': 2.0},
+        headers=_auth(ids['guest'])).json
+    since = _changes(client)['next']
+
+    response = client.delete(f"/api/v1/users/{ids['guest']}", headers=_auth(ids['guest']))
+    assert response.status_code == 200
+    assert _events(_changes(client, since=since)) == [('place', ids['place'], 'upsert'),
+                                                      ('user', ids['guest'], 'delete')]
+    assert client.get(f"/api/v1/places/{ids['place']}").json['review_ids'] == []
+    assert client.get(f"/api/v1/places/{own['id']}").status_code == 404
+
+
+def test_paging(client, ids):
+    first = _changes(client, limit=2)
+    assert len(first['changes']) == 2 and first['next'] == 2 and first['has_more'] is True
+    second = _changes(client, since=first['next'], limit=2)
+    assert _events(second) == [('place', ids['place'], 'upsert')]
+    assert second['has_more'] is False
+
+
+def test_head_and_pruned_history(app, client, ids):
+    assert client.get('/api/v1/changes/head').json == {'seq': 3}
+
+    client.put(f"/api/v1/places/{ids['place']}", json={'price': 80.0}, headers=_auth(ids['owner']))
+    assert prune(datetime.utcnow() + timedelta(seconds=1)) == 3
+    # The newest entry is kept, so head survives pruning
+    assert client.get('/api/v1/changes/head').json == {'seq': 4}
+    assert client.get('/api/v1/changes/?since=1').status_code == 410
+    assert _events(_changes(client, since=3)) == [('place', ids['place'], 'upsert')]
+    assert _changes(client, since=4)['changes'] == []
+
+
+@pytest.mark.parametrize('query', ['since=-1', 'limit=0', 'limit=1001', 'since=x'])
+def test_rejects_bad_arguments(client, query):
+    assert client.get(f'/api/v1/changes/?{query}').status_code == 400
@@ -0,0 +1,154 @@
+"""
+Tests for map clustering (GET /api/v1/places/clusters)
+"""
+
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.models.base_model import db, User, Place, PlaceCell
+from app.persistence.clusters import COARSEST_TILES, LEVELS, choose_level, rebuild_place_cells, tile
+from config import TestingConfig
+
+PARIS = '2.2,48.8,2.45,48.95'
+WORLD = '-180,-85,180,85'
+
+
+@pytest.fixture
+def places(app):
+    """Three places in central Paris, one in Lyon and one in Fiji; returns {name: id}"""
+    owner = User(first_name='Owner', last_name='Test', email='owner@test.com')
+    owner.hash_password('secret123')
+    db.session.add(owner)
+    db.session.flush()
+    spots = {
+        'louvre': (48.8606, 2.3376, 120.0),
+        'orsay': (48.8600, 2.3266, 80.0),
+        'pompidou': (48.8607, 2.3522, 150.0),
+        'lyon': (45.7640, 4.8357, 60.0),
+        'fiji': (-17.7134, 178.0650, 90.0),
+    }
+    created = {}
+    for name, (latitude, longitude, price) in spots.items():
+        created[name] = Place(name=name, description='Test', price=price,
+                              latitude=latitude, longitude=longitude, owner_id=owner.id)
+        db.session.add(created[name])
+    db.session.commit()
+    ids = {name: place.id for name, place in created.items()}
+    ids['owner'] = owner.id
+    db.session.remove()
+    return ids
+
+
+def _clusters(client, bbox, zoom):
+    response = client.get(f'/api/v1/places/clusters?bbox={bbox}&zoom={zoom}')
+    assert response.status_code == 200
+    return response.json
+
+
+def test_tile_math():
+    assert tile(0.0, 0.0, 1) == (1, 1)
+    assert tile(85.1, -180.0, 4) == (0, 0)
+    assert tile(-90.0, 180.0, 4) == (15, 15)
+
+
+def test_cells_are_written_for_every_level(app, places):
+    rows = PlaceCell.query.filter_by(place_id=places['louvre']).all()
+    assert sorted(row.level for row in rows) == list(LEVELS)
+    assert all((row.x, row.y) == tile(48.8606, 2.3376, row.level) for row in rows)
+
+
+def test_city_zoom_groups_nearby_places(client, places):
+    """At zoom 5 the three Paris places share a cell; Lyon is outside the box"""
+    result = _clusters(client, PARIS, 5)
+
+    assert result['level'] == 8
+    [cluster] = result['clusters']
+    assert cluster['count'] == 3
+    assert cluster['min_price'] == 80.0
+    assert cluster['place_id'] is None
+    assert cluster['latitude'] == pytest.approx((48.8606 + 48.8600 + 48.8607) / 3)
+
+
+def test_street_zoom_separates_places(client, places):
+    result = _clusters(client, '2.32,48.855,2.36,48.865', 16)
+
+    assert result['level'] == max(LEVELS)
+    assert sorted(c['place_id'] for c in result['clusters']) == sorted(
+        places[name] for name in ('louvre', 'orsay', 'pompidou'))
+    assert {c['count'] for c in result['clusters']} == {1}
+
+
+def test_large_box_is_bounded(app, client, places):
+    """A world box at street zoom falls back to tiles coarse enough to fit"""
+    app.config['MAX_PLACE_CLUSTERS'] = 64
+    result = _clusters(client, WORLD, 18)
+
+    level, xs, (y_min, y_max) = choose_level(18, -180, -85, 180, 85, 64)
+    assert result['level'] == level == 2
+    assert len(xs) * (y_max - y_min + 1) <= 64
+    assert sum(c['count'] for c in result['clusters']) == 5
+
+
+def test_smallest_cluster_limit_keeps_every_cluster(app, client, places):
+    """At the lowest allowed limit the whole map still fits at the coarsest level"""
+    app.config['MAX_PLACE_CLUSTERS'] = COARSEST_TILES
+    result = _clusters(client, '179,-85,178,85', 18)
+
+    assert result['level'] == LEVELS[0]
+    assert sum(c['count'] for c in result['clusters']) == 5
+
+
+def test_cluster_limit_below_coarsest_tiles_is_rejected():
+    class SmallConfig(TestingConfig):
+        MAX_PLACE_CLUSTERS = COARSEST_TILES - 1
+
+    with pytest.raises(ValueError):
+        create_app(SmallConfig)
+
+
+def test_box_crossing_the_antimeridian(client, places):
+    result = _clusters(client, '170,-25,-170,-10', 3)
+    assert [c['place_id'] for c in result['clusters']] == [places['fiji']]
+
+
+def test_writes_keep_cells_current(client, places):
+    token = create_access_token(identity=places['owner'])
+    headers = {'Authorization': f'Bearer {token}'}
+
+    client.put(f"/api/v1/places/{places['orsay']}", json={'price': 40.0}, headers=headers)
+    assert _clusters(client, PARIS, 5)['clusters'][0]['min_price'] == 40.0
+
+    # Moving the Louvre to Lyon
+    client.put(f"/api/v1/places/{places['louvre']}",
+               json={'latitude': 45.76, 'longitude': 4.83}, headers=headers)
+    assert _clusters(client, PARIS, 5)['clusters'][0]['count'] == 2
+    assert _clusters(client, '4.7,45.7,4.9,45.8', 5)['clusters'][0]['count'] == 2
+
+    client.delete(f"/api/v1/places/{places['pompidou']}", headers=headers)
+    assert _clusters(client, PARIS, 5)['clusters'][0]['count'] == 1
+    assert PlaceCell.query.filter_by(place_id=places['pompidou']).count() == 0
+
+
+def test_orm_update_refiles_place(app, places):
+    place = db.session.get(Place, places['fiji'])
+    place.latitude, place.longitude = 48.86, 2.34
+    db.session.commit()
+
+    assert PlaceCell.query.filter_by(place_id=places['fiji'], level=max(LEVELS)).one().x == \
+        tile(48.86, 2.34, max(LEVELS))[0]
+
+
+def test_rebuild_matches_incremental_cells(app, places):
+    def snapshot():
+        return sorted((c.level, c.x, c.y, c.place_id, c.price) for c in PlaceCell.query)
+
+    before = snapshot()
+    assert rebuild_place_cells(batch_size=3) == len(before) == 5 * len(LEVELS)
+    assert snapshot() == before
+
+
+@pytest.mark.parametrize('query', ['zoom=5', 'bbox=1,2,3&zoom=5', f'bbox={PARIS}&zoom=23',
+                                   f'bbox={PARIS}&zoom=-1', 'bbox=0,50,10,40&zoom=5',
+                                   'bbox=0,0,200,10&zoom=5', 'bbox=a,b,c,d&zoom=5'])
+def test_rejects_bad_arguments(client, query):
+    assert client.get(f'/api/v1/places/clusters?{query}').status_code == 400
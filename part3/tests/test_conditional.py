@@ -0,0 +1,121 @@
+"""
+Tests for optimistic concurrency: version ETags and If-Match on PUT/DELETE
+"""
+
+import pytest
+from app.models.base_model import db, Place
+
+
+def _headers(tokens, if_match=None):
+    headers = {'Authorization': f"Bearer {tokens['access_token']}"}
+    if if_match is not None:
+        headers['If-Match'] = if_match
+    return headers
+
+
+@pytest.fixture
+def owner(register):
+    return register('owner@test.com')
+
+
+@pytest.fixture
+def place_id(client, owner):
+    response = client.post('/api/v1/places/', json={
+        'name': 'Loft',
+        'description': 'Near the station',
+        'price': 80.0,
+        'latitude': 24.7,
+        'longitude': 46.7
+    }, headers=_headers(owner))
+    return response.json['id']
+
+
+def test_get_returns_version_etag(client, place_id):
+    response = client.get(f'/api/v1/places/{place_id}')
+    assert response.headers['ETag'] == '"1"'
+
+
+def test_put_with_current_etag(client, owner, place_id):
+    """A matching If-Match updates the row and returns the next version"""
+    response = client.put(f'/api/v1/places/{place_id}', json={'price': 90.0},
+                          headers=_headers(owner, '"1"'))
+    assert response.status_code == 200
+    assert response.headers['ETag'] == '"2"'
+    assert client.get(f'/api/v1/places/{place_id}').headers['ETag'] == '"2"'
+
+
+def test_lost_update_is_rejected(client, owner, place_id):
+    """The second writer holding the same ETag gets 412 and changes nothing"""
+    etag = client.get(f'/api/v1/places/{place_id}').headers['ETag']
+    first = client.put(f'/api/v1/places/{place_id}', json={'price': 90.0},
+                       headers=_headers(owner, etag))
+    second = client.put(f'/api/v1/places/{place_id}', json={'price': 70.0},
+                        headers=_headers(owner, etag))
+
+    assert first.status_code == 200
+    assert second.status_code == 412
+    assert db.session.get(Place, place_id).price == 90.0
+    assert client.delete(f'/api/v1/places/{place_id}',
+                         headers=_headers(owner, etag)).status_code == 412
+    assert client.delete(f'/api/v1/places/{place_id}',
+                         headers=_headers(owner, first.headers['ETag'])).status_code == 200
+
+
+def test_unconditional_and_wildcard_writes(client, owner, place_id):
+    """Without If-Match (or with *) writes still succeed and bump the version"""
+    response = client.put(f'/api/v1/places/{place_id}', json={'price': 90.0},
+                          headers=_headers(owner))
+    assert response.headers['ETag'] == '"2"'
+    response = client.put(f'/api/v1/places/{place_id}', json={'price': 95.0},
+                          headers=_headers(owner, '*'))
+    assert response.headers['ETag'] == '"3"'
+
+
+def test_weak_etag_does_not_match(client, owner, place_id):
+    response = client.put(f'/api/v1/places/{place_id}', json={'price': 90.0},
+                          headers=_headers(owner, 'W/"1"'))
+    assert response.status_code == 412
+
+
+def test_status_precedence(client, owner, place_id, register):
+    """404 and 403 are reported before a version mismatch"""
+    other = register('other@test.com')
+    assert client.put(f'/api/v1/places/{place_id}', json={'price': 1.0},
+                      headers=_headers(other, '"9"')).status_code == 403
+    assert client.put('/api/v1/places/missing', json={'price': 1.0},
+                      headers=_headers(other, '"9"')).status_code == 404
+
+
+def test_review_and_user_if_match(client, owner, place_id, register):
+    author = register('author@test.com')
+    review_id = client.post('/api/v1/reviews/', json={
+        'text': 'Great stay', 'rating': 4, 'place_id': place_id
+    }, headers=_headers(author)).json['id']
+
+    assert client.get(f'/api/v1/reviews/{review_id}').headers['ETag'] == '"1"'
+    assert client.put(f'/api/v1/reviews/{review_id}', json={'rating': 5},
+                      headers=_headers(author, '"2"')).status_code == 412
+    assert client.put(f'/api/v1/reviews/{review_id}', json={'rating': 5},
+                      headers=_headers(author, '"1"')).status_code == 200
+
+    user_url = f"/api/v1/users/{author['user_id']}"
+    etag = client.get(user_url).headers['ETag']
+    assert client.put(user_url, json={'first_name': 'Sara'},
+                      headers=_headers(author, etag)).status_code == 200
+    assert client.delete(user_url, headers=_headers(author, etag)).status_code == 412
+
+
+def test_amenity_if_match(client, register):
+    """Amenities go through the ORM; its version counter behaves the same"""
+    admin = register('admin@test.com', admin=True)
+    amenity_id = client.post('/api/v1/amenities/', json={'name': 'Wifi'},
+                             headers=_headers(admin)).json['id']
+    url = f'/api/v1/amenities/{amenity_id}'
+
+    response = client.put(url, json={'name': 'Fast Wifi'}, headers=_headers(admin, '"1"'))
+    assert response.status_code == 200
+    assert response.headers['ETag'] == '"2"'
+    assert client.put(url, json={'name': 'Slow Wifi'},
+                      headers=_headers(admin, '"1"')).status_code == 412
+    assert client.delete(url, headers=_headers(admin, '"1"')).status_code == 412
+    assert client.delete(url, headers=_headers(admin, '"2"')).status_code == 200
@@ -0,0 +1,110 @@
+"""
+Tests for facet counts (GET /api/v1/places/facets) and their cache
+"""
+
+import pytest
+from app.models.base_model import db, User, Place, Amenity
+from app.persistence.repository import UserRepository
+
+
+@pytest.fixture
+def amenities(app):
+    """Four places with prices and amenities, returned as {name: id}"""
+    owner = User(first_name='Owner', last_name='Test', email='owner@test.com')
+    owner.hash_password('secret123')
+    wifi, pool, gym = Amenity(name='WiFi'), Amenity(name='Pool'), Amenity(name='Gym')
+    db.session.add_all([owner, wifi, pool, gym])
+    db.session.flush()
+    for price, place_amenities in [(30.0, [wifi, pool]), (75.0, [wifi]),
+                                   (150.0, [wifi, gym]), (900.0, [])]:
+        place = Place(name='Place', description='Test', price=price,
+                      latitude=10.0, longitude=20.0, owner_id=owner.id)
+        place.amenities = place_amenities
+        db.session.add(place)
+    db.session.commit()
+    ids = {amenity.name: amenity.id for amenity in (wifi, pool, gym)}
+    ids['owner'] = owner.id
+    db.session.remove()
+    return ids
+
+
+def _counts(facets):
+    return ({amenity['name']: amenity['count'] for amenity in facets['amenities']},
+            [bucket['count'] for bucket in facets['price_buckets']])
+
+
+def test_unfiltered_facets(client, amenities):
+    facets = client.get('/api/v1/places/facets').json
+
+    assert facets['total'] == 4
+    assert facets['amenities'][0] == {'id': amenities['WiFi'], 'name': 'WiFi', 'count': 3}
+    # Default buckets 0, 50, 100, 200, 500
+    assert _counts(facets) == ({'WiFi': 3, 'Pool': 1, 'Gym': 1}, [1, 1, 1, 0, 1])
+    assert facets['price_buckets'][-1] == {'min': 500.0, 'max': None, 'count': 1}
+
+
+def test_filtered_facets(client, amenities):
+    wifi_gym = f"{amenities['WiFi']},{amenities['Gym']}"
+
+    every = client.get(f'/api/v1/places/facets?amenities={wifi_gym}&price_buckets=0,100').json
+    either = client.get(f'/api/v1/places/facets?amenities={wifi_gym}&match=any'
+                        '&price_buckets=0,100').json
+
+    assert every['total'] == 1
+    assert _counts(every) == ({'WiFi': 1, 'Gym': 1}, [0, 1])
+    assert either['total'] == 3
+    assert _counts(either) == ({'WiFi': 3, 'Pool': 1, 'Gym': 1}, [2, 1])
+
+
+def test_facets_are_cached_per_filter(client, amenities, statements):
+    client.get('/api/v1/places/facets')
+    statements.clear()
+
+    client.get('/api/v1/places/facets')
+    assert statements == []
+
+    client.get(f"/api/v1/places/facets?amenities={amenities['Pool']}")
+    assert len(statements) == 2
+
+
+def test_writes_invalidate_facets(client, amenities):
+    """Place, amenity and user writes show up in the next response"""
+    assert client.get('/api/v1/places/facets').json['total'] == 4
+
+    tokens = client.post('/api/v1/auth/register', json={
+        'first_name': 'Host', 'last_name': 'Test',
+        'email': 'host@test.com', 'password': 'secret123'
+    }).json
+    client.post('/api/v1/places/', json={
+        'name': 'Loft', 'description': 'Near the station', 'price': 60.0,
+        'latitude': 24.7, 'longitude': 46.7
+    }, headers={'Authorization': f"Bearer {tokens['access_token']}"})
+    assert client.get('/api/v1/places/facets').json['total'] == 5
+
+    db.session.add(Amenity(name='Sauna'))
+    place = Place.query.filter_by(price=900.0).one()
+    place.amenities.append(Amenity.query.filter_by(name='Pool').one())
+    db.session.commit()
+    assert _counts(client.get('/api/v1/places/facets').json)[0]['Pool'] == 2
+
+    UserRepository().delete_owned(amenities['owner'], amenities['owner'])
+    assert client.get('/api/v1/places/facets').json['total'] == 1
+
+
+def test_rolled_back_write_keeps_cache(client, amenities, statements):
+    client.get('/api/v1/places/facets')
+    db.session.add(Amenity(name='Sauna'))
+    db.session.flush()
+    db.session.rollback()
+    statements.clear()
+
+    client.get('/api/v1/places/facets')
+    assert statements == []
+
+
+@pytest.mark.parametrize('query', ['price_buckets=100,50', 'price_buckets=a,b',
+                                   'price_buckets=' + ','.join(str(i) for i in range(21)),
+                                   'price_buckets=nan', 'price_buckets=0,inf',
+                                   'price_buckets=-inf,0', 'match=some'])
+def test_rejects_bad_arguments(client, query):
+    assert client.get(f'/api/v1/places/facets?{query}').status_code == 400
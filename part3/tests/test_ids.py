@@ -0,0 +1,92 @@
+"""
+Tests for the primary key strategies (ID_STRATEGY)
+"""
+
+import time
+import uuid
+
+import pytest
+from app import create_app
+from app.models.base_model import db, User, Place
+from app.models.ids import uuid7, uuid7_string
+from app.seed import seed_database
+from config import TestingConfig
+
+
+class UUID7Config(TestingConfig):
+    ID_STRATEGY = 'uuid7'
+
+
+@pytest.fixture
+def app():
+    """Create application for testing, with time-ordered ids"""
+    app = create_app(UUID7Config)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_uuid7_layout():
+    before = time.time_ns() // 1_000_000
+    value = uuid.UUID(uuid7())
+    after = time.time_ns() // 1_000_000
+
+    assert value.version == 7 and value.variant == uuid.RFC_4122
+    assert before <= value.int >> 80 <= after + 1
+    assert str(uuid.UUID(uuid7_string(1, 2, 3))) == '00000000-0001-7002-8000-000000000003'
+
+
+def test_uuid7_sorts_in_creation_order():
+    ids = [uuid7() for _ in range(20000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert all(len(value) == 36 for value in ids)
+
+
+def test_rows_get_uuid7_ids(app):
+    owner = User(first_name='Owner', last_name='Test', email='owner@test.com')
+    owner.hash_password('secret123')
+    db.session.add(owner)
+    db.session.flush()
+    for index in range(5):
+        db.session.add(Place(name=f'p{index}', description='Test', price=50.0,
+                             latitude=10.0, longitude=20.0, owner_id=owner.id))
+        db.session.flush()
+    db.session.commit()
+
+    assert uuid.UUID(owner.id).version == 7
+    assert [place.name for place in Place.query.order_by(Place.id)] == [f'p{i}' for i in range(5)]
+
+
+def test_default_strategy_is_uuid4():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        user = User(first_name='A', last_name='B', email='a@test.com')
+        user.hash_password('secret123')
+        db.session.add(user)
+        db.session.commit()
+        assert uuid.UUID(user.id).version == 4
+        db.session.remove()
+        db.drop_all()
+
+
+def test_unknown_strategy_is_rejected():
+    class BadConfig(TestingConfig):
+        ID_STRATEGY = 'serial'
+
+    with pytest.raises(ValueError):
+        create_app(BadConfig)
+
+
+def test_seeded_ids_follow_created_at(app):
+    seed_database(users=20, places=50, reviews_per_place=2)
+
+    for model in (User, Place):
+        rows = model.query.all()
+        assert all(uuid.UUID(row.id).version == 7 for row in rows)
+        by_id = [row.created_at for row in sorted(rows, key=lambda row: row.id)]
+        assert by_id == sorted(by_id)
@@ -0,0 +1,185 @@
+"""
+Tests for the incrementally maintained place leaderboards (/places/top)
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, func, select
+from app.models.base_model import db, User, Place, PlaceReviewBucket, PlaceTrending, Review
+from app.persistence.leaderboard import advance_trending, hour_bucket, rebuild_review_stats, trending
+
+
+def _auth(tokens):
+    return {'Authorization': f"Bearer {tokens['access_token']}"}
+
+
+def _create_place(client, tokens, name='Loft'):
+    return client.post('/api/v1/places/', json={
+        'name': name,
+        'description': 'Near the station',
+        'price': 80.0,
+        'latitude': 24.7,
+        'longitude': 46.7
+    }, headers=_auth(tokens)).json['id']
+
+
+def _review(client, tokens, place_id, rating):
+    response = client.post('/api/v1/reviews/', json={
+        'text': 'Nice', 'rating': rating, 'place_id': place_id
+    }, headers=_auth(tokens))
+    assert response.status_code == 201
+    return response.json['id']
+
+
+def _stats():
+    """Every place's (review_count, rating_sum, rating_score) and all buckets"""
+    db.session.expire_all()
+    places = {place.id: (place.review_count, place.rating_sum, place.rating_score)
+              for place in Place.query}
+    buckets = {(b.place_id, b.bucket): b.count for b in PlaceReviewBucket.query if b.count}
+    return places, buckets
+
+
+def test_review_writes_maintain_statistics(app, client, register):
+    """Create, rating change and delete leave the same state as a full rebuild"""
+    owner = register('owner@test.com')
+    guests = [register(f'guest{i}@test.com') for i in range(3)]
+    first = _create_place(client, owner, 'First')
+    second = _create_place(client, owner, 'Second')
+
+    review_ids = [_review(client, guest, first, 4) for guest in guests]
+    _review(client, guests[0], second, 2)
+    client.put(f'/api/v1/reviews/{review_ids[0]}', json={'rating': 1}, headers=_auth(guests[0]))
+    client.delete(f'/api/v1/reviews/{review_ids[1]}', headers=_auth(guests[1]))
+
+    incremental = _stats()
+    place = db.session.get(Place, first)
+    assert (place.review_count, place.rating_sum) == (2, 5)
+    # (5 virtual reviews of 3 stars + 1 + 4) / 7
+    assert place.rating_score == pytest.approx((5 * 3.0 + 5) / 7)
+
+    rebuild_review_stats()
+    assert _stats() == incremental
+
+
+def test_rejected_review_update_leaves_statistics(client, register):
+    """A review update that fails the ownership check changes nothing"""
+    owner = register('owner@test.com')
+    guest = register('guest@test.com')
+    other = register('other@test.com')
+    place_id = _create_place(client, owner)
+    review_id = _review(client, guest, place_id, 5)
+    before = _stats()
+
+    assert client.put(f'/api/v1/reviews/{review_id}', json={'rating': 1},
+                      headers=_auth(other)).status_code == 403
+    assert client.delete(f'/api/v1/reviews/{review_id}', headers=_auth(other)).status_code == 403
+    assert _stats() == before
+
+
+def test_user_delete_removes_their_reviews_from_statistics(client, register):
+    """Reviews removed by the user cascade no longer count for the place"""
+    owner = register('owner@test.com')
+    guest = register('guest@test.com')
+    place_id = _create_place(client, owner)
+    _review(client, guest, place_id, 5)
+
+    assert client.delete(f"/api/v1/users/{guest['user_id']}", headers=_auth(guest)).status_code == 200
+
+    place, buckets = _stats()
+    assert place[place_id] == (0, 0, None)
+    assert buckets == {}
+
+
+def test_top_by_rating_prefers_well_reviewed_places(client, register):
+    """One 5-star review does not beat many 4-star reviews"""
+    owner = register('owner@test.com')
+    guests = [register(f'guest{i}@test.com') for i in range(8)]
+    single = _create_place(client, owner, 'Single')
+    popular = _create_place(client, owner, 'Popular')
+    _create_place(client, owner, 'Unreviewed')
+    _review(client, guests[0], single, 5)
+    for guest in guests:
+        _review(client, guest, popular, 4)
+
+    response = client.get('/api/v1/places/top?by=rating&limit=5')
+
+    assert response.status_code == 200
+    assert [place['name'] for place in response.json] == ['Popular', 'Single']
+    assert response.json[0]['review_count'] == 8
+    assert response.json[0]['score'] == pytest.approx((5 * 3.0 + 32) / 13)
+
+
+def test_top_trending_counts_reviews_in_window(app, client, register):
+    """Only reviews written inside the window count"""
+    owner = register('owner@test.com')
+    guests = [register(f'guest{i}@test.com') for i in range(3)]
+    recent = _create_place(client, owner, 'Recent')
+    old = _create_place(client, owner, 'Old')
+    for guest in guests[:2]:
+        _review(client, guest, recent, 3)
+    long_ago = datetime.utcnow() - timedelta(days=20)
+    for guest in guests:
+        db.session.add(Review(text='Nice', rating=5, user_id=guest['user_id'], place_id=old,
+                              created_at=long_ago, updated_at=long_ago))
+    db.session.commit()
+
+    week = client.get('/api/v1/places/top?by=trending&window=7d').json
+    month = client.get('/api/v1/places/top?by=trending&window=30d').json
+
+    assert [(place['name'], place['score']) for place in week] == [('Recent', 2)]
+    assert [(place['name'], place['score']) for place in month] == [('Old', 3), ('Recent', 2)]
+    assert db.session.execute(select(func.count()).select_from(PlaceReviewBucket).where(
+        PlaceReviewBucket.bucket == hour_bucket(long_ago))).scalar() == 1
+
+
+def test_maintained_trending_windows_follow_writes_and_advance(app, client, register):
+    """Totals of a maintained window match the bucket sums as reviews come, go and age"""
+    owner = register('owner@test.com')
+    guests = [register(f'guest{i}@test.com') for i in range(3)]
+    a, b, c = (_create_place(client, owner, name) for name in 'ABC')
+    base = hour_bucket(datetime.utcnow()) - timedelta(days=10)
+    advance_trending(base)
+    db.session.commit()
+
+    def review(guest, place_id, hours_ago):
+        created_at = base - timedelta(hours=hours_ago)
+        db.session.add(Review(text='Nice', rating=4, user_id=guest['user_id'], place_id=place_id,
+                              created_at=created_at, updated_at=created_at))
+        db.session.commit()
+    for guest in guests[:2]:
+        review(guest, a, 2)
+    for guest in guests:
+        review(guest, b, 30)
+    review(guests[0], c, 100)
+    # Older than every window: counted in its bucket only
+    review(guests[1], c, 500)
+
+    day, week = timedelta(hours=24), timedelta(days=7)
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    assert trending(day, 10, base) == [(a, 2)]
+    assert trending(week, 10, base) == [(b, 3), (a, 2), (c, 1)]
+    assert not any('place_review_bucket' in statement for statement in statements)
+
+    later = base + timedelta(hours=80)
+    # Not advanced yet: the bucket sums answer
+    assert trending(week, 10, later) == [(b, 3), (a, 2)]
+    assert advance_trending(later) == 2
+    db.session.commit()
+    assert trending(day, 10, later) == []
+    assert trending(week, 10, later) == [(b, 3), (a, 2)]
+    assert {(row.hours, row.place_id): row.reviews for row in PlaceTrending.query} == {
+        (168, a): 2, (168, b): 3}
+
+    review_id = Review.query.filter_by(place_id=b, user_id=guests[0]['user_id']).one().id
+    assert client.delete(f'/api/v1/reviews/{review_id}', headers=_auth(guests[0])).status_code == 200
+    assert sorted(trending(week, 10, later)) == sorted([(a, 2), (b, 2)])
+
+
+@pytest.mark.parametrize('query', ['by=trending&window=31d', 'by=trending&window=week',
+                                   'by=trending&window=0h', 'limit=0', 'by=newest'])
+def test_top_rejects_bad_arguments(client, query):
+    assert client.get(f'/api/v1/places/top?{query}').status_code == 400
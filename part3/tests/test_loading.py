@@ -0,0 +1,130 @@
+"""
+Tests for repository load profiles: SQL statements issued per endpoint
+"""
+
+import pytest
+from sqlalchemy import inspect
+from app.models.base_model import db, Place, Review, place_amenity
+from app.persistence.repository import PlaceRepository
+from app.seed import seed_database
+
+
+@pytest.fixture
+def owner(client):
+    """Register the user that owns the seeded place"""
+    response = client.post('/api/v1/auth/register', json={
+        'first_name': 'Owner',
+        'last_name': 'Test',
+        'email': 'owner@test.com',
+        'password': 'secret123'
+    })
+    return response.json
+
+
+@pytest.fixture
+def place_id(app, owner):
+    """A place with amenities and reviews owned by ``owner``"""
+    seed_database(users=10, places=20, amenities=8, amenities_per_place=3,
+                  reviews_per_place=2)
+    place = Place.query.filter(Place.reviews.any()).first()
+    place.owner_id = owner['user_id']
+    place_id = place.id
+    db.session.commit()
+    db.session.remove()
+    return place_id
+
+
+def _auth(tokens):
+    return {'Authorization': f"Bearer {tokens['access_token']}"}
+
+
+def _count(statements, request):
+    statements.clear()
+    response = request()
+    assert response.status_code < 300, response.json
+    db.session.remove()
+    return len(statements)
+
+
+def test_place_is_lazy_without_profile(app, place_id, statements):
+    """Plain queries no longer load amenities"""
+    db.session.get(Place, place_id)
+    assert len(statements) == 1
+
+
+def test_write_profile_skips_collections(app, place_id, statements):
+    """The write profile loads the row only; collections load (correctly) on access"""
+    place = PlaceRepository().get(place_id, profile='write')
+    assert len(statements) == 1
+    assert not {'amenities', 'reviews'} & set(inspect(place).dict)
+    assert place.amenities and len(statements) == 2
+
+
+def test_view_count_is_read_by_serializing_profiles_only(app, place_id, statements):
+    """Plain and write loads skip the view count subquery; list and detail read it"""
+    repo = PlaceRepository()
+    repo.get(place_id, profile='write')
+    db.session.get(Place, place_id, populate_existing=True)
+    assert not [s for s in statements if 'place_view_count' in s]
+
+    repo.get(place_id, profile='detail')
+    repo.list_all(profile='list')
+    assert len([s for s in statements if 'place_view_count' in s]) == 2
+
+
+def test_unknown_profile(app):
+    with pytest.raises(ValueError):
+        PlaceRepository().list_all(profile='everything')
+
+
+def test_list_places_query_count(client, place_id, statements):
+    """Places, amenity ids and review ids: three statements for any number of places"""
+    assert _count(statements, lambda: client.get('/api/v1/places/')) == 3
+
+
+def test_get_place_query_count(client, place_id, statements):
+    response = client.get(f'/api/v1/places/{place_id}')
+    assert sorted(response.json['amenity_ids']) == sorted(
+        row.amenity_id for row in db.session.query(place_amenity).filter_by(place_id=place_id))
+    assert response.json['review_ids'] == [
+        review.id for review in Review.query.filter_by(place_id=place_id)]
+    assert _count(statements, lambda: client.get(f'/api/v1/places/{place_id}')) == 3
+
+
+def test_update_place_query_count(client, owner, place_id, statements):
+    """UPDATE, then the detail profile for the response"""
+    count = _count(statements, lambda: client.put(
+        f'/api/v1/places/{place_id}', json={'price': 120.0}, headers=_auth(owner)))
+    # + the price UPDATE of the place's map cells and the change log INSERT
+    assert count == 6
+
+
+def test_delete_place_query_count(client, owner, place_id, statements):
+    count = _count(statements, lambda: client.delete(
+        f'/api/v1/places/{place_id}', headers=_auth(owner)))
+    # DELETE + the change log INSERT, + reading the name's trigrams and
+    # taking them out of the trigram frequencies
+    assert count == 4
+
+
+def test_create_review_query_count(client, place_id, statements):
+    """The place lookup uses the write profile and loads no collections"""
+    author = client.post('/api/v1/auth/register', json={
+        'first_name': 'Author',
+        'last_name': 'Test',
+        'email': 'author@test.com',
+        'password': 'secret123'
+    }).json
+    count = _count(statements, lambda: client.post('/api/v1/reviews/', json={
+        'text': 'Lovely', 'rating': 5, 'place_id': place_id
+    }, headers=_auth(author)))
+    assert [s for s in statements if 'place_amenity' in s] == []
+    # + the place statistics UPDATE, the hourly bucket upsert, the trending
+    # windows SELECT and totals upsert, and the change log INSERT (review and
+    # place entries in one statement)
+    assert count == 9
+
+
+@pytest.mark.parametrize('path', ['/api/v1/reviews/', '/api/v1/amenities/'])
+def test_list_query_count(client, place_id, statements, path):
+    assert _count(statements, lambda: client.get(path)) == 1
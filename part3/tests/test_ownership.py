@@ -0,0 +1,133 @@
+"""
+Tests for ownership-checked updates and deletes of places, reviews and users
+"""
+
+from app.models.base_model import db, User, Place, Review
+
+
+def _auth(tokens):
+    return {'Authorization': f"Bearer {tokens['access_token']}"}
+
+
+def _create_place(client, tokens):
+    response = client.post('/api/v1/places/', json={
+        'name': 'Loft',
+        'description': 'Near the station',
+        'price': 80.0,
+        'latitude': 24.7,
+        'longitude': 46.7
+    }, headers=_auth(tokens))
+    assert response.status_code == 201
+    return response.json['id']
+
+
+def _statements_before_update(statements, table):
+    """Statements issued before the UPDATE of ``table``, ignoring auth lookups"""
+    index = next(i for i, s in enumerate(statements) if s.startswith(f"UPDATE {table}"))
+    return [s for s in statements[:index] if f"FROM {table}" in s]
+
+
+def test_owner_updates_place_in_one_statement(client, statements, register):
+    """The ownership check is part of the UPDATE; nothing is read first"""
+    owner = register('owner@test.com')
+    place_id = _create_place(client, owner)
+    statements.clear()
+
+    response = client.put(f'/api/v1/places/{place_id}', json={'price': 95.0},
+                          headers=_auth(owner))
+
+    assert response.status_code == 200
+    assert response.json['price'] == 95.0
+    assert _statements_before_update(statements, 'place') == []
+
+
+def test_place_update_and_delete_by_other_user(client, register):
+    """Other users get 403, unknown ids 404, and the place is untouched"""
+    owner = register('owner@test.com')
+    other = register('other@test.com')
+    place_id = _create_place(client, owner)
+
+    response = client.put(f'/api/v1/places/{place_id}', json={'price': 1.0},
+                          headers=_auth(other))
+    assert response.status_code == 403
+    assert client.delete(f'/api/v1/places/{place_id}', headers=_auth(other)).status_code == 403
+    assert db.session.get(Place, place_id).price == 80.0
+
+    assert client.put('/api/v1/places/missing', json={'price': 1.0},
+                      headers=_auth(other)).status_code == 404
+    assert client.delete('/api/v1/places/missing', headers=_auth(other)).status_code == 404
+
+
+def test_place_update_ignores_owner_id(client, register):
+    """Ownership cannot be transferred through PUT"""
+    owner = register('owner@test.com')
+    other = register('other@test.com')
+    place_id = _create_place(client, owner)
+
+    client.put(f'/api/v1/places/{place_id}', json={'owner_id': other['user_id']},
+               headers=_auth(owner))
+
+    assert db.session.get(Place, place_id).owner_id == owner['user_id']
+
+
+def test_admin_updates_and_deletes_any_place(client, register):
+    """Admins bypass the ownership condition"""
+    owner = register('owner@test.com')
+    admin = register('admin@test.com', admin=True)
+    place_id = _create_place(client, owner)
+
+    response = client.put(f'/api/v1/places/{place_id}', json={'name': 'Renamed'},
+                          headers=_auth(admin))
+    assert response.status_code == 200
+    assert response.json['name'] == 'Renamed'
+
+    assert client.delete(f'/api/v1/places/{place_id}', headers=_auth(admin)).status_code == 200
+    assert db.session.get(Place, place_id) is None
+
+
+def test_review_update_and_delete(client, register):
+    """Reviews can only be changed by their author"""
+    owner = register('owner@test.com')
+    author = register('author@test.com')
+    place_id = _create_place(client, owner)
+    response = client.post('/api/v1/reviews/', json={
+        'text': 'Great stay', 'rating': 4, 'place_id': place_id
+    }, headers=_auth(author))
+    assert response.status_code == 201
+    review_id = response.json['id']
+
+    assert client.put(f'/api/v1/reviews/{review_id}', json={'rating': 1},
+                      headers=_auth(owner)).status_code == 403
+    response = client.put(f'/api/v1/reviews/{review_id}', json={'rating': 5},
+                          headers=_auth(author))
+    assert response.status_code == 200
+    assert response.json['rating'] == 5
+
+    assert client.delete(f'/api/v1/reviews/{review_id}', headers=_auth(owner)).status_code == 403
+    assert client.delete(f'/api/v1/reviews/{review_id}', headers=_auth(author)).status_code == 200
+    assert client.delete(f'/api/v1/reviews/{review_id}', headers=_auth(author)).status_code == 404
+    assert Review.query.count() == 0
+
+
+def test_user_update_and_delete(client, register):
+    """Users can only change their own profile; passwords are hashed"""
+    user = register('user@test.com')
+    other = register('other@test.com')
+    admin = register('admin@test.com', admin=True)
+
+    assert client.put(f"/api/v1/users/{other['user_id']}", json={'first_name': 'X'},
+                      headers=_auth(user)).status_code == 403
+    response = client.put(f"/api/v1/users/{user['user_id']}", json={'first_name': 'Sara'},
+                          headers=_auth(user))
+    assert response.status_code == 200
+    assert response.json['first_name'] == 'Sara'
+
+    response = client.put(f"/api/v1/users/{user['user_id']}",
+                          json={'email': 'new@test.com', 'password': 'changed123'},
+                          headers=_auth(admin))
+    assert response.status_code == 200
+    assert db.session.get(User, user['user_id']).verify_password('changed123')
+
+    assert client.delete(f"/api/v1/users/{other['user_id']}", headers=_auth(user)).status_code == 403
+    assert client.delete(f"/api/v1/users/{other['user_id']}", headers=_auth(admin)).status_code == 200
+    assert client.delete('/api/v1/users/missing', headers=_auth(admin)).status_code == 404
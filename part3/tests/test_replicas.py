@@ -0,0 +1,128 @@
+"""
+Tests for read-replica routing with a primary and a replica SQLite file
+"""
+
+import shutil
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.models.base_model import db, Amenity, Place
+from app.persistence.routing import STICKY_COOKIE, replica_engines
+from config import TestingConfig
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return {'primary': tmp_path / 'primary.db', 'replica': tmp_path / 'replica.db'}
+
+
+@pytest.fixture
+def app(paths):
+    """App whose replica starts as a copy of the primary"""
+    class ReplicaConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{paths['primary']}"
+        SQLALCHEMY_REPLICA_URIS = [f"sqlite:///{paths['replica']}"]
+
+    app = create_app(ReplicaConfig)
+    replicate(app, paths)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in [db.engine, *replica_engines(app)]:
+            engine.dispose()
+
+
+def replicate(app, paths):
+    """Bring the replica up to date with the primary"""
+    with app.app_context():
+        replica_engines(app)[0].dispose()
+        shutil.copyfile(paths['primary'], paths['replica'])
+
+
+@pytest.fixture
+def tokens(app):
+    response = app.test_client().post('/api/v1/auth/register', json={
+        'first_name': 'Owner',
+        'last_name': 'Test',
+        'email': 'owner@test.com',
+        'password': 'secret123'
+    })
+    return response.json
+
+
+def _create_place(client, tokens):
+    response = client.post('/api/v1/places/', json={
+        'name': 'Loft',
+        'description': 'Near the station',
+        'price': 80.0,
+        'latitude': 24.7,
+        'longitude': 46.7
+    }, headers={'Authorization': f"Bearer {tokens['access_token']}"})
+    assert response.status_code == 201
+    return response
+
+
+def test_replica_engine_is_separate(app, paths):
+    """Replicas are not Flask-SQLAlchemy binds, so create_all skips them"""
+    with app.app_context():
+        assert set(db.engines) == {None}
+        assert replica_engines(app)[0].url.database == str(paths['replica'])
+
+
+def test_reads_go_to_replica(app, paths, tokens):
+    """Until replication catches up, other clients do not see a new place"""
+    place_id = _create_place(app.test_client(), tokens).json['id']
+
+    reader = app.test_client()
+    assert reader.get(f'/api/v1/places/{place_id}').status_code == 404
+    assert reader.get('/api/v1/places/').json == []
+
+    replicate(app, paths)
+    assert reader.get(f'/api/v1/places/{place_id}').status_code == 200
+
+
+def test_writer_reads_its_own_writes(app, tokens):
+    """The writing client is pinned to the primary for a short window"""
+    writer = app.test_client()
+    response = _create_place(writer, tokens)
+    assert STICKY_COOKIE in response.headers.get('Set-Cookie', '')
+
+    assert writer.get(f"/api/v1/places/{response.json['id']}").status_code == 200
+
+
+def test_writes_go_to_primary(app, tokens):
+    """Write-profile lookups read the primary: reviewing a fresh place works"""
+    place_id = _create_place(app.test_client(), tokens).json['id']
+    author = app.test_client().post('/api/v1/auth/register', json={
+        'first_name': 'Author',
+        'last_name': 'Test',
+        'email': 'author@test.com',
+        'password': 'secret123'
+    }).json
+
+    response = app.test_client().post('/api/v1/reviews/', json={
+        'text': 'Lovely', 'rating': 5, 'place_id': place_id
+    }, headers={'Authorization': f"Bearer {author['access_token']}"})
+
+    assert response.status_code == 201
+    with app.app_context():
+        assert db.session.get(Place, place_id) is not None
+
+
+def test_updates_and_deletes_read_the_primary(app):
+    """PUT and DELETE find a row the replica does not have yet, at its current version"""
+    with app.app_context():
+        amenity = Amenity(name='Wi-Fi')
+        db.session.add(amenity)
+        db.session.commit()
+        amenity_id = amenity.id
+        token = create_access_token(identity='admin', additional_claims={'is_admin': True})
+    headers = {'Authorization': f"Bearer {token}"}
+
+    response = app.test_client().put(f'/api/v1/amenities/{amenity_id}', json={'name': 'Wireless'},
+                                     headers=headers)
+    assert response.status_code == 200
+    response = app.test_client().delete(f'/api/v1/amenities/{amenity_id}', headers=headers)
+    assert response.status_code == 200
+    with app.app_context():
+        assert db.session.get(Amenity, amenity_id) is None
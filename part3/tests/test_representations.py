@@ -0,0 +1,69 @@
+"""
+Tests for the JSON response representation
+"""
+
+import json
+from datetime import datetime
+import pytest
+from app.presentation.api.representations import dumps, stdlib_dumps
+
+
+@pytest.fixture
+def user_headers(client):
+    """Register a user and return its authentication headers"""
+    response = client.post('/api/v1/auth/register', json={
+        'first_name': 'Owner',
+        'last_name': 'User',
+        'email': 'owner@test.com',
+        'password': 'owner123'
+    })
+    return {'Authorization': f"Bearer {response.json['access_token']}"}
+
+
+def test_dumps_handles_datetimes():
+    """Datetimes are encoded as ISO 8601 strings"""
+    data = {'when': datetime(2026, 1, 2, 3, 4, 5)}
+    assert json.loads(dumps(data)) == {'when': '2026-01-02T03:04:05'}
+
+
+def test_dumps_stdlib_fallback():
+    """The stdlib fallback produces the same document"""
+    data = {'name': 'Café', 'when': datetime(2026, 1, 2), 'values': [1, 2.5, None, True]}
+    encoded = stdlib_dumps(data)
+    assert isinstance(encoded, bytes)
+    assert 'Café'.encode('utf-8') in encoded
+    assert json.loads(encoded) == json.loads(dumps(data))
+
+
+def test_list_places_shape(client, user_headers):
+    """The unmarshalled list endpoint returns exactly the PlaceOut fields"""
+    client.post('/api/v1/places/', json={
+        'name': 'Loft',
+        'description': 'Nice loft',
+        'price': 100.0,
+        'latitude': 10.0,
+        'longitude': 20.0
+    }, headers=user_headers)
+
+    response = client.get('/api/v1/places/')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+    place = response.json[0]
+    assert set(place) == {'id', 'name', 'description', 'price', 'latitude',
+                          'longitude', 'owner_id', 'amenity_ids', 'review_ids', 'view_count'}
+    assert place['amenity_ids'] == [] and place['review_ids'] == []
+    assert place['view_count'] == 0
+
+
+def test_errors_use_json_representation(client):
+    """Error responses go through the same representation"""
+    response = client.get('/api/v1/places/missing')
+    assert response.status_code == 404
+    assert 'message' in response.json
+
+
+def test_swagger_documents_list_model(client):
+    """The list endpoint still documents its response model"""
+    spec = client.get('/swagger.json').json
+    response = spec['paths']['/api/v1/places/']['get']['responses']['200']
+    assert response['schema']['items']['$ref'] == '#/definitions/PlaceOut'
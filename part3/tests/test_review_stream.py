@@ -0,0 +1,157 @@
+"""
+Tests for the review event stream (GET /api/v1/places/<id>/reviews/stream)
+"""
+
+import json
+import threading
+
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.models.base_model import db, User, Place
+from app.presentation.api.streams import (DROPPED, EventHub, SubscriberLimitError, limit_review_streams,
+                                         review_hub)
+from config import TestingConfig
+
+
+class StreamConfig(TestingConfig):
+    REVIEW_STREAM_HEARTBEAT_SECONDS = 0.05
+    REVIEW_STREAM_MAX_SECONDS = 0.3
+
+
+@pytest.fixture
+def app():
+    """Create application for testing, with short-lived streams"""
+    app = create_app(StreamConfig)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def ids(app):
+    """An owner with two places and a guest, returned as {name: id}"""
+    owner = User(first_name='Owner', last_name='Test', email='owner@test.com')
+    guest = User(first_name='Guest', last_name='Test', email='guest@test.com')
+    for user in (owner, guest):
+        user.hash_password('secret123')
+    db.session.add_all([owner, guest])
+    db.session.flush()
+    places = [Place(name=name, description='Test', price=50.0, latitude=10.0,
+                    longitude=20.0, owner_id=owner.id) for name in ('Loft', 'Cabin')]
+    db.session.add_all(places)
+    db.session.commit()
+    ids = {'owner': owner.id, 'guest': guest.id, 'loft': places[0].id, 'cabin': places[1].id}
+    db.session.remove()
+    return ids
+
+
+def _auth(user_id):
+    return {'Authorization': f"Bearer {create_access_token(identity=user_id)}"}
+
+
+def _events(response):
+    """(event, data) of every event of a finished stream"""
+    events = []
+    for block in response.get_data(as_text=True).split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+        if 'event' in fields:
+            events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+def test_hub_delivers_per_topic():
+    hub = EventHub()
+    loft, cabin = hub.subscribe('loft'), hub.subscribe('cabin')
+    assert hub.publish('loft', 'a') == 1
+    assert (loft.next(0), cabin.next(0)) == ('a', None)
+    hub.unsubscribe(loft)
+    hub.unsubscribe(loft)
+    assert hub.publish('loft', 'b') == 0
+    assert hub.subscribers() == 1
+
+
+def test_hub_drops_slow_consumers():
+    hub = EventHub(max_queued=2)
+    slow, fast = hub.subscribe('loft'), hub.subscribe('loft')
+    for message in 'abc':
+        hub.publish('loft', message)
+        assert fast.next(0) == message
+    assert slow.next(0) is DROPPED
+    assert hub.subscribers('loft') == 1 and hub.dropped == 1
+
+
+def test_hub_limits_subscribers():
+    hub = EventHub(max_subscribers=1)
+    hub.subscribe('loft')
+    with pytest.raises(SubscriberLimitError):
+        hub.subscribe('cabin')
+
+
+def test_next_wakes_up_on_publish():
+    hub = EventHub()
+    subscription = hub.subscribe('loft')
+    threading.Timer(0.05, hub.publish, ('loft', 'a')).start()
+    assert subscription.next(5) == 'a'
+
+
+def test_stream_relays_committed_review_writes(app, client, ids):
+    response = client.get(f"/api/v1/places/{ids['loft']}/reviews/stream")
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+    review = client.post('/api/v1/reviews/', json={
+        'text': 'Lovely', 'rating': 5, 'place_id': ids['loft']}, headers=_auth(ids['guest'])).json
+    client.post('/api/v1/reviews/', json={
+        'text': 'Cold', 'rating': 2, 'place_id': ids['cabin']}, headers=_auth(ids['guest']))
+    client.put(f"/api/v1/reviews/{review['id']}", json={'rating': 4}, headers=_auth(ids['guest']))
+    client.delete(f"/api/v1/reviews/{review['id']}", headers=_auth(ids['owner']))
+    client.delete(f"/api/v1/reviews/{review['id']}", headers=_auth(ids['guest']))
+    client.delete(f"/api/v1/reviews/{review['id']}", headers=_auth(ids['guest']))
+
+    assert _events(response) == [
+        ('created', review),
+        ('updated', dict(review, rating=4)),
+        ('deleted', {'id': review['id'], 'place_id': ids['loft']}),
+    ]
+    assert review_hub().subscribers() == 0
+
+
+def test_idle_stream_sends_heartbeats_and_ends(client, ids):
+    response = client.get(f"/api/v1/places/{ids['cabin']}/reviews/stream")
+    body = response.get_data(as_text=True)
+    assert body.startswith('retry: ')
+    assert body.count(': ping\n\n') >= 2
+    assert _events(response) == []
+
+
+def test_overflowing_stream_ends_with_overflow(app, client, ids):
+    response = client.get(f"/api/v1/places/{ids['loft']}/reviews/stream")
+    for index in range(app.config['REVIEW_STREAM_QUEUE_SIZE'] + 1):
+        review_hub().publish(ids['loft'], f"event: created\ndata: {index}\n\n")
+    [(event, data)] = _events(response)
+    assert event == 'overflow'
+
+
+def test_unknown_place_and_full_hub(app, client, ids):
+    assert client.get('/api/v1/places/missing/reviews/stream').status_code == 404
+
+    app.extensions['review_hub'] = EventHub(max_subscribers=0)
+    assert client.get(f"/api/v1/places/{ids['loft']}/reviews/stream").status_code == 503
+
+
+def test_stream_limit_per_worker(app, client, ids):
+    """gunicorn.conf.py caps streams below a threaded worker's threads, and to none in a sync worker"""
+    limit_review_streams(app, 7)
+    assert review_hub().max_subscribers == 7
+    limit_review_streams(app, 5000)
+    assert review_hub().max_subscribers == 7
+
+    limit_review_streams(app, 0)
+    response = client.get(f"/api/v1/places/{ids['loft']}/reviews/stream")
+    assert response.status_code == 503
+    assert response.json['message'] == "Streams are not served by this server process"
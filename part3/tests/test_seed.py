@@ -0,0 +1,67 @@
+"""
+Tests for the `flask seed` data generator
+"""
+
+import pytest
+from app.models.base_model import db, User, Place, Review, Amenity, place_amenity
+from app.seed import seed_database, seed_command
+
+
+def test_seed_counts(app):
+    """Seeding inserts the requested number of rows"""
+    counts = seed_database(users=20, places=50, reviews_per_place=2, batch_size=7)
+
+    assert User.query.count() == counts['users'] == 20
+    assert Place.query.count() == counts['places'] == 50
+    assert Amenity.query.count() == counts['amenities']
+    assert Review.query.count() == counts['reviews']
+    assert db.session.query(place_amenity).count() == counts['place_amenity']
+
+
+def test_seed_is_deterministic(app):
+    """The same seed always produces the same rows"""
+    seed_database(users=10, places=10, seed=7)
+    first = sorted(p.id for p in Place.query.all())
+    db.drop_all()
+    db.create_all()
+    seed_database(users=10, places=10, seed=7)
+    second = sorted(p.id for p in Place.query.all())
+
+    assert first == second
+
+
+def test_seed_reviews_are_valid(app):
+    """Owners never review their own place and pairs are unique"""
+    seed_database(users=5, places=30, reviews_per_place=3)
+    pairs = set()
+    for review in Review.query.all():
+        assert review.user_id != review.place.owner_id
+        assert (review.user_id, review.place_id) not in pairs
+        pairs.add((review.user_id, review.place_id))
+
+
+def test_seed_users_share_password(app):
+    """All generated users can log in with the shared password"""
+    seed_database(users=3, places=0, password='secret')
+    for user in User.query.all():
+        assert user.verify_password('secret')
+
+
+def test_seed_user_requirements(app):
+    """One user can own places without reviews; reviews need a second user"""
+    assert seed_database(users=0, places=0)['users'] == 0
+    assert seed_database(users=1, places=10, amenities=0, reviews_per_place=0, seed=1)['places'] == 10
+    with pytest.raises(ValueError):
+        seed_database(users=0, places=1, reviews_per_place=0)
+    with pytest.raises(ValueError):
+        seed_database(users=1, places=1, reviews_per_place=1)
+
+
+def test_seed_command(app):
+    """The CLI command is registered and reports progress"""
+    runner = app.test_cli_runner()
+    result = runner.invoke(seed_command, ['--users', '5', '--places', '5'])
+
+    assert result.exit_code == 0
+    assert 'Inserted' in result.output
+    assert Place.query.count() == 5
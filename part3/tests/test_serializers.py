@@ -0,0 +1,57 @@
+"""
+Tests for compiled restx model serializers
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from flask_restx import Model, fields, marshal
+from sqlalchemy import select
+from app.models.base_model import db, User
+from app.presentation.api.serializers import compile_serializer
+from app.presentation.api.v1.users import user_out, serialize_user
+
+
+def test_serializer_reads_attributes():
+    """Plain, renamed and datetime fields are read in one pass"""
+    model = Model("Thing", {
+        "id": fields.String,
+        "label": fields.String(attribute="name"),
+        "created_at": fields.DateTime,
+        "tags": fields.List(fields.String),
+    })
+    serialize = compile_serializer(model, sources={"tags": "[t.upper() for t in obj.tags]"})
+    obj = SimpleNamespace(id="1", name="Loft", created_at=datetime(2026, 1, 2), tags=["a", "b"])
+
+    assert serialize(obj) == {
+        "id": "1",
+        "label": "Loft",
+        "created_at": "2026-01-02T00:00:00",
+        "tags": ["A", "B"],
+    }
+
+
+def test_serializer_rejects_dotted_attribute():
+    """Attributes that are not identifiers need an explicit source"""
+    model = Model("Nested", {"owner": fields.String(attribute="owner.name")})
+    with pytest.raises(ValueError):
+        compile_serializer(model)
+
+
+def test_serializer_matches_marshal(app):
+    """The compiled serializer agrees with restx marshalling of to_dict()"""
+    user = User(first_name="Ada", last_name="Lovelace", email="ada@test.com", password="x")
+    db.session.add(user)
+    db.session.commit()
+
+    assert serialize_user(user) == dict(marshal(user.to_dict(), user_out))
+
+
+def test_serializer_accepts_core_rows(app):
+    """Core rows expose columns as attributes and serialize the same way"""
+    user = User(first_name="Ada", last_name="Lovelace", email="ada@test.com", password="x")
+    db.session.add(user)
+    db.session.commit()
+
+    row = db.session.execute(select(User.__table__)).first()
+    assert serialize_user(row) == serialize_user(user)
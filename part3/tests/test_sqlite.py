@@ -0,0 +1,49 @@
+"""
+Tests for SQLite PRAGMA configuration
+"""
+
+import os
+import pytest
+from sqlalchemy import text
+from app import create_app
+from app.models.base_model import db
+from config import TestingConfig
+
+
+def _pragma(name):
+    return db.session.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_testing_config_pragmas():
+    """TestingConfig PRAGMAs are applied to new connections"""
+    app = create_app(TestingConfig)
+    with app.app_context():
+        assert _pragma('foreign_keys') == 1
+        assert _pragma('synchronous') == 0
+        assert _pragma('busy_timeout') == 5000
+        db.session.remove()
+
+
+def test_file_database_uses_wal(tmp_path):
+    """A file database configured for WAL switches journal mode"""
+    class WalConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp_path, 'wal.db')}"
+        SQLITE_PRAGMAS = {'journal_mode': 'WAL', 'synchronous': 'NORMAL'}
+
+    app = create_app(WalConfig)
+    with app.app_context():
+        assert _pragma('journal_mode') == 'wal'
+        assert _pragma('synchronous') == 1
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_no_pragmas_keeps_defaults():
+    """An empty SQLITE_PRAGMAS leaves SQLite defaults untouched"""
+    class PlainConfig(TestingConfig):
+        SQLITE_PRAGMAS = {}
+
+    app = create_app(PlainConfig)
+    with app.app_context():
+        assert _pragma('foreign_keys') == 0
+        db.session.remove()
@@ -0,0 +1,131 @@
+"""
+Tests for place-name autocomplete (GET /api/v1/places/suggest)
+"""
+
+import pytest
+from sqlalchemy import event
+from flask_jwt_extended import create_access_token
+from app.models.base_model import db, User, Place
+from app.persistence.repository import PlaceRepository, UserRepository
+from app.persistence.suggest import PrefixIndex, normalize_name, place_suggestions
+
+
+@pytest.fixture
+def places(app):
+    """Places owned by one user, returned as {name: id} plus the owner's id"""
+    owner = User(first_name='Owner', last_name='Test', email='owner@test.com')
+    owner.hash_password('secret123')
+    db.session.add(owner)
+    db.session.flush()
+    names = ['Cozy Loft', 'Cozy  loft', 'Café Central', 'Cabin by the Lake', 'Beach House']
+    created = [Place(name=name, description='Test', price=50.0, latitude=10.0,
+                     longitude=20.0, owner_id=owner.id) for name in names]
+    db.session.add_all(created)
+    db.session.commit()
+    ids = {place.name: place.id for place in created}
+    ids['owner'] = owner.id
+    db.session.remove()
+    return ids
+
+
+def _suggest(client, prefix, limit=None):
+    url = f'/api/v1/places/suggest?prefix={prefix}' + (f'&limit={limit}' if limit else '')
+    response = client.get(url)
+    assert response.status_code == 200
+    return [(s['name'], s['count']) for s in response.json]
+
+
+def test_normalize_name():
+    assert normalize_name('  Café   CENTRAL ') == 'cafe central'
+
+
+def test_prefix_lookup(client, places):
+    assert _suggest(client, 'ca') == [('Cabin by the Lake', 1), ('Café Central', 1)]
+    assert _suggest(client, 'CAFE') == [('Café Central', 1)]
+    # Names differing only in case and spacing are one suggestion
+    assert _suggest(client, 'cozy') == [('Cozy  loft', 2)]
+    assert _suggest(client, 'c', limit=2) == [('Cabin by the Lake', 1), ('Café Central', 1)]
+    assert _suggest(client, 'zz') == []
+
+
+def test_single_place_names_carry_the_id(client, places):
+    [suggestion] = client.get('/api/v1/places/suggest?prefix=beach').json
+    assert suggestion['place_id'] == places['Beach House']
+    [suggestion] = client.get('/api/v1/places/suggest?prefix=cozy').json
+    assert suggestion['place_id'] is None
+
+
+def test_lookups_do_not_query_the_database(app, client, places):
+    client.get('/api/v1/places/suggest?prefix=c')
+    issued = []
+    record = lambda conn, cursor, statement, *args: issued.append(statement)
+    event.listen(db.engine, "before_cursor_execute", record)
+    client.get('/api/v1/places/suggest?prefix=ca')
+    event.remove(db.engine, "before_cursor_execute", record)
+    assert issued == []
+
+
+def test_writes_update_the_index(app, client, places):
+    assert _suggest(client, 'b') == [('Beach House', 1)]
+    headers = {'Authorization': f"Bearer {create_access_token(identity=places['owner'])}"}
+
+    client.post('/api/v1/places/', json={
+        'name': 'Boathouse', 'description': 'On the river', 'price': 80.0,
+        'latitude': 10.0, 'longitude': 20.0}, headers=headers)
+    client.put(f"/api/v1/places/{places['Cabin by the Lake']}",
+               json={'name': 'Barn'}, headers=headers)
+    client.delete(f"/api/v1/places/{places['Beach House']}", headers=headers)
+    assert _suggest(client, 'b') == [('Barn', 1), ('Boathouse', 1)]
+
+    place = db.session.get(Place, places['Café Central'])
+    place.name = 'Bistro'
+    db.session.commit()
+    assert _suggest(client, 'b') == [('Barn', 1), ('Bistro', 1), ('Boathouse', 1)]
+
+    PlaceRepository().delete(places['Cozy Loft'])
+    assert _suggest(client, 'cozy') == [('Cozy  loft', 1)]
+
+
+def test_failed_write_leaves_index(client, places):
+    client.get('/api/v1/places/suggest?prefix=c')
+    other = create_access_token(identity='someone-else')
+    response = client.put(f"/api/v1/places/{places['Beach House']}", json={'name': 'Mine'},
+                          headers={'Authorization': f'Bearer {other}'})
+    assert response.status_code == 403
+    assert _suggest(client, 'mine') == []
+    assert _suggest(client, 'beach') == [('Beach House', 1)]
+
+
+def test_user_delete_removes_their_places(client, places):
+    assert len(_suggest(client, 'c')) == 3
+    UserRepository().delete_owned(places['owner'], places['owner'])
+    assert _suggest(client, 'c') == []
+
+
+def test_changes_during_load_are_replayed():
+    index = PrefixIndex()
+
+    def read_rows():
+        # A commit lands while the rows are being read
+        index.apply([('p2', 'Bistro'), ('p1', None)])
+        return [('p1', 'Barn')]
+
+    index.load(read_rows)
+    assert index.suggest('b', 10) == [('Bistro', 1, 'p2')]
+
+
+def test_index_reloads_when_due(app, places):
+    index = place_suggestions()
+    db.session.execute(Place.__table__.update().values(name='Renamed'))
+    db.session.commit()
+    assert place_suggestions().suggest('renamed', 10) == []
+
+    app.config['SUGGEST_REFRESH_SECONDS'] = 1
+    index.loaded_at -= 2
+    assert place_suggestions().suggest('renamed', 10) == [('Renamed', 5, None)]
+
+
+@pytest.mark.parametrize('query', ['', 'prefix=', 'prefix=%20', 'prefix=a&limit=0',
+                                   'prefix=a&limit=21'])
+def test_rejects_bad_arguments(client, query):
+    assert client.get(f'/api/v1/places/suggest?{query}').status_code == 400
@@ -0,0 +1,136 @@
+"""
+Tests for fuzzy name search (GET /api/v1/places/search, /api/v1/amenities/search)
+"""
+
+import pytest
+from sqlalchemy import event
+from flask_jwt_extended import create_access_token
+from app.models.base_model import db, User, Place, Amenity, PlaceTrigram, AmenityTrigram, TrigramFrequency
+from app.persistence import trigrams as trigram_index
+from app.persistence.repository import AmenityRepository
+from app.persistence.trigrams import rebuild_trigrams, similarity, trigrams
+
+
+@pytest.fixture
+def names(app):
+    """Places and amenities, returned as {name: id} plus the owner's id"""
+    owner = User(first_name='Owner', last_name='Test', email='owner@test.com')
+    owner.hash_password('secret123')
+    db.session.add(owner)
+    db.session.flush()
+    created = [Place(name=name, description='Test', price=50.0, latitude=10.0,
+                     longitude=20.0, owner_id=owner.id)
+               for name in ['Modern Apartment', 'Sunny Apartment in Paris', 'Beach Villa',
+                            'Mountain Cabin']]
+    created += [Amenity(name=name) for name in ['Wi-Fi', 'Swimming Pool', 'Parking']]
+    db.session.add_all(created)
+    db.session.commit()
+    ids = {obj.name: obj.id for obj in created}
+    ids['owner'] = owner.id
+    db.session.remove()
+    return ids
+
+
+def _search(client, resource, query):
+    response = client.get(f'/api/v1/{resource}/search?q={query}')
+    assert response.status_code == 200
+    return [item['name'] for item in response.json]
+
+
+def test_trigrams():
+    assert trigrams('Ab') == {'  a', ' ab', 'ab '}
+    assert trigrams('Café!') == trigrams('cafe')
+    assert similarity('Apartment', 'apartment') == 1.0
+    assert similarity('apartmnt', 'Apartment') == pytest.approx(7 / 12)
+    assert similarity('Villa', 'Cabin') == 0.0
+
+
+def test_misspelled_place_names(client, names):
+    # Similarity is over the whole name: the longer name falls under 0.3
+    assert _search(client, 'places', 'apartmnt') == ['Modern Apartment']
+    assert _search(client, 'places', 'sunny apartmnt paris') == ['Sunny Apartment in Paris']
+    assert _search(client, 'places', 'montain cabn') == ['Mountain Cabin']
+    assert _search(client, 'places', 'castle') == []
+
+    [match] = client.get('/api/v1/places/search?q=beach%20vila').json
+    assert match['id'] == names['Beach Villa']
+    assert match['similarity'] == pytest.approx(similarity('beach vila', 'Beach Villa'))
+
+
+def test_misspelled_amenity_names(client, names):
+    assert _search(client, 'amenities', 'wifi') == ['Wi-Fi']
+    assert _search(client, 'amenities', 'swiming pol') == ['Swimming Pool']
+    matches = AmenityRepository().search('parkng', 5, 0.3)
+    assert [(amenity.name, round(score, 2)) for amenity, score in matches] == [('Parking', 0.5)]
+
+
+def test_search_reads_only_matching_postings(app, client, names):
+    issued = []
+    record = lambda conn, cursor, statement, *args: issued.append(statement)
+    event.listen(db.engine, "before_cursor_execute", record)
+    client.get('/api/v1/places/search?q=apartmnt')
+    event.remove(db.engine, "before_cursor_execute", record)
+
+    [lookup] = [s for s in issued if 'place_trigram' in s]
+    assert 'place_trigram.trigram IN' in lookup and 'GROUP BY place_trigram.place_id' in lookup
+
+
+def _frequencies():
+    db.session.expire_all()
+    return {(row.entity, row.trigram): row.entries for row in TrigramFrequency.query if row.entries}
+
+
+def test_stop_trigrams_are_not_used_to_find_candidates(app, client, names, monkeypatch):
+    """'  a', ' ap', 'apa', ... are held by half of the places here"""
+    expected = _search(client, 'places', 'sunny apartmnt paris')
+    monkeypatch.setattr(trigram_index, 'STOP_TRIGRAM_MIN_ENTRIES', 0)
+    issued = []
+    record = lambda conn, cursor, statement, *args: issued.append(statement)
+    event.listen(db.engine, "before_cursor_execute", record)
+    assert _search(client, 'places', 'sunny apartmnt paris') == expected == ['Sunny Apartment in Paris']
+    event.remove(db.engine, "before_cursor_execute", record)
+
+    [lookup] = [s for s in issued if 'place_trigram' in s]
+    assert lookup.startswith('WITH candidates') and 'stop_rows.trigram IN' in lookup
+
+
+def test_writes_keep_trigrams_current(app, client, names):
+    headers = {'Authorization': f"Bearer {create_access_token(identity=names['owner'])}"}
+
+    client.put(f"/api/v1/places/{names['Beach Villa']}", json={'name': 'Lake House'},
+               headers=headers)
+    assert _search(client, 'places', 'beach vila') == []
+    assert _search(client, 'places', 'lake hous') == ['Lake House']
+
+    amenity = db.session.get(Amenity, names['Parking'])
+    amenity.name = 'Garage'
+    db.session.commit()
+    assert _search(client, 'amenities', 'garag') == ['Garage']
+
+    client.delete(f"/api/v1/places/{names['Mountain Cabin']}", headers=headers)
+    AmenityRepository().delete(names['Wi-Fi'])
+    assert PlaceTrigram.query.filter_by(place_id=names['Mountain Cabin']).count() == 0
+    assert AmenityTrigram.query.filter_by(amenity_id=names['Wi-Fi']).count() == 0
+
+    # Renames and deletes kept the frequencies exact
+    frequencies = _frequencies()
+    assert frequencies[('place', '')] == 3 and frequencies[('amenity', '')] == 2
+    rebuild_trigrams()
+    assert _frequencies() == frequencies
+
+
+def test_rebuild_matches_incremental_rows(app, names):
+    def snapshot():
+        return (sorted((t.trigram, t.place_id, t.size) for t in PlaceTrigram.query),
+                sorted((t.trigram, t.amenity_id, t.size) for t in AmenityTrigram.query))
+
+    before = snapshot()
+    assert rebuild_trigrams(batch_size=7) == sum(len(rows) for rows in before)
+    assert snapshot() == before
+
+
+@pytest.mark.parametrize('query', ['', 'q=', 'q=%20', 'q=' + 'a' * 101, 'q=a&limit=0',
+                                   'q=a&limit=51'])
+def test_rejects_bad_arguments(client, query):
+    assert client.get(f'/api/v1/places/search?{query}').status_code == 400
+    assert client.get(f'/api/v1/amenities/search?{query}').status_code == 400
@@ -0,0 +1,103 @@
+"""
+Tests for the buffered place view counters
+"""
+
+import time
+
+from app import create_app
+from app.models.base_model import db, Place, PlaceViewCount
+from app.persistence.views import view_counter
+from config import TestingConfig
+
+
+def _create_place(client, name='Loft'):
+    tokens = client.post('/api/v1/auth/register', json={
+        'first_name': 'Owner',
+        'last_name': 'Test',
+        'email': f'{name.lower()}@test.com',
+        'password': 'secret123'
+    }).json
+    return client.post('/api/v1/places/', json={
+        'name': name,
+        'description': 'Near the station',
+        'price': 80.0,
+        'latitude': 24.7,
+        'longitude': 46.7
+    }, headers={'Authorization': f"Bearer {tokens['access_token']}"}).json['id']
+
+
+def test_views_are_buffered_then_flushed(client, statements):
+    """Detail reads never write; one flush writes every pending count"""
+    first = _create_place(client, 'First')
+    second = _create_place(client, 'Second')
+    statements.clear()
+
+    for _ in range(3):
+        assert client.get(f'/api/v1/places/{first}').status_code == 200
+    client.get(f'/api/v1/places/{second}')
+    client.get('/api/v1/places/missing')
+
+    assert [s for s in statements if 'place_view_count' in s and 'INSERT' in s] == []
+    assert view_counter().pending() == 4
+    assert client.get(f'/api/v1/places/{first}').json['view_count'] == 0
+
+    statements.clear()
+    assert view_counter().flush() == 2
+    assert len([s for s in statements if s.startswith('INSERT INTO place_view_count')]) == 1
+    assert view_counter().pending() == 0
+    # The GET that saw 0 was counted too
+    assert client.get(f'/api/v1/places/{first}').json['view_count'] == 4
+
+    client.get(f'/api/v1/places/{first}')
+    view_counter().flush()
+    counts = {place['id']: place['view_count'] for place in client.get('/api/v1/places/').json}
+    assert counts == {first: 6, second: 1}
+
+
+def test_flush_skips_deleted_places(client):
+    """Counts for places deleted before the flush are dropped"""
+    kept = _create_place(client, 'Kept')
+    deleted = _create_place(client, 'Deleted')
+    client.get(f'/api/v1/places/{kept}')
+    client.get(f'/api/v1/places/{deleted}')
+    db.session.delete(db.session.get(Place, deleted))
+    db.session.commit()
+
+    view_counter().flush()
+
+    assert {row.place_id: row.count for row in PlaceViewCount.query} == {kept: 1}
+
+
+def test_failed_flush_keeps_counts(app, client):
+    """Counts survive a flush that fails and are written by the next one"""
+    place_id = _create_place(client)
+    client.get(f'/api/v1/places/{place_id}')
+    PlaceViewCount.__table__.drop(db.engine)
+
+    assert view_counter().flush() == 0
+    assert view_counter().pending() == 1
+
+    PlaceViewCount.__table__.create(db.engine)
+    assert view_counter().flush() == 1
+    assert db.session.get(PlaceViewCount, place_id).count == 1
+
+
+def test_background_flush(tmp_path):
+    """With an interval, a thread writes the counts without explicit flushes"""
+    class ViewsConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'views.db'}"
+        VIEW_COUNTER_FLUSH_SECONDS = 0.05
+
+    app = create_app(ViewsConfig)
+    client = app.test_client()
+    place_id = _create_place(client)
+    client.get(f'/api/v1/places/{place_id}')
+
+    with app.app_context():
+        deadline = time.time() + 5
+        while db.session.get(PlaceViewCount, place_id) is None and time.time() < deadline:
+            db.session.remove()
+            time.sleep(0.05)
+        assert db.session.get(PlaceViewCount, place_id).count == 1
+        db.session.remove()
+        db.engine.dispose()
@@ -0,0 +1,93 @@
+"""
+Tests for the single-writer coordinator with group commit
+"""
+
+import threading
+import pytest
+from app import create_app
+from app.models.base_model import db, Amenity, Place
+from app.persistence.repository import AmenityRepository, ConflictError
+from app.persistence.writer import write_coordinator
+from config import TestingConfig
+
+
+@pytest.fixture
+def app(tmp_path):
+    """File-backed app (the writer thread needs its own connection)"""
+    class WriterConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'writer.db'}"
+        WRITE_COORDINATOR = True
+        WRITE_COORDINATOR_MAX_WAIT_MS = 50
+
+    app = create_app(WriterConfig)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def _in_threads(app, count, target):
+    """Run ``target(index)`` in ``count`` threads, each with an app context"""
+    results = [None] * count
+
+    def run(index):
+        with app.app_context():
+            try:
+                results[index] = target(index)
+            except Exception as e:
+                results[index] = e
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_writes_share_commits(app):
+    """Concurrent inserts are committed in fewer transactions than writes"""
+    results = _in_threads(app, 16, lambda i: AmenityRepository().add(Amenity(name=f'Amenity {i}')).id)
+
+    assert all(isinstance(result, str) for result in results)
+    with app.app_context():
+        coordinator = write_coordinator()
+        assert Amenity.query.count() == 16
+        assert coordinator.writes == 16
+        assert coordinator.commits < coordinator.writes
+
+
+def test_failed_write_does_not_fail_the_group(app):
+    """A constraint violation only fails the offending write"""
+    names = ['Pool', 'Gym', 'Pool', 'Sauna']
+    results = _in_threads(app, len(names), lambda i: AmenityRepository().add(Amenity(name=names[i])).name)
+
+    assert sum(isinstance(result, ConflictError) for result in results) == 1
+    with app.app_context():
+        assert sorted(a.name for a in Amenity.query) == ['Gym', 'Pool', 'Sauna']
+
+
+def test_api_writes_through_coordinator(app):
+    """Created objects come back attached to the request's session"""
+    client = app.test_client()
+    tokens = client.post('/api/v1/auth/register', json={
+        'first_name': 'Owner',
+        'last_name': 'Test',
+        'email': 'owner@test.com',
+        'password': 'secret123'
+    }).json
+    response = client.post('/api/v1/places/', json={
+        'name': 'Loft',
+        'description': 'Near the station',
+        'price': 80.0,
+        'latitude': 24.7,
+        'longitude': 46.7
+    }, headers={'Authorization': f"Bearer {tokens['access_token']}"})
+
+    assert response.status_code == 201
+    assert response.json['amenity_ids'] == []
+    with app.app_context():
+        assert db.session.get(Place, response.json['id']).owner_id == tokens['user_id']
+        assert write_coordinator().writes == 3  # user, refresh token, place
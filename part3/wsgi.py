@@ -0,0 +1,18 @@
+"""
+Production WSGI entry point
+
+Run with a pre-forking server using the bundled configuration:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+FLASK_ENV selects the configuration class (defaults to production).
+"""
+
+import os
+from dotenv import load_dotenv
+from app import create_app
+from config import config
+
+load_dotenv()
+
+app = create_app(config.get(os.getenv('FLASK_ENV', 'production'), config['production']))
@@ -41,9 +41,9 @@ async function handleLogin() {
             body: JSON.stringify({ email, password }),
         });
 
-        // Store token in cookie
+        // Store tokens in cookies
         if (response && response.access_token) {
-            setCookie(COOKIE_NAME, response.access_token);
+            storeTokens(response);
         } else {
             throw new Error('No access token received from server');
         }
@@ -78,8 +78,19 @@ async function handleLogin() {
 /**
  * Handle logout
  */
-function handleLogout() {
-    deleteCookie(COOKIE_NAME);
+async function handleLogout() {
+    // Revoke the tokens server-side; log out locally even if the call fails
+    if (getAuthToken()) {
+        try {
+            await apiRequest('/auth/logout', {
+                method: 'POST',
+                body: JSON.stringify({ refresh_token: getRefreshToken() }),
+            });
+        } catch (error) {
+            console.error('Logout error:', error);
+        }
+    }
+    clearTokens();
     window.location.href = 'index.html';
 }
 
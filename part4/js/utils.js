@@ -6,6 +6,10 @@
 // ========== Configuration ==========
 const API_BASE_URL = 'http://localhost:5000/api/v1';
 const COOKIE_NAME = 'hbnb_token';
+const REFRESH_COOKIE_NAME = 'hbnb_refresh';
+const REFRESH_TOKEN_DAYS = 30;
+// Refresh the access token this many seconds before it expires
+const TOKEN_REFRESH_MARGIN = 60;
 
 // ========== Cookie Functions ==========
 
@@ -42,11 +46,36 @@ function getAuthToken() {
     return getCookie(COOKIE_NAME);
 }
 
+/**
+ * Get refresh token
+ */
+function getRefreshToken() {
+    return getCookie(REFRESH_COOKIE_NAME);
+}
+
+/**
+ * Store the tokens returned by login, register or refresh
+ */
+function storeTokens(response) {
+    setCookie(COOKIE_NAME, response.access_token);
+    if (response.refresh_token) {
+        setCookie(REFRESH_COOKIE_NAME, response.refresh_token, REFRESH_TOKEN_DAYS);
+    }
+}
+
+/**
+ * Remove all stored tokens
+ */
+function clearTokens() {
+    deleteCookie(COOKIE_NAME);
+    deleteCookie(REFRESH_COOKIE_NAME);
+}
+
 /**
  * Check if user is authenticated
  */
 function isAuthenticated() {
-    return getAuthToken() !== null;
+    return getAuthToken() !== null || getRefreshToken() !== null;
 }
 
 /**
@@ -67,6 +96,49 @@ function decodeJWT(token) {
     }
 }
 
+/**
+ * Check if a token is missing, expired or about to expire
+ */
+function isTokenExpiring(token) {
+    if (!token) return true;
+    const decoded = decodeJWT(token);
+    if (!decoded || !decoded.exp) return false;
+    return decoded.exp - TOKEN_REFRESH_MARGIN <= Date.now() / 1000;
+}
+
+// Shared promise so concurrent requests trigger a single refresh
+let refreshPromise = null;
+
+/**
+ * Exchange the refresh token for a new token pair.
+ * Resolves to true on success; clears the tokens and resolves to false otherwise.
+ */
+function refreshAccessToken() {
+    const refreshToken = getRefreshToken();
+    if (!refreshToken) {
+        return Promise.resolve(false);
+    }
+    if (!refreshPromise) {
+        refreshPromise = fetch(`${API_BASE_URL}/auth/refresh`, {
+            method: 'POST',
+            headers: { 'Authorization': `Bearer ${refreshToken}` },
+        })
+            .then(async (response) => {
+                if (!response.ok) {
+                    clearTokens();
+                    return false;
+                }
+                storeTokens(await response.json());
+                return true;
+            })
+            .catch(() => false)
+            .finally(() => {
+                refreshPromise = null;
+            });
+    }
+    return refreshPromise;
+}
+
 /**
  * Check if current user is admin
  */
@@ -133,16 +205,33 @@ function getAuthHeaders() {
  */
 async function apiRequest(endpoint, options = {}) {
     const url = `${API_BASE_URL}${endpoint}`;
+    const { retried, ...fetchOptions } = options;
+    const isAuthEndpoint = endpoint.startsWith('/auth/');
+
+    // Renew an expired/expiring access token before sending the request
+    if (!isAuthEndpoint && getRefreshToken() && isTokenExpiring(getAuthToken())) {
+        await refreshAccessToken();
+    }
+
     const config = {
-        ...options,
+        // Send the API's cookies (read-your-writes pin to the primary database)
+        credentials: 'include',
+        ...fetchOptions,
         headers: {
             ...getAuthHeaders(),
-            ...(options.headers || {}),
+            ...(fetchOptions.headers || {}),
         },
     };
 
     try {
         const response = await fetch(url, config);
+
+        // Access token rejected: refresh once and replay the request
+        if (response.status === 401 && !isAuthEndpoint && !retried && getRefreshToken()) {
+            if (await refreshAccessToken()) {
+                return apiRequest(endpoint, { ...options, retried: true });
+            }
+        }
         
         // Check if response has JSON content
         let data = {};